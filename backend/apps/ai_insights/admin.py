@@ -15,7 +15,7 @@ class AIInsightAdmin(admin.ModelAdmin):
     list_display = ['user', 'health_score', 'health_status', 'period_start', 'period_end', 'generated_at', 'has_error']
     list_filter = ['health_status', 'has_error', 'generated_at']
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
-    readonly_fields = ['generated_at', 'tokens_used', 'model_version', 'analysis_data']
+    readonly_fields = ['generated_at', 'tokens_used', 'model_version', 'data_hash', 'reused_from', 'analysis_data']
 
     fieldsets = (
         ('User & Period', {
@@ -28,7 +28,7 @@ class AIInsightAdmin(admin.ModelAdmin):
             'fields': ('alerts', 'opportunities', 'predictions', 'recommendations')
         }),
         ('Metadata', {
-            'fields': ('generated_at', 'tokens_used', 'model_version', 'has_error', 'error_message')
+            'fields': ('generated_at', 'tokens_used', 'model_version', 'data_hash', 'reused_from', 'has_error', 'error_message')
         }),
         ('Analysis Data', {
             'fields': ('analysis_data',),
@@ -0,0 +1,146 @@
+"""
+Materialised alerts feed.
+
+The alerts endpoint used to run AlertsService on every request. The computed
+payload is now stored per user together with the reports data version (see
+apps.reports.report_cache) and the local day it was computed on. A read
+returns the stored payload; when the version moved (sync, bill change,
+recategorisation) or the day rolled over, the stale payload is still served,
+flagged as such, and a Celery task recomputes it in the background. Only a
+user with no stored payload pays for the computation in the request.
+"""
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.reports.report_cache import get_data_version
+
+logger = logging.getLogger(__name__)
+
+# Safety net: also covers changes that do not bump the data version
+ENTRY_TIMEOUT = 60 * 60 * 24  # 24 hours
+REFRESH_LOCK_TIMEOUT = 60 * 5  # 5 minutes
+
+SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+
+def _entry_key(user_id) -> str:
+    return f'ai_insights:alerts:{user_id}'
+
+
+def _lock_key(user_id) -> str:
+    return f'ai_insights:alerts_refresh:{user_id}'
+
+
+def build_payload(user) -> Dict[str, Any]:
+    """Alerts response for a user, as the alerts endpoint returns it."""
+    from apps.ai_insights.services.alerts_service import AlertsService
+    from apps.ai_insights.views import check_user_has_financial_data
+
+    has_data, error_message, data_details = check_user_has_financial_data(user)
+    if not has_data:
+        return {
+            'alerts': [],
+            'error': error_message,
+            'details': data_details,
+        }
+
+    alerts = AlertsService(user).generate_alerts()
+
+    # Group alerts by severity for easier frontend handling
+    alerts_by_severity = {severity: [] for severity in SEVERITIES}
+    for alert in alerts:
+        severity = alert.get('severity', 'low')
+        if severity in alerts_by_severity:
+            alerts_by_severity[severity].append(alert)
+
+    counts = {'total': len(alerts)}
+    counts.update({severity: len(alerts_by_severity[severity]) for severity in SEVERITIES})
+
+    return {
+        'alerts': alerts,
+        'alerts_by_severity': alerts_by_severity,
+        'counts': counts,
+    }
+
+
+def compute(user) -> Dict[str, Any]:
+    """Compute and store the alerts entry of a user."""
+    # Read the version before computing: if it is bumped meanwhile, the
+    # entry is stored under the old one and refreshed on the next read.
+    version = get_data_version(user.id)
+    entry = {
+        'payload': build_payload(user),
+        'data_version': version,
+        'day': timezone.localdate().isoformat(),
+        'generated_at': timezone.now().isoformat(),
+    }
+    cache.set(_entry_key(user.id), entry, ENTRY_TIMEOUT)
+    return entry
+
+
+def is_fresh(entry: Dict[str, Any], user_id) -> bool:
+    return (
+        entry.get('data_version') == get_data_version(user_id)
+        and entry.get('day') == timezone.localdate().isoformat()
+    )
+
+
+def schedule_refresh(user_id) -> bool:
+    """
+    Enqueue a background recomputation, at most one per user at a time.
+
+    Returns:
+        True if a task was enqueued
+    """
+    if not cache.add(_lock_key(user_id), 1, REFRESH_LOCK_TIMEOUT):
+        return False
+
+    from apps.ai_insights.tasks import refresh_user_alerts
+    try:
+        refresh_user_alerts.delay(user_id)
+    except Exception as e:
+        cache.delete(_lock_key(user_id))
+        logger.error(f'Failed to enqueue alerts refresh for user {user_id}: {e}')
+        return False
+    return True
+
+
+def release_refresh(user_id):
+    cache.delete(_lock_key(user_id))
+
+
+def refresh_if_cached(user_ids: Iterable):
+    """Recompute in the background the stale entries of users who have one."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    entries = cache.get_many([_entry_key(user_id) for user_id in user_ids])
+    for user_id in user_ids:
+        entry = entries.get(_entry_key(user_id))
+        if entry is not None and not is_fresh(entry, user_id):
+            schedule_refresh(user_id)
+
+
+def get_alerts(user) -> Tuple[Dict[str, Any], bool]:
+    """
+    Alerts entry of a user and whether it is stale.
+
+    A missing entry is computed in the request; a stale one is returned as
+    is and refreshed in the background.
+    """
+    entry: Optional[Dict[str, Any]] = cache.get(_entry_key(user.id))
+    if entry is None:
+        return compute(user), False
+
+    if is_fresh(entry, user.id):
+        return entry, False
+
+    schedule_refresh(user.id)
+    return entry, True
+
+
+def invalidate(user_id):
+    cache.delete(_entry_key(user_id))
@@ -0,0 +1,228 @@
+"""
+AI insights pipeline benchmark.
+
+setup_users() creates N synthetic users (reusing the reports benchmark
+generator, plus a company and an enabled AIInsightConfig each) and
+run_pipeline() pushes them through the weekly generation path against an
+OpenAI stand-in (see fake_openai), recording throughput, per-user latency
+percentiles and the number of queries issued. The benchmark_insights
+management command wires it together.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from apps.reports import benchmark as reports_benchmark
+
+logger = logging.getLogger(__name__)
+
+LABEL = 'insights'
+MODES = ('batch', 'single')
+
+
+def benchmark_users():
+    """Users created by setup_users()."""
+    return reports_benchmark.benchmark_users().filter(email__startswith=f'bench-{LABEL}-')
+
+
+def delete_users() -> int:
+    count = 0
+    for user in benchmark_users():
+        user.delete()
+        count += 1
+    return count
+
+
+def _fake_cnpj(number: int) -> str:
+    """Unique CNPJ-formatted placeholder (check digits are not valid)."""
+    digits = f'{99_000_000_000_000 + number:014d}'
+    return f'{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}'
+
+
+def setup_users(
+    users: int,
+    transactions_per_user: int = 500,
+    months: int = 6,
+    seed: int = 42,
+    log: Callable[[str], None] = logger.info
+) -> Dict[str, Any]:
+    """
+    Create `users` benchmark users ready for insight generation.
+
+    Returns:
+        The reports benchmark dataset summary
+    """
+    from apps.ai_insights.models import AIInsightConfig
+    from apps.companies.models import Company
+
+    dataset = reports_benchmark.generate_dataset(
+        transactions=users * transactions_per_user,
+        users=users,
+        months=months,
+        seed=seed,
+        label=LABEL,
+        log=log,
+    )
+
+    created = benchmark_users().filter(id__in=dataset['user_ids'])
+    now = timezone.now()
+    Company.objects.bulk_create([
+        Company(
+            owner=user,
+            name=f'Empresa Benchmark {user.id}',
+            cnpj=_fake_cnpj(user.id),
+            company_type='me',
+            business_sector='services',
+        )
+        for user in created
+    ])
+    AIInsightConfig.objects.bulk_create([
+        AIInsightConfig(user=user, is_enabled=True, enabled_at=now)
+        for user in created
+    ])
+    return dataset
+
+
+class QueryCounter:
+    """
+    Count queries on every database connection, including the ones opened
+    by sync_to_async worker threads (CaptureQueriesContext only sees the
+    current thread's connection).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wrapped = []
+        self.count = 0
+
+    def _wrapper(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def _install(self, connection):
+        connection.execute_wrappers.append(self._wrapper)
+        self._wrapped.append(connection)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        if self._wrapper not in connection.execute_wrappers:
+            self._install(connection)
+
+    def __enter__(self) -> 'QueryCounter':
+        for connection in connections.all():
+            self._install(connection)
+        connection_created.connect(self._on_connection_created, weak=False)
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self._on_connection_created)
+        for connection in self._wrapped:
+            if self._wrapper in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self._wrapper)
+        self._wrapped = []
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(ordered[rank - 1], 2)
+
+
+def _run_single(user_ids: List[int], force: bool, log: Callable[[str], None]) -> List[Dict[str, Any]]:
+    """One user at a time on the blocking client (generate_insight_for_user)."""
+    from django.contrib.auth import get_user_model
+    from apps.ai_insights.services.insight_generator import InsightGenerator
+
+    User = get_user_model()
+    results = []
+    for index, user_id in enumerate(user_ids):
+        started = time.perf_counter()
+        insight = InsightGenerator(User.objects.get(id=user_id)).generate(force=force)
+        results.append({
+            'user_id': user_id,
+            'success': not insight.has_error,
+            'reused': insight.reused_from_id is not None,
+            'tokens_used': insight.tokens_used,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        })
+        if (index + 1) % 10 == 0:
+            log(f'  {index + 1}/{len(user_ids)} users')
+    return results
+
+
+def _run_batches(user_ids: List[int], concurrency: int, force: bool, log: Callable[[str], None]) -> List[Dict[str, Any]]:
+    """Sub-batches of `concurrency` users, as generate_insights_batch runs them."""
+    from apps.ai_insights.services.batch_runner import run_insight_batch
+
+    results = []
+    for start in range(0, len(user_ids), concurrency):
+        results.extend(run_insight_batch(user_ids[start:start + concurrency], concurrency=concurrency, force=force))
+        log(f'  {len(results)}/{len(user_ids)} users')
+    return results
+
+
+def run_pipeline(
+    mode: str = 'batch',
+    concurrency: int = 5,
+    force: bool = False,
+    log: Callable[[str], None] = logger.info
+) -> Dict[str, Any]:
+    """
+    Generate insights for every due benchmark user and measure the run.
+
+    Users are selected with the weekly task's due_user_ids(); the countdown
+    spreading is skipped so the run measures generation only, in one
+    process. With force, every benchmark user is made due again and
+    InsightGenerator's recent-insight check is bypassed.
+    """
+    from apps.ai_insights.models import AIInsightConfig
+    from apps.ai_insights.tasks import due_user_ids
+
+    if mode not in MODES:
+        raise ValueError(f'Unknown mode {mode}')
+
+    benchmark_ids = set(benchmark_users().values_list('id', flat=True))
+    if force:
+        AIInsightConfig.objects.filter(user_id__in=benchmark_ids).update(next_scheduled_at=None)
+    user_ids = [user_id for user_id in due_user_ids() if user_id in benchmark_ids]
+    log(f'{len(user_ids)} benchmark users due ({mode}, concurrency {concurrency if mode == "batch" else 1})')
+
+    with QueryCounter() as queries:
+        started = time.perf_counter()
+        if mode == 'batch':
+            results = _run_batches(user_ids, max(1, concurrency), force, log)
+        else:
+            results = _run_single(user_ids, force, log)
+        wall_seconds = time.perf_counter() - started
+
+    durations = [result['duration_ms'] for result in results if 'duration_ms' in result]
+    succeeded = sum(1 for result in results if result.get('success'))
+
+    return {
+        'mode': mode,
+        'concurrency': concurrency if mode == 'batch' else 1,
+        'users': len(user_ids),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'reused': sum(1 for result in results if result.get('reused')),
+        'tokens_used': sum(result.get('tokens_used') or 0 for result in results),
+        'wall_seconds': round(wall_seconds, 2),
+        'throughput_per_minute': round(len(user_ids) / wall_seconds * 60, 2) if wall_seconds else 0,
+        'latency_ms': {
+            'p50': _percentile(durations, 50),
+            'p90': _percentile(durations, 90),
+            'p99': _percentile(durations, 99),
+            'max': round(max(durations), 2) if durations else 0,
+        },
+        'queries': queries.count,
+        'queries_per_user': round(queries.count / len(user_ids), 1) if user_ids else 0,
+    }
@@ -0,0 +1,277 @@
+"""
+Local stand-in for the OpenAI chat-completions API.
+
+FakeOpenAIServer answers POST /v1/chat/completions with the same envelope as
+OpenAI (choices[0].message.content, usage, model) and a content JSON that
+OpenAIService._validate_response accepts, so InsightGenerator can run end to
+end without spending real tokens. Latency, server errors and 429s with
+Retry-After are configurable to exercise the client's retry paths.
+
+Point OpenAIService at it with OPENAI_API_URL (any OPENAI_API_KEY works).
+Used by the fake_openai_server and benchmark_insights commands.
+"""
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPLETIONS_PATH = '/v1/chat/completions'
+
+HEALTH_STATUSES = [
+    (8.0, 'Excelente'),
+    (6.0, 'Bom'),
+    (4.0, 'Regular'),
+    (0.0, 'Ruim'),
+]
+
+
+def _health_status(score: float) -> str:
+    for threshold, status in HEALTH_STATUSES:
+        if score >= threshold:
+            return status
+    return 'Ruim'
+
+
+def build_insight_content(prompt: str) -> Dict[str, Any]:
+    """
+    Insight JSON in the format requested by OpenAIService._build_prompt.
+
+    Derived from a hash of the prompt, so the same data always gets the same
+    answer.
+    """
+    rng = random.Random(hashlib.sha256(prompt.encode()).hexdigest())
+    score = round(rng.uniform(2.0, 9.5), 1)
+    severities = ['high', 'medium', 'low']
+    types = ['alert', 'warning', 'success', 'info']
+
+    return {
+        'health_score': score,
+        'health_status': _health_status(score),
+        'summary': 'Análise gerada pelo servidor local de testes. Os valores não refletem uma análise real.',
+        'insights': [
+            {
+                'type': rng.choice(types),
+                'severity': rng.choice(severities),
+                'title': f'Insight de teste {i + 1}',
+                'description': 'Descrição gerada automaticamente para testes de carga.',
+                'recommendation': 'Nenhuma ação necessária.',
+            }
+            for i in range(rng.randint(2, 5))
+        ],
+        'predictions': {
+            'next_month_cash_flow': round(rng.uniform(-5000, 20000), 2),
+            'confidence': rng.choice(severities),
+            'reasoning': 'Previsão gerada automaticamente para testes de carga.',
+        },
+        'top_recommendations': [f'Recomendação de teste {i + 1}' for i in range(3)],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: '_Server'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(f'{self.address_string()} {format % args}')
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.stand_in.record(status)
+
+    def _send_error(self, status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None):
+        self._send_json(status, {'error': {'message': message, 'type': error_type}}, headers)
+
+    def do_POST(self):
+        stand_in = self.server.stand_in
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        if self.path.rstrip('/') != COMPLETIONS_PATH:
+            return self._send_error(404, f'Unknown path {self.path}', 'invalid_request_error')
+
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self._send_error(401, 'Missing API key', 'invalid_request_error')
+
+        try:
+            request = json.loads(raw)
+            messages = request['messages']
+            prompt = messages[-1]['content']
+            model = request['model']
+        except (ValueError, KeyError, IndexError, TypeError):
+            return self._send_error(400, 'Invalid chat completions request', 'invalid_request_error')
+
+        time.sleep(stand_in.next_latency())
+
+        failure = stand_in.next_failure()
+        if failure == 429:
+            return self._send_error(
+                429, 'Rate limit reached (stand-in)', 'rate_limit_error',
+                headers={'Retry-After': str(stand_in.retry_after)}
+            )
+        if failure == 500:
+            return self._send_error(500, 'Internal server error (stand-in)', 'server_error')
+
+        content = json.dumps(build_insight_content(prompt), ensure_ascii=False)
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        self._send_json(200, {
+            'id': f'chatcmpl-standin-{stand_in.requests}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    stand_in: 'FakeOpenAIServer'
+
+
+class FakeOpenAIServer:
+    """
+    Threaded stand-in server. Use as a context manager or call start()/stop().
+
+    Args:
+        host, port: Address to bind (port 0 picks a free port)
+        latency_ms: Mean response time
+        jitter_ms: Uniform +/- variation around latency_ms
+        error_rate: Share of requests answered with 500
+        rate_limit_rate: Share of requests answered with 429
+        retry_after: Retry-After seconds sent with 429s
+        seed: Seed for latency and failure draws
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency_ms: float = 800,
+        jitter_ms: float = 200,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None
+    ):
+        self.host = host
+        self.port = port
+        self.latency_ms = max(0.0, latency_ms)
+        self.jitter_ms = max(0.0, jitter_ms)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+        self.requests = 0
+        self.responses: Dict[int, int] = {}
+
+    @staticmethod
+    def add_arguments(parser):
+        """Command-line options shared by the commands that start a stand-in."""
+        parser.add_argument('--latency-ms', type=float, default=800, help='Mean response time (default: 800)')
+        parser.add_argument('--jitter-ms', type=float, default=200, help='+/- variation of the response time (default: 200)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 500 (default: 0)')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of requests answered with 429 (default: 0)')
+        parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s (default: 1)')
+
+    @classmethod
+    def from_options(cls, options: Dict[str, Any], **kwargs) -> 'FakeOpenAIServer':
+        return cls(
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            retry_after=options['retry_after'],
+            **kwargs
+        )
+
+    @property
+    def url(self) -> str:
+        """Value for OPENAI_API_URL."""
+        return f'http://{self.host}:{self.port}{COMPLETIONS_PATH}'
+
+    def next_latency(self) -> float:
+        with self._lock:
+            self.requests += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def next_failure(self) -> Optional[int]:
+        with self._lock:
+            draw = self._rng.random()
+        if draw < self.rate_limit_rate:
+            return 429
+        if draw < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def record(self, status: int):
+        with self._lock:
+            self.responses[status] = self.responses.get(status, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'responses': {str(status): count for status, count in sorted(self.responses.items())},
+            }
+
+    def _bind(self):
+        self._httpd = _Server((self.host, self.port), _Handler)
+        self._httpd.stand_in = self
+        self.port = self._httpd.server_address[1]
+
+    def start(self) -> 'FakeOpenAIServer':
+        """Serve from a background thread."""
+        self._bind()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-openai', daemon=True)
+        self._thread.start()
+        logger.info(f'OpenAI stand-in listening on {self.url}')
+        return self
+
+    def serve_forever(self):
+        """Serve from the current thread until interrupted."""
+        self._bind()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> 'FakeOpenAIServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,180 @@
+"""
+Management command to load-test the AI insights pipeline against a local
+OpenAI stand-in.
+"""
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.ai_insights import benchmark
+from apps.ai_insights.fake_openai import FakeOpenAIServer
+from apps.ai_insights.services import rate_limiter
+from apps.reports import benchmark as reports_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Run weekly insight generation for N synthetic users against a local OpenAI stand-in'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=20,
+            help='Synthetic users to generate insights for (default: 20)'
+        )
+        parser.add_argument(
+            '--transactions-per-user',
+            type=int,
+            default=500,
+            help='Transactions per synthetic user (default: 500)'
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=6,
+            help='History length in months (default: 6)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the dataset and the stand-in (default: 42)'
+        )
+        parser.add_argument(
+            '--mode',
+            type=str,
+            choices=benchmark.MODES,
+            default='batch',
+            help='batch: generate_insights_batch path; single: one user at a time (default: batch)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Calls in flight per batch (default: AI_INSIGHTS_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--rpm',
+            type=int,
+            help='OpenAI requests per minute for the token bucket (default: OPENAI_REQUESTS_PER_MINUTE)'
+        )
+        parser.add_argument(
+            '--api-url',
+            type=str,
+            help='Use a stand-in already running at this URL instead of starting one'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate for users that already have a recent insight'
+        )
+        parser.add_argument(
+            '--reuse',
+            action='store_true',
+            help='Use the existing benchmark users instead of generating new ones'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the benchmark users after the run'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Results file (default: benchmark_results/insights_<mode>_<timestamp>.json)'
+        )
+        FakeOpenAIServer.add_arguments(parser)
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency'] or settings.AI_INSIGHTS_CONCURRENCY
+        rpm = options['rpm'] or settings.OPENAI_REQUESTS_PER_MINUTE
+
+        if options['reuse']:
+            if not benchmark.benchmark_users().exists():
+                raise CommandError('No benchmark users found, run without --reuse first')
+            dataset = {'label': benchmark.LABEL, 'reused': True, 'users': benchmark.benchmark_users().count()}
+        else:
+            if benchmark.benchmark_users().exists():
+                raise CommandError('Benchmark users already exist, use --reuse or delete them first')
+            self.stdout.write(self.style.WARNING(f"Generating {options['users']} users..."))
+            dataset = benchmark.setup_users(
+                users=options['users'],
+                transactions_per_user=options['transactions_per_user'],
+                months=options['months'],
+                seed=options['seed'],
+                log=self.stdout.write,
+            )
+
+        server = None
+        if options['api_url']:
+            api_url = options['api_url']
+        else:
+            server = FakeOpenAIServer.from_options(options, seed=options['seed']).start()
+            api_url = server.url
+
+        # OpenAIService reads both through decouple, which checks os.environ first
+        saved_env = {name: os.environ.get(name) for name in ('OPENAI_API_URL', 'OPENAI_API_KEY')}
+        os.environ['OPENAI_API_URL'] = api_url
+        os.environ['OPENAI_API_KEY'] = 'sk-benchmark'
+        # Separate bucket so the run neither uses nor is limited by the real budget
+        saved_bucket = rate_limiter._openai_bucket
+        rate_limiter._openai_bucket = rate_limiter.TokenBucket('openai-benchmark', rate=rpm, period=60.0)
+
+        try:
+            self.stdout.write(self.style.WARNING(f'Running pipeline against {api_url} ({rpm} requests/min)...'))
+            run = benchmark.run_pipeline(
+                mode=options['mode'],
+                concurrency=concurrency,
+                force=options['force'],
+                log=self.stdout.write,
+            )
+        finally:
+            rate_limiter._openai_bucket = saved_bucket
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            if server:
+                server.stop()
+            if not options['keep'] and not options['reuse']:
+                deleted = benchmark.delete_users()
+                self.stdout.write(f'Deleted {deleted} benchmark users')
+
+        results = {
+            **reports_benchmark.environment(),
+            'dataset': dataset,
+            'requests_per_minute': rpm,
+            'stand_in': {
+                'url': api_url,
+                'latency_ms': options['latency_ms'],
+                'jitter_ms': options['jitter_ms'],
+                'error_rate': options['error_rate'],
+                'rate_limit_rate': options['rate_limit_rate'],
+                'retry_after': options['retry_after'],
+                **(server.stats() if server else {}),
+            },
+            'run': run,
+        }
+
+        output = options['output'] or os.path.join(
+            'benchmark_results',
+            f"insights_{options['mode']}_{timezone.now():%Y%m%d_%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+
+        latency = run['latency_ms']
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write(f"Users:       {run['users']} ({run['succeeded']} ok, {run['failed']} failed, {run['reused']} reused)")
+        self.stdout.write(f"Wall time:   {run['wall_seconds']}s")
+        self.stdout.write(f"Throughput:  {run['throughput_per_minute']} users/min")
+        self.stdout.write(f"Latency:     p50 {latency['p50']}ms  p90 {latency['p90']}ms  p99 {latency['p99']}ms")
+        self.stdout.write(f"Queries:     {run['queries']} ({run['queries_per_user']} per user)")
+        if server:
+            self.stdout.write(f"Stand-in:    {server.stats()}")
+        self.stdout.write('=' * 60)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
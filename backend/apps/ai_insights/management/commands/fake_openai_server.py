@@ -0,0 +1,54 @@
+"""
+Management command to run the local OpenAI stand-in server.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.ai_insights.fake_openai import FakeOpenAIServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local OpenAI chat-completions stand-in (point OPENAI_API_URL at it)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='127.0.0.1',
+            help='Address to bind (default: 127.0.0.1)'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Port to bind (default: 8765)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Seed for latency and failure draws'
+        )
+        FakeOpenAIServer.add_arguments(parser)
+
+    def handle(self, *args, **options):
+        server = FakeOpenAIServer.from_options(
+            options,
+            host=options['host'],
+            port=options['port'],
+            seed=options['seed'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'OpenAI stand-in listening on {server.url}'))
+        self.stdout.write(f'  export OPENAI_API_URL={server.url}')
+        self.stdout.write(
+            f"  latency {options['latency_ms']:.0f}±{options['jitter_ms']:.0f}ms, "
+            f"500s {options['error_rate']:.0%}, 429s {options['rate_limit_rate']:.0%} "
+            f"(Retry-After {options['retry_after']}s)"
+        )
+        self.stdout.write('Quit with CONTROL-C.')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(f'Served: {server.stats()}')
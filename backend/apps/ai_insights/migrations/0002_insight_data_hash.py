@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-18 21:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_insights', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiinsight',
+            name='data_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 of the canonical analysis data, model and prompt version', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='aiinsight',
+            name='reused_from',
+            field=models.ForeignKey(blank=True, help_text='Insight whose AI result was reused because the data was unchanged', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reuses', to='ai_insights.aiinsight'),
+        ),
+        migrations.AddIndex(
+            model_name='aiinsight',
+            index=models.Index(fields=['user', 'data_hash'], name='ai_insights_user_id_f185c8_idx'),
+        ),
+    ]
@@ -107,6 +107,20 @@ class AIInsight(models.Model):
     analysis_data = models.JSONField(
         help_text='Snapshot of the data sent to AI for analysis'
     )
+    data_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        help_text='SHA-256 of the canonical analysis data, model and prompt version'
+    )
+    reused_from = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reuses',
+        help_text='Insight whose AI result was reused because the data was unchanged'
+    )
 
     # Error tracking
     has_error = models.BooleanField(default=False)
@@ -118,6 +132,7 @@ class AIInsight(models.Model):
         indexes = [
             models.Index(fields=['user', '-generated_at']),
             models.Index(fields=['user', 'period_start', 'period_end']),
+            models.Index(fields=['user', 'data_hash']),
         ]
 
     def __str__(self):
@@ -129,13 +144,13 @@ class AIInsight(models.Model):
         Calculate score change compared to previous insight.
         Returns None if no previous insight exists.
         """
-        previous = AIInsight.objects.filter(
-            user=self.user,
+        previous_score = AIInsight.objects.filter(
+            user_id=self.user_id,
             generated_at__lt=self.generated_at
-        ).first()
+        ).values_list('health_score', flat=True).first()
 
-        if previous:
-            return self.health_score - previous.health_score
+        if previous_score is not None:
+            return self.health_score - previous_score
         return None
 
     @property
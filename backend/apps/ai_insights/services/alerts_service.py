@@ -3,15 +3,17 @@ Alerts Service - Rule-based financial alerts for SMBs
 Generates actionable alerts without LLM costs
 """
 import logging
-from dataclasses import dataclass
-from datetime import timedelta
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 from enum import Enum
-from typing import Dict, Any, List, Optional
-from django.db.models import Sum, Count, Avg, Q
+from typing import Dict, Any, List, Optional, Tuple
+from django.db.models import Sum, Count, Min, Q, Value
+from django.db.models.functions import Abs, Coalesce, NullIf, TruncDate
 from django.utils import timezone
 
 from apps.banking.models import Transaction, BankAccount, Bill
+from apps.reports.models import CategoryStats
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +57,76 @@ class Alert:
         }
 
 
+@dataclass
+class AlertsSnapshot:
+    """
+    Everything the alert checks read, loaded once per generate_alerts() call.
+
+    days holds transaction totals per local day, type and category over the
+    last LOOKBACK_DAYS (and any future-dated rows); bills holds open-bill
+    aggregates, accounts the active accounts and category_stats the running
+    per-category statistics (CategoryStats) over the whole history.
+    """
+    days: List[Dict[str, Any]] = field(default_factory=list)
+    bills: Dict[str, Any] = field(default_factory=dict)
+    accounts: List[Dict[str, Any]] = field(default_factory=list)
+    category_stats: List[Dict[str, Any]] = field(default_factory=list)
+
+    def totals(self, start: date, end: Optional[date] = None, transaction_type: Optional[str] = None) -> Dict[str, Any]:
+        """Income, expenses and transaction count for days in [start, end] (end=None: no upper bound)."""
+        income = Decimal('0')
+        expenses = Decimal('0')
+        count = 0
+        for row in self.days:
+            if row['day'] < start or (end is not None and row['day'] > end):
+                continue
+            if transaction_type and row['type'] != transaction_type:
+                continue
+            if row['type'] == 'CREDIT':
+                income += row['total']
+            else:
+                expenses += abs(row['total'])
+            count += row['count']
+        return {'income': income, 'expenses': expenses, 'count': count}
+
+    def expenses_by_category(self, start: date, end: Optional[date] = None) -> Dict[str, Decimal]:
+        """Expenses grouped by category for days in [start, end]."""
+        categories = {}
+        for row in self.days:
+            if row['type'] != 'DEBIT' or row['day'] < start or (end is not None and row['day'] > end):
+                continue
+            categories[row['category']] = categories.get(row['category'], Decimal('0')) + abs(row['total'])
+        return categories
+
+    def monthly_expenses_by_category(
+        self, month_start: date
+    ) -> Optional[Tuple[Dict[str, Decimal], Dict[str, Decimal]]]:
+        """
+        Expenses per category in the month starting at month_start and in the
+        month before, read from the category statistics.
+
+        Returns None when a category already has transactions dated after
+        that month: its window has moved past the months asked for.
+        """
+        previous_start = (month_start - timedelta(days=1)).replace(day=1)
+        current, previous = {}, {}
+        for stats in self.category_stats:
+            if stats['type'] != 'DEBIT' or stats['month'] is None:
+                continue
+            if stats['month'] > month_start:
+                return None
+            if stats['month'] == month_start:
+                amounts = ((current, stats['month_total']), (previous, stats['previous_month_total']))
+            elif stats['month'] == previous_start:
+                amounts = ((previous, stats['month_total']),)
+            else:
+                continue
+            for totals, amount in amounts:
+                if amount:
+                    totals[stats['category']] = totals.get(stats['category'], Decimal('0')) + amount
+        return current, previous
+
+
 class AlertsService:
     """
     Generates rule-based financial alerts.
@@ -70,15 +142,23 @@ class AlertsService:
     SAVINGS_RATE_TARGET = 0.1  # 10% savings rate
     CREDIT_CARD_UTILIZATION_WARNING = 0.7  # 70%
     CREDIT_CARD_UTILIZATION_CRITICAL = 0.9  # 90%
+    UNUSUAL_TRANSACTION_ZSCORE = 3  # standard deviations above the category mean
+    UNUSUAL_TRANSACTION_MULTIPLIER = 5  # x the average expense, for categories with little history
+    UNUSUAL_TRANSACTION_MIN_AMOUNT = 500
+    MIN_CATEGORY_SAMPLES = 10  # transactions needed to trust a category's statistics
+    LOOKBACK_DAYS = 90  # longest window any check looks at
 
     def __init__(self, user):
         self.user = user
-        self.today = timezone.now().date()
+        self.today = timezone.localdate()
         self.alerts: List[Alert] = []
+        self.snapshot: Optional[AlertsSnapshot] = None
 
     def generate_alerts(self) -> List[Dict[str, Any]]:
         """Generate all alerts for the user."""
         try:
+            self.snapshot = self._load_snapshot()
+
             # Run all alert checks
             self._check_overdue_bills()
             self._check_upcoming_bills()
@@ -112,38 +192,92 @@ class AlertsService:
         """Add an alert to the list."""
         self.alerts.append(alert)
 
+    def _day_start(self, day: date) -> datetime:
+        """Aware datetime at the start of a day in the current timezone."""
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def _load_snapshot(self) -> AlertsSnapshot:
+        """
+        Load the data shared by all checks: 4 queries (transactions grouped
+        by day/type/category, open-bill aggregates, active accounts, category
+        statistics).
+        """
+        days = Transaction.objects.filter(
+            account__connection__user=self.user,
+            date__gte=self._day_start(self.today - timedelta(days=self.LOOKBACK_DAYS))
+        ).annotate(
+            day=TruncDate('date'),
+            category=Coalesce('user_category__name', NullIf('pluggy_category', Value('')), Value('Outros'))
+        ).values('day', 'type', 'category').annotate(
+            total=Sum('amount'),
+            count=Count('id')
+        ).order_by()
+
+        open_bills = Q(status__in=['pending', 'partially_paid'])
+        payable = open_bills & Q(type='payable')
+        overdue_payable = payable & Q(due_date__lt=self.today)
+        very_old_payable = payable & Q(due_date__lt=self.today - timedelta(days=self.OVERDUE_CRITICAL_DAYS))
+        upcoming_payable = payable & Q(due_date__gte=self.today, due_date__lte=self.today + timedelta(days=7))
+        receivable = open_bills & Q(type='receivable')
+        overdue_receivable = receivable & Q(due_date__lt=self.today)
+
+        bills = Bill.objects.filter(user=self.user).filter(open_bills).aggregate(
+            overdue_total=Sum('amount', filter=overdue_payable, default=0),
+            overdue_count=Count('id', filter=overdue_payable),
+            very_old_total=Sum('amount', filter=very_old_payable, default=0),
+            very_old_count=Count('id', filter=very_old_payable),
+            upcoming_total=Sum('amount', filter=upcoming_payable, default=0),
+            upcoming_count=Count('id', filter=upcoming_payable),
+            receivable_total=Sum('amount', filter=receivable, default=0),
+            overdue_receivable_total=Sum('amount', filter=overdue_receivable, default=0),
+            overdue_receivable_count=Count('id', filter=overdue_receivable),
+            oldest_overdue_receivable=Min('due_date', filter=overdue_receivable),
+        )
+
+        accounts = BankAccount.objects.filter(
+            connection__user=self.user,
+            is_active=True
+        ).values('name', 'type', 'balance', 'credit_limit')
+
+        category_stats = CategoryStats.objects.filter(user=self.user).annotate(
+            category=Coalesce('user_category__name', NullIf('pluggy_category', Value('')), Value('Outros'))
+        ).values(
+            'type', 'user_category_id', 'pluggy_category_id', 'category', 'count', 'total',
+            'mean', 'm2', 'month', 'month_total', 'previous_month_total'
+        )
+
+        return AlertsSnapshot(
+            days=list(days),
+            bills=bills,
+            accounts=list(accounts),
+            category_stats=list(category_stats)
+        )
+
     # ==================== BILL ALERTS ====================
 
     def _check_overdue_bills(self):
         """Check for overdue bills - CRITICAL priority."""
-        overdue_bills = Bill.objects.filter(
-            user=self.user,
-            type='payable',
-            status__in=['pending', 'partially_paid'],
-            due_date__lt=self.today
-        )
+        bills = self.snapshot.bills
+        count = bills['overdue_count']
 
-        if not overdue_bills.exists():
+        if not count:
             return
 
-        total_overdue = overdue_bills.aggregate(total=Sum('amount'))['total'] or 0
-        count = overdue_bills.count()
+        total_overdue = bills['overdue_total']
 
         # Check for very old bills (30+ days)
-        very_old = overdue_bills.filter(
-            due_date__lt=self.today - timedelta(days=self.OVERDUE_CRITICAL_DAYS)
-        )
+        very_old_count = bills['very_old_count']
 
-        if very_old.exists():
-            very_old_total = very_old.aggregate(total=Sum('amount'))['total'] or 0
+        if very_old_count:
+            very_old_total = bills['very_old_total']
             self._add_alert(Alert(
                 category=AlertCategory.BILLS,
                 severity=AlertSeverity.CRITICAL,
                 title=f"Contas vencidas há mais de 30 dias",
-                description=f"Você tem R$ {float(very_old_total):,.2f} em {very_old.count()} conta(s) vencida(s) há mais de 30 dias. Isso pode gerar juros, multas e negativação.",
+                description=f"Você tem R$ {float(very_old_total):,.2f} em {very_old_count} conta(s) vencida(s) há mais de 30 dias. Isso pode gerar juros, multas e negativação.",
                 action="Priorize o pagamento ou negocie com os credores imediatamente.",
                 value=float(very_old_total),
-                metadata={"count": very_old.count(), "days_overdue": 30}
+                metadata={"count": very_old_count, "days_overdue": 30}
             ))
         elif count > 0:
             self._add_alert(Alert(
@@ -158,21 +292,12 @@ class AlertsService:
 
     def _check_upcoming_bills(self):
         """Check for bills due in the next 7 days."""
-        next_week = self.today + timedelta(days=7)
-
-        upcoming = Bill.objects.filter(
-            user=self.user,
-            type='payable',
-            status__in=['pending', 'partially_paid'],
-            due_date__gte=self.today,
-            due_date__lte=next_week
-        )
+        count = self.snapshot.bills['upcoming_count']
 
-        if not upcoming.exists():
+        if not count:
             return
 
-        total = upcoming.aggregate(total=Sum('amount'))['total'] or 0
-        count = upcoming.count()
+        total = self.snapshot.bills['upcoming_total']
 
         # Check if user has enough balance
         total_balance = self._get_total_balance()
@@ -236,15 +361,9 @@ class AlertsService:
         """Check if expenses exceed income for the last 2 months."""
         two_months_ago = self.today - timedelta(days=60)
 
-        transactions = Transaction.objects.filter(
-            account__connection__user=self.user,
-            date__gte=two_months_ago
-        )
-
-        income = transactions.filter(type='CREDIT').aggregate(
-            total=Sum('amount'))['total'] or Decimal('0')
-        expenses = abs(transactions.filter(type='DEBIT').aggregate(
-            total=Sum('amount'))['total'] or Decimal('0'))
+        totals = self.snapshot.totals(two_months_ago)
+        income = totals['income']
+        expenses = totals['expenses']
 
         if expenses > income and income > 0:
             deficit = float(expenses - income)
@@ -267,25 +386,14 @@ class AlertsService:
         """Check if one category dominates expenses."""
         thirty_days_ago = self.today - timedelta(days=30)
 
-        expenses = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type='DEBIT',
-            date__gte=thirty_days_ago
-        )
-
-        total_expenses = abs(expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0'))
+        categories = self.snapshot.expenses_by_category(thirty_days_ago)
+        total_expenses = sum(categories.values(), Decimal('0'))
 
         if total_expenses == 0:
             return
 
-        # Group by category
-        categories = {}
-        for txn in expenses:
-            cat = txn.user_category.name if txn.user_category else (txn.pluggy_category or 'Outros')
-            categories[cat] = categories.get(cat, Decimal('0')) + abs(txn.amount)
-
         # Check for concentration
-        for cat, amount in categories.items():
+        for cat, amount in sorted(categories.items(), key=lambda item: item[1], reverse=True):
             pct = float(amount) / float(total_expenses)
             if pct > self.HIGH_EXPENSE_CATEGORY_THRESHOLD:
                 self._add_alert(Alert(
@@ -305,9 +413,14 @@ class AlertsService:
         last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
         last_month_end = current_month_start - timedelta(days=1)
 
-        # Get expenses by category for both periods
-        current_expenses = self._get_expenses_by_category(current_month_start, self.today)
-        last_expenses = self._get_expenses_by_category(last_month_start, last_month_end)
+        # Get expenses by category for both periods (running totals, or the
+        # daily rows when future-dated transactions moved the window ahead)
+        monthly = self.snapshot.monthly_expenses_by_category(current_month_start)
+        if monthly is not None:
+            current_expenses, last_expenses = monthly
+        else:
+            current_expenses = self.snapshot.expenses_by_category(current_month_start, self.today)
+            last_expenses = self.snapshot.expenses_by_category(last_month_start, last_month_end)
 
         # Days ratio for fair comparison
         days_current = (self.today - current_month_start).days + 1
@@ -340,18 +453,10 @@ class AlertsService:
         thirty_days_ago = self.today - timedelta(days=30)
         sixty_days_ago = self.today - timedelta(days=60)
 
-        recent_income = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type='CREDIT',
-            date__gte=thirty_days_ago
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        previous_income = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type='CREDIT',
-            date__gte=sixty_days_ago,
-            date__lt=thirty_days_ago
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        recent_income = self.snapshot.totals(thirty_days_ago, transaction_type='CREDIT')['income']
+        previous_income = self.snapshot.totals(
+            sixty_days_ago, thirty_days_ago - timedelta(days=1), transaction_type='CREDIT'
+        )['income']
 
         if previous_income > 1000 and recent_income < previous_income * Decimal(str(self.INCOME_DROP_THRESHOLD)):
             drop_pct = ((float(previous_income) - float(recent_income)) / float(previous_income)) * 100
@@ -367,22 +472,16 @@ class AlertsService:
 
     def _check_large_pending_receivables(self):
         """Check for large amounts pending to receive."""
-        receivables = Bill.objects.filter(
-            user=self.user,
-            type='receivable',
-            status__in=['pending', 'partially_paid']
-        )
-
-        total = receivables.aggregate(total=Sum('amount'))['total'] or 0
+        bills = self.snapshot.bills
+        total = bills['receivable_total']
 
         if total > 0:
             # Check overdue receivables
-            overdue = receivables.filter(due_date__lt=self.today)
-            overdue_total = overdue.aggregate(total=Sum('amount'))['total'] or 0
+            overdue_total = bills['overdue_receivable_total']
 
             if overdue_total > 1000:
-                oldest = overdue.order_by('due_date').first()
-                days_overdue = (self.today - oldest.due_date).days if oldest else 0
+                oldest_due_date = bills['oldest_overdue_receivable']
+                days_overdue = (self.today - oldest_due_date).days if oldest_due_date else 0
 
                 self._add_alert(Alert(
                     category=AlertCategory.INCOME,
@@ -391,7 +490,7 @@ class AlertsService:
                     description=f"Você tem valores a receber vencidos há até {days_overdue} dias.",
                     action="Entre em contato com os devedores para cobrar ou renegociar.",
                     value=float(overdue_total),
-                    metadata={"count": overdue.count(), "days_overdue": days_overdue}
+                    metadata={"count": bills['overdue_receivable_count'], "days_overdue": days_overdue}
                 ))
 
     # ==================== SAVINGS ALERTS ====================
@@ -400,15 +499,9 @@ class AlertsService:
         """Check if user is saving enough."""
         thirty_days_ago = self.today - timedelta(days=30)
 
-        transactions = Transaction.objects.filter(
-            account__connection__user=self.user,
-            date__gte=thirty_days_ago
-        )
-
-        income = transactions.filter(type='CREDIT').aggregate(
-            total=Sum('amount'))['total'] or Decimal('0')
-        expenses = abs(transactions.filter(type='DEBIT').aggregate(
-            total=Sum('amount'))['total'] or Decimal('0'))
+        totals = self.snapshot.totals(thirty_days_ago)
+        income = totals['income']
+        expenses = totals['expenses']
 
         if income < 1000:
             return  # Not enough data
@@ -435,38 +528,34 @@ class AlertsService:
 
     def _check_credit_card_utilization(self):
         """Check credit card utilization."""
-        credit_cards = BankAccount.objects.filter(
-            connection__user=self.user,
-            type='CREDIT_CARD',
-            is_active=True
-        )
+        credit_cards = [account for account in self.snapshot.accounts if account['type'] == 'CREDIT_CARD']
 
         for card in credit_cards:
-            if not card.credit_limit or card.credit_limit <= 0:
+            if not card['credit_limit'] or card['credit_limit'] <= 0:
                 continue
 
-            used = abs(float(card.balance)) if card.balance < 0 else 0
-            utilization = used / float(card.credit_limit)
+            used = abs(float(card['balance'])) if card['balance'] < 0 else 0
+            utilization = used / float(card['credit_limit'])
 
             if utilization >= self.CREDIT_CARD_UTILIZATION_CRITICAL:
                 self._add_alert(Alert(
                     category=AlertCategory.SPENDING,
                     severity=AlertSeverity.CRITICAL,
                     title=f"Cartão quase no limite ({utilization*100:.0f}%)",
-                    description=f"O cartão '{card.name}' está com {utilization*100:.0f}% do limite usado (R$ {used:,.2f} de R$ {float(card.credit_limit):,.2f}).",
+                    description=f"O cartão '{card['name']}' está com {utilization*100:.0f}% do limite usado (R$ {used:,.2f} de R$ {float(card['credit_limit']):,.2f}).",
                     action="Evite novos gastos neste cartão e priorize o pagamento da fatura.",
                     value=used,
-                    metadata={"card": card.name, "utilization": utilization * 100, "limit": float(card.credit_limit)}
+                    metadata={"card": card['name'], "utilization": utilization * 100, "limit": float(card['credit_limit'])}
                 ))
             elif utilization >= self.CREDIT_CARD_UTILIZATION_WARNING:
                 self._add_alert(Alert(
                     category=AlertCategory.SPENDING,
                     severity=AlertSeverity.MEDIUM,
                     title=f"Cartão com {utilization*100:.0f}% do limite",
-                    description=f"O cartão '{card.name}' está com uso elevado.",
+                    description=f"O cartão '{card['name']}' está com uso elevado.",
                     action="Monitore os gastos para não estourar o limite.",
                     value=used,
-                    metadata={"card": card.name, "utilization": utilization * 100}
+                    metadata={"card": card['name'], "utilization": utilization * 100}
                 ))
 
     # ==================== ANOMALY ALERTS ====================
@@ -478,85 +567,103 @@ class AlertsService:
         pass  # TODO: Implement when recurring transaction tracking is available
 
     def _check_unusual_transactions(self):
-        """Check for unusually large transactions."""
+        """
+        Check for transactions far above the usual amount of their category.
+
+        The usual amount comes from the category statistics (mean and
+        standard deviation over the whole history); categories with fewer
+        than MIN_CATEGORY_SAMPLES transactions fall back to a multiple of the
+        overall average expense.
+        """
         thirty_days_ago = self.today - timedelta(days=30)
-        ninety_days_ago = self.today - timedelta(days=90)
 
-        # Get average transaction size
-        historical = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type='DEBIT',
-            date__gte=ninety_days_ago,
-            date__lt=thirty_days_ago
-        )
-
-        avg_expense = historical.aggregate(avg=Avg('amount'))['avg']
-        if not avg_expense:
+        debit_stats = [stats for stats in self.snapshot.category_stats if stats['type'] == 'DEBIT' and stats['count']]
+        if not debit_stats:
             return
 
-        avg_expense = abs(float(avg_expense))
+        expense_count = sum(stats['count'] for stats in debit_stats)
+        avg_expense = float(sum((stats['total'] for stats in debit_stats), Decimal('0'))) / expense_count
+        default_threshold = max(avg_expense * self.UNUSUAL_TRANSACTION_MULTIPLIER, self.UNUSUAL_TRANSACTION_MIN_AMOUNT)
+
+        thresholds = {}
+        for stats in debit_stats:
+            if stats['count'] < self.MIN_CATEGORY_SAMPLES:
+                continue
+            std_dev = (stats['m2'] / (stats['count'] - 1)) ** 0.5
+            threshold = max(stats['mean'] + self.UNUSUAL_TRANSACTION_ZSCORE * std_dev, self.UNUSUAL_TRANSACTION_MIN_AMOUNT)
+            thresholds[(stats['user_category_id'], stats['pluggy_category_id'])] = (threshold, stats)
 
-        # Find recent transactions that are 5x the average
-        threshold = avg_expense * 5
-        if threshold < 500:
-            threshold = 500  # Minimum threshold
+        lowest = min([default_threshold] + [threshold for threshold, _ in thresholds.values()])
 
-        unusual = Transaction.objects.filter(
+        # Only query run outside the snapshot: candidates above the lowest threshold
+        candidates = Transaction.objects.filter(
             account__connection__user=self.user,
             type='DEBIT',
-            date__gte=thirty_days_ago,
-            amount__lt=-threshold  # DEBIT amounts are negative
+            date__gte=self._day_start(thirty_days_ago)
+        ).annotate(
+            abs_amount=Abs('amount')
+        ).filter(
+            abs_amount__gt=lowest
+        ).order_by('-abs_amount').only(
+            'description', 'amount', 'date', 'user_category_id', 'pluggy_category_id'
         )
 
-        for txn in unusual[:3]:  # Limit to top 3
+        found = 0
+        for txn in candidates.iterator(chunk_size=100):
+            threshold, stats = thresholds.get(
+                (txn.user_category_id, txn.pluggy_category_id or ''), (default_threshold, None)
+            )
+            if txn.abs_amount <= threshold:
+                continue
+
+            if stats:
+                average = stats['mean']
+                description = (
+                    f"'{txn.description}' em {txn.date.strftime('%d/%m')} é significativamente maior que seus "
+                    f"gastos normais em '{stats['category']}' (média: R$ {average:,.2f})."
+                )
+            else:
+                average = avg_expense
+                description = (
+                    f"'{txn.description}' em {txn.date.strftime('%d/%m')} é significativamente maior que seus "
+                    f"gastos normais (média: R$ {average:,.2f})."
+                )
+
             self._add_alert(Alert(
                 category=AlertCategory.ANOMALY,
                 severity=AlertSeverity.LOW,
                 title=f"Gasto atípico: R$ {abs(float(txn.amount)):,.2f}",
-                description=f"'{txn.description}' em {txn.date.strftime('%d/%m')} é significativamente maior que seus gastos normais (média: R$ {avg_expense:,.2f}).",
+                description=description,
                 action="Verifique se esse gasto era esperado e está correto.",
                 value=abs(float(txn.amount)),
-                metadata={"description": txn.description, "date": txn.date.isoformat(), "average": avg_expense}
+                metadata={
+                    "description": txn.description,
+                    "date": txn.date.isoformat(),
+                    "average": average,
+                    "category": stats['category'] if stats else None,
+                    "threshold": threshold,
+                }
             ))
 
+            found += 1
+            if found == 3:  # Limit to top 3
+                break
+
     # ==================== HELPER METHODS ====================
 
     def _get_total_balance(self) -> float:
         """Get total balance across all accounts (excluding credit cards)."""
-        accounts = BankAccount.objects.filter(
-            connection__user=self.user,
-            is_active=True
-        ).exclude(type='CREDIT_CARD')
-
-        return sum(float(acc.balance) for acc in accounts)
+        return sum(
+            float(account['balance'])
+            for account in self.snapshot.accounts
+            if account['type'] != 'CREDIT_CARD'
+        )
 
     def _get_average_monthly_expenses(self) -> float:
         """Get average monthly expenses over last 3 months."""
         ninety_days_ago = self.today - timedelta(days=90)
 
-        total = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type='DEBIT',
-            date__gte=ninety_days_ago
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        return abs(float(total)) / 3
-
-    def _get_expenses_by_category(self, start_date, end_date) -> Dict[str, Decimal]:
-        """Get expenses grouped by category for a period."""
-        expenses = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type='DEBIT',
-            date__gte=start_date,
-            date__lte=end_date
-        )
-
-        categories = {}
-        for txn in expenses:
-            cat = txn.user_category.name if txn.user_category else (txn.pluggy_category or 'Outros')
-            categories[cat] = categories.get(cat, Decimal('0')) + abs(txn.amount)
-
-        return categories
+        return float(self.snapshot.totals(ninety_days_ago, transaction_type='DEBIT')['expenses']) / 3
 
 
 def generate_alerts_for_user(user) -> List[Dict[str, Any]]:
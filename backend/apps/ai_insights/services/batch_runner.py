@@ -0,0 +1,86 @@
+"""
+Batch runner - generates insights for several users concurrently.
+
+Each user still goes through InsightGenerator (validation, aggregation,
+reuse, saving), but the OpenAI calls are awaited on one pooled
+httpx.AsyncClient, so a single worker keeps up to `concurrency` requests in
+flight instead of blocking on one at a time. Database work runs through
+sync_to_async on a single thread; the shared token bucket still throttles
+the requests themselves.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connections
+
+from apps.ai_insights.services.insight_generator import InsightGenerator
+from apps.ai_insights.services.openai_service import OpenAIService
+
+logger = logging.getLogger(__name__)
+
+
+def _get_user(user_id):
+    User = get_user_model()
+    return User.objects.filter(id=user_id).first()
+
+
+async def _generate_for_user(user_id, client, semaphore: asyncio.Semaphore, force: bool) -> Dict[str, Any]:
+    async with semaphore:
+        started = time.perf_counter()
+        user = await sync_to_async(_get_user)(user_id)
+        if user is None:
+            logger.error(f'❌ User {user_id} not found')
+            return {'user_id': user_id, 'success': False, 'error': 'User not found'}
+
+        insight = await InsightGenerator(user).generate_async(client, force=force)
+        if insight is None:
+            return {'user_id': user_id, 'success': False, 'error': 'No insight generated'}
+
+        return {
+            'user_id': user_id,
+            'success': not insight.has_error,
+            'insight_id': str(insight.id),
+            'reused': insight.reused_from_id is not None,
+            'tokens_used': insight.tokens_used,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+
+
+async def _run(user_ids: List[int], concurrency: int, force: bool) -> List[Dict[str, Any]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        async with OpenAIService().async_client(max_connections=concurrency) as client:
+            results = await asyncio.gather(
+                *(_generate_for_user(user_id, client, semaphore, force) for user_id in user_ids),
+                return_exceptions=True
+            )
+    finally:
+        # Connections opened by the sync_to_async thread
+        await sync_to_async(connections.close_all)()
+
+    normalized = []
+    for user_id, result in zip(user_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f'❌ Error generating insight for user {user_id}: {str(result)}')
+            result = {'user_id': user_id, 'success': False, 'error': str(result)}
+        normalized.append(result)
+    return normalized
+
+
+def run_insight_batch(user_ids: List[int], concurrency: int = 5, force: bool = False) -> List[Dict[str, Any]]:
+    """
+    Generate insights for user_ids, at most `concurrency` at a time.
+
+    Must be called from synchronous code (a Celery task or management
+    command), not from a running event loop.
+
+    Returns:
+        One result dict per user, in the order given
+    """
+    if not user_ids:
+        return []
+    return asyncio.run(_run(list(user_ids), max(1, concurrency), force))
@@ -3,13 +3,15 @@ Data Aggregator for AI Insights
 Prepares financial data for AI analysis
 """
 import logging
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 from typing import Dict, Any, List
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Q, F, Case, When, Value, CharField, Window
+from django.db.models.functions import Coalesce, NullIf, RowNumber, TruncMonth
 from django.utils import timezone
 
-from apps.banking.models import Transaction, BankAccount, Bill, Category
+from apps.banking.models import Transaction, BankAccount, Bill
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,11 @@ logger = logging.getLogger(__name__)
 class DataAggregator:
     """
     Aggregates financial data for AI analysis.
+
+    Transaction totals come from a single grouped query (month x period x
+    type x category) over the analysis window plus the previous window of
+    the same length; every section is derived from those buckets in memory.
+    Periods cover whole days in the current timezone.
     """
 
     def __init__(self, user):
@@ -32,24 +39,26 @@ class DataAggregator:
         """
         try:
             # Get date ranges
-            end_date = timezone.now().date()
+            end_date = timezone.localdate()
             start_date = end_date - timedelta(days=90)  # 3 months
 
             # Get company info
             company = getattr(self.user, 'company', None)
 
+            buckets = self._get_buckets(start_date, end_date)
+
             # Build aggregated data
             data = {
                 'context': self._get_context(company, start_date, end_date),
                 'data': {
-                    'monthly_summaries': self._get_monthly_summaries(start_date, end_date),
-                    'current_month_summary': self._get_current_month_summary(),
-                    'top_expense_categories': self._get_top_categories('expense', start_date, end_date),
-                    'top_income_categories': self._get_top_categories('income', start_date, end_date),
+                    'monthly_summaries': self._get_monthly_summaries(buckets, start_date, end_date),
+                    'current_month_summary': self._get_current_month_summary(buckets),
+                    'top_expense_categories': self._get_top_categories(buckets, 'expense'),
+                    'top_income_categories': self._get_top_categories(buckets, 'income'),
                     'top_transactions': self._get_top_transactions(start_date, end_date),
                     'bills_summary': self._get_bills_summary(),
                     'account_balances': self._get_account_balances(),
-                    'trends': self._get_trends(start_date, end_date)
+                    'trends': self._get_trends(buckets)
                 }
             }
 
@@ -59,6 +68,62 @@ class DataAggregator:
             logger.error(f'Error aggregating data for user {self.user.id}: {str(e)}')
             raise
 
+    @staticmethod
+    def _day_start(day: date) -> datetime:
+        """Aware datetime at the start of a day in the current timezone."""
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def _get_buckets(self, start_date, end_date) -> List[Dict[str, Any]]:
+        """
+        Transaction totals grouped by month, period, type and category.
+
+        period is 'current' for [start_date, end_date], 'previous' for the
+        same number of days right before start_date and 'other' for the rest
+        of the window (the start of the first month and future-dated rows).
+        """
+        period_days = (end_date - start_date).days
+        previous_start = start_date - timedelta(days=period_days)
+        window_start = min(previous_start, start_date.replace(day=1))
+
+        current_start = self._day_start(start_date)
+        current_end = self._day_start(end_date + timedelta(days=1))
+
+        buckets = Transaction.objects.filter(
+            account__connection__user=self.user,
+            date__gte=self._day_start(window_start)
+        ).annotate(
+            month=TruncMonth('date'),
+            period=Case(
+                When(date__gte=current_end, then=Value('other')),
+                When(date__gte=current_start, then=Value('current')),
+                When(date__gte=self._day_start(previous_start), then=Value('previous')),
+                default=Value('other'),
+                output_field=CharField()
+            ),
+            category=Coalesce('user_category__name', NullIf('pluggy_category', Value('')))
+        ).values('month', 'period', 'type', 'category').annotate(
+            total=Sum('amount'),
+            count=Count('id')
+        ).order_by()
+
+        return [
+            {**bucket, 'month': timezone.localtime(bucket['month']).date()}
+            for bucket in buckets
+        ]
+
+    @staticmethod
+    def _sum_buckets(buckets) -> Dict[str, Any]:
+        income = Decimal('0')
+        expenses = Decimal('0')
+        count = 0
+        for bucket in buckets:
+            if bucket['type'] == 'CREDIT':
+                income += bucket['total']
+            elif bucket['type'] == 'DEBIT':
+                expenses += bucket['total']
+            count += bucket['count']
+        return {'income': income, 'expenses': abs(expenses), 'count': count}
+
     def _get_context(self, company, start_date, end_date) -> Dict[str, str]:
         """Get context information about the company and analysis period."""
         from apps.ai_insights.models import AIInsight
@@ -84,93 +149,54 @@ class DataAggregator:
             'previous_analysis_date': previous_insight.generated_at.strftime('%d/%m/%Y') if previous_insight else 'Primeira análise'
         }
 
-    def _get_monthly_summaries(self, start_date, end_date) -> List[Dict[str, Any]]:
+    def _get_monthly_summaries(self, buckets, start_date, end_date) -> List[Dict[str, Any]]:
         """Get monthly income/expense summaries for the period."""
+        by_month = defaultdict(list)
+        for bucket in buckets:
+            by_month[bucket['month']].append(bucket)
+
         summaries = []
 
-        current = start_date
+        current = start_date.replace(day=1)
         while current <= end_date:
-            month_start = current.replace(day=1)
-            next_month = (month_start + timedelta(days=32)).replace(day=1)
-            month_end = next_month - timedelta(days=1)
-
-            transactions = Transaction.objects.filter(
-                account__connection__user=self.user,
-                date__gte=month_start,
-                date__lte=month_end
-            )
-
-            income = transactions.filter(type='CREDIT').aggregate(
-                total=Sum('amount')
-            )['total'] or Decimal('0')
-
-            expenses = transactions.filter(type='DEBIT').aggregate(
-                total=Sum('amount')
-            )['total'] or Decimal('0')
+            totals = self._sum_buckets(by_month.get(current, []))
 
             summaries.append({
-                'month': month_start.strftime('%b/%y'),
-                'income': float(income),
-                'expenses': float(abs(expenses)),
-                'net': float(income - abs(expenses)),
-                'transaction_count': transactions.count()
+                'month': current.strftime('%b/%y'),
+                'income': float(totals['income']),
+                'expenses': float(totals['expenses']),
+                'net': float(totals['income'] - totals['expenses']),
+                'transaction_count': totals['count']
             })
 
-            current = next_month
+            current = (current + timedelta(days=32)).replace(day=1)
 
         return summaries
 
-    def _get_current_month_summary(self) -> Dict[str, Any]:
-        """Get summary for the current month."""
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        transactions = Transaction.objects.filter(
-            account__connection__user=self.user,
-            date__gte=month_start
-        )
-
-        income = transactions.filter(type='CREDIT').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
+    def _get_current_month_summary(self, buckets) -> Dict[str, Any]:
+        """Get summary for the current month (including future-dated transactions)."""
+        month_start = timezone.localdate().replace(day=1)
 
-        expenses = transactions.filter(type='DEBIT').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
+        totals = self._sum_buckets(b for b in buckets if b['month'] >= month_start)
 
         return {
-            'income': float(income),
-            'expenses': float(abs(expenses)),
-            'balance': float(income - abs(expenses)),
-            'transactions_count': transactions.count()
+            'income': float(totals['income']),
+            'expenses': float(totals['expenses']),
+            'balance': float(totals['income'] - totals['expenses']),
+            'transactions_count': totals['count']
         }
 
-    def _get_top_categories(self, category_type: str, start_date, end_date, limit: int = 5) -> List[Dict[str, Any]]:
-        """Get top expense or income categories."""
+    def _get_top_categories(self, buckets, category_type: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get top expense or income categories of the current period."""
         transaction_type = 'DEBIT' if category_type == 'expense' else 'CREDIT'
 
-        # Get transactions with categories
-        transactions = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type=transaction_type,
-            date__gte=start_date,
-            date__lte=end_date
-        ).exclude(
-            Q(user_category__isnull=True) & Q(pluggy_category='')
-        )
-
         # Aggregate by category
-        categories = {}
-        for txn in transactions:
-            cat_name = txn.user_category.name if txn.user_category else txn.pluggy_category
-            if not cat_name:
-                cat_name = 'Sem categoria'
-
-            if cat_name not in categories:
-                categories[cat_name] = {'total': 0, 'count': 0}
-
-            categories[cat_name]['total'] += abs(float(txn.amount))
-            categories[cat_name]['count'] += 1
+        categories = defaultdict(lambda: {'total': Decimal('0'), 'count': 0})
+        for bucket in buckets:
+            if bucket['period'] != 'current' or bucket['type'] != transaction_type or not bucket['category']:
+                continue
+            categories[bucket['category']]['total'] += abs(bucket['total'])
+            categories[bucket['category']]['count'] += bucket['count']
 
         # Sort and limit
         sorted_categories = sorted(
@@ -182,141 +208,110 @@ class DataAggregator:
         return [
             {
                 'category': name,
-                'total': round(data['total'], 2),
+                'total': round(float(data['total']), 2),
                 'count': data['count']
             }
             for name, data in sorted_categories
         ]
 
     def _get_top_transactions(self, start_date, end_date, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
-        """Get top income and expense transactions."""
-        top_expenses = Transaction.objects.filter(
+        """Get top income and expense transactions (one query, row number per type)."""
+        transactions = Transaction.objects.filter(
             account__connection__user=self.user,
-            type='DEBIT',
-            date__gte=start_date,
-            date__lte=end_date
-        ).order_by('amount')[:limit]
+            date__gte=self._day_start(start_date),
+            date__lt=self._day_start(end_date + timedelta(days=1))
+        ).annotate(
+            category=Coalesce('user_category__name', 'pluggy_category'),
+            type_rank=Window(
+                expression=RowNumber(),
+                partition_by=[F('type')],
+                order_by=[F('amount').desc(), F('date').desc()]
+            )
+        ).filter(type_rank__lte=limit).order_by('type', 'type_rank').values(
+            'type', 'description', 'amount', 'date', 'category'
+        )
 
-        top_income = Transaction.objects.filter(
-            account__connection__user=self.user,
-            type='CREDIT',
-            date__gte=start_date,
-            date__lte=end_date
-        ).order_by('-amount')[:limit]
+        top = {'top_expenses': [], 'top_income': []}
+        for txn in transactions:
+            key = 'top_income' if txn['type'] == 'CREDIT' else 'top_expenses'
+            top[key].append({
+                'description': txn['description'],
+                'amount': float(abs(txn['amount'])),
+                'date': timezone.localtime(txn['date']).strftime('%d/%m/%Y'),
+                'category': txn['category']
+            })
 
-        return {
-            'top_expenses': [
-                {
-                    'description': txn.description,
-                    'amount': float(abs(txn.amount)),
-                    'date': txn.date.strftime('%d/%m/%Y'),
-                    'category': txn.user_category.name if txn.user_category else txn.pluggy_category
-                }
-                for txn in top_expenses
-            ],
-            'top_income': [
-                {
-                    'description': txn.description,
-                    'amount': float(txn.amount),
-                    'date': txn.date.strftime('%d/%m/%Y'),
-                    'category': txn.user_category.name if txn.user_category else txn.pluggy_category
-                }
-                for txn in top_income
-            ]
-        }
+        return top
 
     def _get_bills_summary(self) -> Dict[str, Any]:
         """Get summary of bills (payable/receivable)."""
-        bills = Bill.objects.filter(user=self.user)
-
-        receivable = bills.filter(type='receivable', status__in=['pending', 'partially_paid'])
-        payable = bills.filter(type='payable', status__in=['pending', 'partially_paid'])
-        overdue = bills.filter(status__in=['pending', 'partially_paid'], due_date__lt=timezone.now().date())
+        open_bills = Q(status__in=['pending', 'partially_paid'])
+        receivable = open_bills & Q(type='receivable')
+        payable = open_bills & Q(type='payable')
+        overdue = open_bills & Q(due_date__lt=timezone.localdate())
+
+        totals = Bill.objects.filter(user=self.user).aggregate(
+            total_receivable=Sum('amount', filter=receivable, default=0),
+            total_payable=Sum('amount', filter=payable, default=0),
+            total_overdue=Sum('amount', filter=overdue, default=0),
+            receivable_count=Count('id', filter=receivable),
+            payable_count=Count('id', filter=payable),
+            overdue_count=Count('id', filter=overdue)
+        )
 
         return {
-            'total_receivable': float(receivable.aggregate(total=Sum('amount'))['total'] or 0),
-            'total_payable': float(payable.aggregate(total=Sum('amount'))['total'] or 0),
-            'total_overdue': float(overdue.aggregate(total=Sum('amount'))['total'] or 0),
-            'receivable_count': receivable.count(),
-            'payable_count': payable.count(),
-            'overdue_count': overdue.count()
+            'total_receivable': float(totals['total_receivable']),
+            'total_payable': float(totals['total_payable']),
+            'total_overdue': float(totals['total_overdue']),
+            'receivable_count': totals['receivable_count'],
+            'payable_count': totals['payable_count'],
+            'overdue_count': totals['overdue_count']
         }
 
     def _get_account_balances(self) -> Dict[str, Any]:
         """Get current account balances."""
-        accounts = BankAccount.objects.filter(
+        accounts = list(BankAccount.objects.filter(
             connection__user=self.user,
             is_active=True
-        )
+        ).values_list('type', 'balance'))
 
         # Total balance (excluding credit cards)
         total_balance = sum(
-            float(acc.balance)
-            for acc in accounts
-            if acc.type not in ['CREDIT_CARD']
+            float(balance)
+            for account_type, balance in accounts
+            if account_type not in ['CREDIT_CARD']
         )
 
         # Credit card debt
         credit_card_debt = sum(
-            float(abs(acc.balance))
-            for acc in accounts
-            if acc.type == 'CREDIT_CARD' and acc.balance < 0
+            float(abs(balance))
+            for account_type, balance in accounts
+            if account_type == 'CREDIT_CARD' and balance < 0
         )
 
         return {
             'total_balance': round(total_balance, 2),
             'credit_card_debt': round(credit_card_debt, 2),
-            'accounts_count': accounts.count(),
-            'account_types': list(accounts.values_list('type', flat=True).distinct())
+            'accounts_count': len(accounts),
+            'account_types': list(dict.fromkeys(account_type for account_type, _ in accounts))
         }
 
-    def _get_trends(self, start_date, end_date) -> Dict[str, Any]:
+    def _get_trends(self, buckets) -> Dict[str, Any]:
         """Calculate trends (comparison with previous period)."""
-        # Current period
-        current_transactions = Transaction.objects.filter(
-            account__connection__user=self.user,
-            date__gte=start_date,
-            date__lte=end_date
-        )
-
-        current_income = current_transactions.filter(type='CREDIT').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
-
-        current_expenses = current_transactions.filter(type='DEBIT').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
-
-        # Previous period (same duration before start_date)
-        period_days = (end_date - start_date).days
-        previous_start = start_date - timedelta(days=period_days)
-        previous_end = start_date - timedelta(days=1)
-
-        previous_transactions = Transaction.objects.filter(
-            account__connection__user=self.user,
-            date__gte=previous_start,
-            date__lte=previous_end
-        )
-
-        previous_income = previous_transactions.filter(type='CREDIT').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
-
-        previous_expenses = previous_transactions.filter(type='DEBIT').aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
+        current = self._sum_buckets(b for b in buckets if b['period'] == 'current')
+        previous = self._sum_buckets(b for b in buckets if b['period'] == 'previous')
 
         # Calculate percentages
-        income_change = self._calculate_percentage_change(previous_income, current_income)
-        expense_change = self._calculate_percentage_change(abs(previous_expenses), abs(current_expenses))
+        income_change = self._calculate_percentage_change(previous['income'], current['income'])
+        expense_change = self._calculate_percentage_change(previous['expenses'], current['expenses'])
 
         return {
             'income_vs_previous_period': f"{income_change:+.1f}%",
             'expenses_vs_previous_period': f"{expense_change:+.1f}%",
-            'current_income': float(current_income),
-            'previous_income': float(previous_income),
-            'current_expenses': float(abs(current_expenses)),
-            'previous_expenses': float(abs(previous_expenses))
+            'current_income': float(current['income']),
+            'previous_income': float(previous['income']),
+            'current_expenses': float(current['expenses']),
+            'previous_expenses': float(previous['expenses'])
         }
 
     def _calculate_percentage_change(self, old_value, new_value) -> float:
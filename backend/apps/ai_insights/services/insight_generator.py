@@ -1,9 +1,13 @@
 """
 Insight Generator - Orchestrates the AI insight generation process
 """
+import hashlib
+import json
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
+from typing import Optional, Tuple
+from asgiref.sync import sync_to_async
 from django.utils import timezone
 from django.db import transaction
 
@@ -19,6 +23,9 @@ class InsightGenerator:
     Orchestrates the process of generating AI insights for a user.
     """
 
+    # Context fields that change on every run without the data changing
+    VOLATILE_CONTEXT_FIELDS = ('period', 'previous_analysis_date')
+
     def __init__(self, user):
         self.user = user
         self.openai_service = OpenAIService()
@@ -39,34 +46,15 @@ class InsightGenerator:
             Exception: If generation fails
         """
         try:
-            # Validate prerequisites
-            self._validate_prerequisites()
-
-            # Check if should generate (unless forced)
-            if not force and not self._should_generate():
-                last_insight = AIInsight.objects.filter(
-                    user=self.user,
-                    has_error=False
-                ).first()
-                logger.info(f'Skipping generation for user {self.user.id} - recent insight exists')
-                return last_insight
-
-            # Aggregate financial data
-            logger.info(f'Aggregating data for user {self.user.id}')
-            analysis_data = self.data_aggregator.aggregate_data()
+            insight, analysis_data, data_hash = self._prepare(force)
+            if insight is not None:
+                return insight
 
             # Generate insights with AI
             logger.info(f'Calling OpenAI API for user {self.user.id}')
             ai_response = self.openai_service.generate_insight(analysis_data)
 
-            # Save insights to database
-            insight = self._save_insight(ai_response, analysis_data)
-
-            # Update config
-            self._update_config()
-
-            logger.info(f'✅ Successfully generated insight {insight.id} for user {self.user.id}')
-            return insight
+            return self._complete(ai_response, analysis_data, data_hash)
 
         except Exception as e:
             logger.error(f'❌ Error generating insight for user {self.user.id}: {str(e)}')
@@ -75,6 +63,81 @@ class InsightGenerator:
             error_insight = self._save_error_insight(str(e))
             return error_insight
 
+    async def generate_async(self, client, force: bool = False) -> AIInsight:
+        """
+        generate() for the batch runner: the database work runs through
+        sync_to_async (one shared thread) and only the OpenAI call is awaited
+        on the shared async HTTP client, so many users can wait on the API at
+        once.
+
+        Args:
+            client: httpx.AsyncClient from OpenAIService.async_client()
+            force: If True, generate even if a recent insight exists
+        """
+        try:
+            insight, analysis_data, data_hash = await sync_to_async(self._prepare)(force)
+            if insight is not None:
+                return insight
+
+            logger.info(f'Calling OpenAI API for user {self.user.id}')
+            ai_response = await self.openai_service.generate_insight_async(analysis_data, client)
+
+            return await sync_to_async(self._complete)(ai_response, analysis_data, data_hash)
+
+        except Exception as e:
+            logger.error(f'❌ Error generating insight for user {self.user.id}: {str(e)}')
+            return await sync_to_async(self._save_error_insight)(str(e))
+
+    def _prepare(self, force: bool) -> Tuple[Optional[AIInsight], Optional[dict], str]:
+        """
+        Everything before the OpenAI call.
+
+        Returns:
+            (insight, analysis_data, data_hash). insight is set when no call
+            is needed (recent insight, or reused result for unchanged data).
+        """
+        # Validate prerequisites
+        self._validate_prerequisites()
+
+        # Check if should generate (unless forced)
+        if not force and not self._should_generate():
+            last_insight = AIInsight.objects.filter(
+                user=self.user,
+                has_error=False
+            ).first()
+            logger.info(f'Skipping generation for user {self.user.id} - recent insight exists')
+            return last_insight, None, ''
+
+        # Aggregate financial data
+        logger.info(f'Aggregating data for user {self.user.id}')
+        analysis_data = self.data_aggregator.aggregate_data()
+        data_hash = self._hash_analysis_data(analysis_data)
+
+        # Same data, model and prompt as an earlier insight: reuse its result
+        previous = AIInsight.objects.filter(
+            user=self.user,
+            data_hash=data_hash,
+            has_error=False
+        ).first()
+        if previous:
+            insight = self._clone_insight(previous, analysis_data)
+            self._update_config()
+            logger.info(f'Reused insight {previous.id} for user {self.user.id} - data unchanged')
+            return insight, analysis_data, data_hash
+
+        return None, analysis_data, data_hash
+
+    def _complete(self, ai_response: dict, analysis_data: dict, data_hash: str) -> AIInsight:
+        """Everything after the OpenAI call."""
+        # Save insights to database
+        insight = self._save_insight(ai_response, analysis_data, data_hash)
+
+        # Update config
+        self._update_config()
+
+        logger.info(f'✅ Successfully generated insight {insight.id} for user {self.user.id}')
+        return insight
+
     def _validate_prerequisites(self):
         """Validate that user has required information for insights."""
         # Check if user has company
@@ -107,7 +170,58 @@ class InsightGenerator:
 
         return not recent_insight
 
-    def _save_insight(self, ai_response: dict, analysis_data: dict) -> AIInsight:
+    def _hash_analysis_data(self, analysis_data: dict) -> str:
+        """
+        SHA-256 of the canonical analysis data (sorted keys, compact JSON,
+        volatile context fields dropped) plus the model and prompt version.
+        """
+        context = {
+            key: value
+            for key, value in analysis_data.get('context', {}).items()
+            if key not in self.VOLATILE_CONTEXT_FIELDS
+        }
+        payload = json.dumps(
+            {
+                'model': self.openai_service.model,
+                'prompt_version': self.openai_service.PROMPT_VERSION,
+                'context': context,
+                'data': analysis_data.get('data', {}),
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _clone_insight(self, source: AIInsight, analysis_data: dict) -> AIInsight:
+        """Save a copy of an earlier insight for the current period (no tokens spent)."""
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=90)
+
+        with transaction.atomic():
+            insight = AIInsight.objects.create(
+                user=self.user,
+                health_score=source.health_score,
+                health_status=source.health_status,
+                summary=source.summary,
+                period_start=start_date,
+                period_end=end_date,
+                alerts=source.alerts,
+                opportunities=source.opportunities,
+                predictions=source.predictions,
+                recommendations=source.recommendations,
+                tokens_used=0,
+                model_version=source.model_version,
+                analysis_data=analysis_data,
+                data_hash=source.data_hash,
+                reused_from_id=source.reused_from_id or source.id,
+                has_error=False
+            )
+
+        return insight
+
+    def _save_insight(self, ai_response: dict, analysis_data: dict, data_hash: str = '') -> AIInsight:
         """Save the AI-generated insight to database."""
         # Calculate period
         end_date = timezone.now().date()
@@ -151,6 +265,7 @@ class InsightGenerator:
                 tokens_used=ai_response.get('tokens_used', 0),
                 model_version=ai_response.get('model_version', 'gpt-4o-mini'),
                 analysis_data=analysis_data,
+                data_hash=data_hash,
                 has_error=False
             )
 
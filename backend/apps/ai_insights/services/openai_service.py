@@ -1,13 +1,17 @@
 """
 OpenAI Service for GPT-4o mini integration
 """
+import asyncio
 import json
 import logging
 import time
 from typing import Dict, Any, Optional
 from decouple import config
+import httpx
 import requests
 
+from apps.ai_insights.services.rate_limiter import get_openai_bucket
+
 logger = logging.getLogger(__name__)
 
 # Retry configuration
@@ -21,12 +25,17 @@ class OpenAIService:
     Service for interacting with OpenAI API (GPT-4o mini).
     """
 
+    # Bump whenever _build_prompt or the system message changes, so insights
+    # cached under the old prompt are no longer reused
+    PROMPT_VERSION = 1
+
     def __init__(self):
         self.api_key = config('OPENAI_API_KEY', default='')
         self.model = 'gpt-4o-mini'
-        self.api_url = 'https://api.openai.com/v1/chat/completions'
+        self.api_url = config('OPENAI_API_URL', default='https://api.openai.com/v1/chat/completions')
         self.connect_timeout = 10  # seconds for connection
         self.read_timeout = 60  # seconds for response
+        self.rate_limit_wait = 120  # max seconds to wait for a request token
 
         if not self.api_key:
             logger.warning('⚠️ OPENAI_API_KEY not configured in environment variables')
@@ -48,28 +57,60 @@ class OpenAIService:
             raise ValueError('OpenAI API key not configured. Please add OPENAI_API_KEY to .env file.')
 
         try:
-            # Build the prompt
-            prompt = self._build_prompt(analysis_data)
-
-            # Validate prompt
-            if not self._validate_prompt(prompt):
-                raise ValueError('Invalid prompt structure')
+            prompt = self._prepare_prompt(analysis_data)
 
             # Call OpenAI API
             response = self._call_api(prompt)
 
-            # Parse and validate response
-            insights = self._parse_response(response)
+            return self._process_response(response)
 
-            if not self._validate_response(insights):
-                raise ValueError('Invalid response structure from AI')
+        except Exception as e:
+            logger.error(f'Error generating insights with OpenAI: {str(e)}')
+            raise
 
-            return insights
+    async def generate_insight_async(self, analysis_data: Dict[str, Any], client: httpx.AsyncClient) -> Dict[str, Any]:
+        """
+        Same as generate_insight, but awaits the API call on a shared
+        httpx.AsyncClient (see async_client()) instead of blocking.
+        """
+        if not self.api_key:
+            raise ValueError('OpenAI API key not configured. Please add OPENAI_API_KEY to .env file.')
+
+        try:
+            prompt = self._prepare_prompt(analysis_data)
+            response = await self._call_api_async(prompt, client)
+            return self._process_response(response)
 
         except Exception as e:
             logger.error(f'Error generating insights with OpenAI: {str(e)}')
             raise
 
+    def async_client(self, max_connections: int = 10) -> httpx.AsyncClient:
+        """Pooled async HTTP client for generate_insight_async (use as async context manager)."""
+        return httpx.AsyncClient(
+            headers=self._headers(),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    def _prepare_prompt(self, analysis_data: Dict[str, Any]) -> str:
+        """Build and validate the prompt."""
+        prompt = self._build_prompt(analysis_data)
+
+        if not self._validate_prompt(prompt):
+            raise ValueError('Invalid prompt structure')
+
+        return prompt
+
+    def _process_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse and validate an API response."""
+        insights = self._parse_response(response)
+
+        if not self._validate_response(insights):
+            raise ValueError('Invalid response structure from AI')
+
+        return insights
+
     def _build_prompt(self, data: Dict[str, Any]) -> str:
         """Build structured prompt for GPT-4o mini."""
 
@@ -140,14 +181,14 @@ Retorne APENAS o JSON, sem texto adicional antes ou depois."""
 
         return True
 
-    def _call_api(self, prompt: str) -> Dict[str, Any]:
-        """Call OpenAI API with the prompt, with retry and exponential backoff."""
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_key}'
         }
 
-        payload = {
+    def _build_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
             'model': self.model,
             'messages': [
                 {
@@ -163,10 +204,19 @@ Retorne APENAS o JSON, sem texto adicional antes ou depois."""
             'response_format': {'type': 'json_object'}
         }
 
+    def _call_api(self, prompt: str) -> Dict[str, Any]:
+        """Call OpenAI API with the prompt, with retry and exponential backoff."""
+        headers = self._headers()
+        payload = self._build_payload(prompt)
+
         last_exception = None
         backoff = INITIAL_BACKOFF
 
         for attempt in range(MAX_RETRIES):
+            # Global request budget shared by all workers
+            if not get_openai_bucket().acquire(timeout=self.rate_limit_wait):
+                raise Exception('Limite de requisições à OpenAI atingido, tente novamente mais tarde')
+
             try:
                 response = requests.post(
                     self.api_url,
@@ -228,7 +278,67 @@ Retorne APENAS o JSON, sem texto adicional antes ou depois."""
         # All retries exhausted
         raise last_exception or Exception('OpenAI API request failed after all retries')
 
-    def _extract_api_error(self, response: requests.Response) -> str:
+    async def _call_api_async(self, prompt: str, client: httpx.AsyncClient) -> Dict[str, Any]:
+        """Async counterpart of _call_api (same retry, backoff and rate limit rules)."""
+        payload = self._build_payload(prompt)
+
+        last_exception = None
+        backoff = INITIAL_BACKOFF
+
+        for attempt in range(MAX_RETRIES):
+            # Global request budget shared by all workers
+            if not await get_openai_bucket().acquire_async(timeout=self.rate_limit_wait):
+                raise Exception('Limite de requisições à OpenAI atingido, tente novamente mais tarde')
+
+            try:
+                response = await client.post(self.api_url, json=payload)
+
+                if response.status_code == 429:
+                    retry_after = int(response.headers.get('Retry-After', backoff))
+                    wait_time = min(retry_after, MAX_BACKOFF)
+                    logger.warning(f'Rate limited (429). Retrying in {wait_time}s (attempt {attempt + 1}/{MAX_RETRIES})')
+                    await asyncio.sleep(wait_time)
+                    backoff = min(backoff * 2, MAX_BACKOFF)
+                    continue
+
+                if response.status_code >= 500:
+                    logger.warning(f'Server error ({response.status_code}). Retrying in {backoff}s (attempt {attempt + 1}/{MAX_RETRIES})')
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, MAX_BACKOFF)
+                    continue
+
+                if response.status_code >= 400:
+                    error_detail = self._extract_api_error(response)
+                    raise Exception(f'OpenAI API error ({response.status_code}): {error_detail}')
+
+                try:
+                    return response.json()
+                except json.JSONDecodeError as e:
+                    logger.error(f'Invalid JSON response from OpenAI: {response.text[:500]}')
+                    raise Exception(f'OpenAI returned invalid JSON: {str(e)}')
+
+            except httpx.ConnectTimeout:
+                last_exception = Exception('Falha ao conectar com OpenAI API (timeout de conexão)')
+                logger.warning(f'Connection timeout (attempt {attempt + 1}/{MAX_RETRIES})')
+            except httpx.ReadTimeout:
+                last_exception = Exception('OpenAI API demorou muito para responder (timeout de leitura)')
+                logger.warning(f'Read timeout (attempt {attempt + 1}/{MAX_RETRIES})')
+            except httpx.ConnectError as e:
+                last_exception = Exception(f'Erro de conexão com OpenAI API: {str(e)}')
+                logger.warning(f'Connection error (attempt {attempt + 1}/{MAX_RETRIES}): {str(e)}')
+            except httpx.HTTPError as e:
+                last_exception = Exception(f'OpenAI API request failed: {str(e)}')
+                logger.warning(f'Request error (attempt {attempt + 1}/{MAX_RETRIES}): {str(e)}')
+
+            # Wait before retry (except on last attempt)
+            if attempt < MAX_RETRIES - 1:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+        # All retries exhausted
+        raise last_exception or Exception('OpenAI API request failed after all retries')
+
+    def _extract_api_error(self, response) -> str:
         """Extract error message from OpenAI API error response."""
         try:
             error_data = response.json()
@@ -0,0 +1,99 @@
+"""
+Shared token bucket for outbound API calls.
+
+The bucket is refilled once per interval and consumed with an atomic
+cache.incr on a per-interval counter, so every worker process sharing the
+cache draws from the same budget. If the cache cannot count (DummyCache, or
+the backend is down) the limiter lets calls through rather than blocking them.
+"""
+import asyncio
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Process-shared rate limit of `rate` tokens per `period` seconds.
+
+    Rates of one or more tokens per second are refilled every second; lower
+    rates get one token every period / rate seconds.
+    """
+
+    def __init__(self, name: str, rate: int, period: float = 60.0):
+        self.name = name
+        self.rate = max(1, rate)
+        self.interval = max(1.0, period / self.rate)
+        self.capacity = max(1, int(self.rate * self.interval / period))
+        self._warned = False
+
+    def _key(self, window: int) -> str:
+        return f'ratelimit:{self.name}:{window}'
+
+    def try_acquire(self) -> bool:
+        """Take one token from the current interval, without waiting."""
+        window = int(time.time() // self.interval)
+        key = self._key(window)
+        try:
+            cache.add(key, 0, int(self.interval) + 60)
+            count = cache.incr(key)
+        except Exception as e:
+            # ValueError: the backend did not keep the counter (DummyCache)
+            if not self._warned:
+                logger.warning(f'Rate limiter {self.name} disabled, cache cannot count: {e!r}')
+                self._warned = True
+            return True
+        return count <= self.capacity
+
+    def acquire(self, timeout: float = 120.0) -> bool:
+        """
+        Wait for a token. Returns False if none was available within timeout.
+
+        Waiters sleep until the next refill plus a little jitter, so they do
+        not all hit the new interval at the same instant.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire():
+                return True
+
+            wait = self._next_wait()
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def _next_wait(self) -> float:
+        """Seconds until the next refill, plus jitter."""
+        return self.interval - (time.time() % self.interval) + random.uniform(0, self.interval * 0.25)
+
+    async def acquire_async(self, timeout: float = 120.0) -> bool:
+        """acquire() for coroutines: waits with asyncio.sleep instead of blocking."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire():
+                return True
+
+            wait = self._next_wait()
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+_openai_bucket = None
+
+
+def get_openai_bucket() -> TokenBucket:
+    """Token bucket for OpenAI requests (OPENAI_REQUESTS_PER_MINUTE)."""
+    global _openai_bucket
+    if _openai_bucket is None:
+        _openai_bucket = TokenBucket(
+            'openai',
+            rate=getattr(settings, 'OPENAI_REQUESTS_PER_MINUTE', 60),
+            period=60.0
+        )
+    return _openai_bucket
@@ -1,11 +1,14 @@
 """
 Celery tasks for AI Insights
 """
-from celery import shared_task
+from celery import group, shared_task
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.db.models import Q
 from django.utils import timezone
 import logging
+import random
 
 from apps.ai_insights.models import AIInsightConfig
 from apps.ai_insights.services.insight_generator import InsightGenerator
@@ -13,6 +16,9 @@ from apps.ai_insights.services.insight_generator import InsightGenerator
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Slack between the last scheduled countdown and the broker visibility_timeout
+VISIBILITY_MARGIN = 15 * 60  # seconds
+
 
 def _clear_generation_cache(user_id: int):
     """Clear the generation-in-progress cache for a user."""
@@ -20,6 +26,16 @@ def _clear_generation_cache(user_id: int):
     cache.delete(cache_key)
 
 
+def due_user_ids(now=None) -> list:
+    """IDs of users with AI insights enabled whose next run is due."""
+    now = now or timezone.now()
+    return list(
+        AIInsightConfig.objects.filter(is_enabled=True).filter(
+            Q(next_scheduled_at__isnull=True) | Q(next_scheduled_at__lte=now)
+        ).order_by('user_id').values_list('user_id', flat=True)
+    )
+
+
 @shared_task(bind=True, max_retries=3)
 def generate_insight_for_user(self, user_id: int):
     """
@@ -56,7 +72,9 @@ def generate_insight_for_user(self, user_id: int):
 
         # Retry with exponential backoff
         try:
-            raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+            # (jittered so a burst of failures doesn't retry in lockstep)
+            countdown = 60 * (2 ** self.request.retries) + random.uniform(0, 30)
+            raise self.retry(exc=e, countdown=countdown)
         except self.MaxRetriesExceededError:
             # Clear cache on final failure
             _clear_generation_cache(user_id)
@@ -64,82 +82,180 @@ def generate_insight_for_user(self, user_id: int):
             return {'success': False, 'error': str(e)}
 
 
+@shared_task
+def generate_insights_batch(user_ids: list):
+    """
+    Generate insights for several users in one task, with up to
+    AI_INSIGHTS_CONCURRENCY OpenAI calls in flight at once.
+
+    Failures are saved as error insights by InsightGenerator and are not
+    retried here; the user is picked up again on the next weekly run.
+
+    Args:
+        user_ids: User IDs to generate insights for
+    """
+    from apps.ai_insights.services.batch_runner import run_insight_batch
+
+    logger.info(f'🔄 Starting batch insight generation for {len(user_ids)} users')
+
+    try:
+        results = run_insight_batch(user_ids, concurrency=settings.AI_INSIGHTS_CONCURRENCY)
+    finally:
+        for user_id in user_ids:
+            _clear_generation_cache(user_id)
+
+    succeeded = sum(1 for result in results if result.get('success'))
+    logger.info(f'✅ Batch finished: {succeeded}/{len(user_ids)} insights generated')
+
+    return {
+        'requested': len(user_ids),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'reused': sum(1 for result in results if result.get('reused')),
+        'results': results
+    }
+
+
+@shared_task
+def refresh_user_alerts(user_id: int):
+    """
+    Recompute the stored alerts feed of a user (see alerts_cache).
+
+    Args:
+        user_id: User ID to refresh alerts for
+    """
+    from apps.ai_insights import alerts_cache
+
+    try:
+        user = User.objects.get(id=user_id)
+        entry = alerts_cache.compute(user)
+        return {
+            'success': True,
+            'user_id': user_id,
+            'alerts': len(entry['payload']['alerts']),
+        }
+    except User.DoesNotExist:
+        logger.error(f'❌ User {user_id} not found')
+        return {'success': False, 'error': 'User not found'}
+    except Exception as e:
+        logger.error(f'❌ Error refreshing alerts for user {user_id}: {str(e)}')
+        return {'success': False, 'error': str(e)}
+    finally:
+        alerts_cache.release_refresh(user_id)
+
+
 @shared_task
 def generate_weekly_insights():
     """
     Generate insights for all users with AI insights enabled.
     This task should be scheduled to run weekly via Celery Beat.
+
+    Due users are split into Celery groups of AI_INSIGHTS_BATCH_SIZE that
+    start evenly spaced over AI_INSIGHTS_SCHEDULE_WINDOW seconds. Inside a
+    group, users are handed out AI_INSIGHTS_CONCURRENCY at a time to
+    generate_insights_batch tasks, each with a random offset inside the
+    slot. The OpenAI calls themselves are throttled by the shared token
+    bucket (OPENAI_REQUESTS_PER_MINUTE).
+
+    The window is capped below the broker's visibility_timeout: Redis
+    redelivers countdown tasks still waiting past it, which would generate
+    those insights twice.
     """
     logger.info('🔄 Starting weekly insight generation for all users')
 
-    # Get all users with AI insights enabled
-    configs = AIInsightConfig.objects.filter(is_enabled=True).select_related('user')
+    now = timezone.now()
+    user_ids = due_user_ids(now)
 
-    total = configs.count()
-    logger.info(f'Found {total} users with AI insights enabled')
+    total = len(user_ids)
+    logger.info(f'Found {total} users due for AI insights')
 
-    scheduled_count = 0
-    for config in configs:
-        # Check if user should get a new insight
-        if config.next_scheduled_at and config.next_scheduled_at > timezone.now():
-            logger.info(f'Skipping user {config.user.email} - next scheduled at {config.next_scheduled_at}')
-            continue
+    batch_size = max(1, settings.AI_INSIGHTS_BATCH_SIZE)
+    batches = [user_ids[i:i + batch_size] for i in range(0, total, batch_size)]
+    window = max(0, settings.AI_INSIGHTS_SCHEDULE_WINDOW)
+    visibility_timeout = getattr(settings, 'CELERY_BROKER_TRANSPORT_OPTIONS', {}).get('visibility_timeout', 3600)
+    if window > visibility_timeout - VISIBILITY_MARGIN:
+        logger.warning(
+            f'AI_INSIGHTS_SCHEDULE_WINDOW ({window}s) exceeds the broker visibility_timeout '
+            f'({visibility_timeout}s) minus {VISIBILITY_MARGIN}s; capping it'
+        )
+        window = max(0, visibility_timeout - VISIBILITY_MARGIN)
+    slot = window / len(batches) if batches else 0
+    concurrency = max(1, settings.AI_INSIGHTS_CONCURRENCY)
 
-        # Schedule insight generation
-        generate_insight_for_user.delay(config.user.id)
-        scheduled_count += 1
-        logger.info(f'Scheduled insight generation for user {config.user.email}')
+    for index, batch in enumerate(batches):
+        batch_start = index * slot
+        group(
+            generate_insights_batch.s(batch[i:i + concurrency]).set(
+                countdown=batch_start + random.uniform(0, slot)
+            )
+            for i in range(0, len(batch), concurrency)
+        ).apply_async()
+        logger.info(f'Scheduled batch {index + 1}/{len(batches)} ({len(batch)} users) at +{batch_start:.0f}s')
 
-    logger.info(f'✅ Scheduled {scheduled_count}/{total} insight generation tasks')
+    logger.info(f'✅ Scheduled {total} insight generation tasks in {len(batches)} batches over {window}s')
 
     return {
-        'total_users': total,
-        'scheduled_count': scheduled_count,
-        'timestamp': timezone.now().isoformat()
+        'due_users': total,
+        'scheduled_count': total,
+        'batches': len(batches),
+        'window_seconds': window,
+        'timestamp': now.isoformat()
     }
 
 
 @shared_task
-def cleanup_old_insights(days: int = 365):
+def cleanup_old_insights(days: int = 365, batch_size: int = 1000):
     """
     Clean up insights older than specified days.
     Keep at least one insight per user for historical reference.
 
+    Old insights are deleted in batches of batch_size, each in its own
+    transaction. A batch is selected with a correlated subquery that finds
+    each user's oldest insight through the (user, generated_at) index, so
+    every batch costs the same few statements however many users there are.
+
     Args:
         days: Number of days to keep insights (default: 365)
+        batch_size: Insights deleted per transaction (default: 1000)
     """
     from apps.ai_insights.models import AIInsight
-    from django.db.models import Min
+    from django.db import transaction
+    from django.db.models import OuterRef, Subquery
 
     logger.info(f'🗑️  Starting cleanup of insights older than {days} days')
 
     cutoff_date = timezone.now() - timezone.timedelta(days=days)
 
-    # Get the oldest insight for each user (to preserve)
-    oldest_insights = AIInsight.objects.values('user').annotate(
-        oldest_date=Min('generated_at')
-    )
+    # The oldest insight of each user is preserved
+    oldest_of_user = AIInsight.objects.filter(
+        user_id=OuterRef('user_id')
+    ).order_by('generated_at', 'id').values('id')[:1]
 
-    oldest_ids = []
-    for item in oldest_insights:
-        oldest = AIInsight.objects.filter(
-            user_id=item['user'],
-            generated_at=item['oldest_date']
-        ).first()
-        if oldest:
-            oldest_ids.append(oldest.id)
-
-    # Delete old insights except the oldest one per user
-    deleted_count, _ = AIInsight.objects.filter(
+    expired = AIInsight.objects.filter(
         generated_at__lt=cutoff_date
     ).exclude(
-        id__in=oldest_ids
-    ).delete()
+        id=Subquery(oldest_of_user)
+    ).order_by()
+
+    deleted_count = 0
+    batches = 0
+    while True:
+        with transaction.atomic():
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, _ = AIInsight.objects.filter(id__in=ids).delete()
+        deleted_count += deleted
+        batches += 1
+
+    # Whatever is still older than the cutoff is a preserved insight
+    preserved_count = AIInsight.objects.filter(generated_at__lt=cutoff_date).count()
 
-    logger.info(f'✅ Cleaned up {deleted_count} old insights')
+    logger.info(f'✅ Cleaned up {deleted_count} old insights in {batches} batches')
 
     return {
         'deleted_count': deleted_count,
         'cutoff_date': cutoff_date.isoformat(),
-        'preserved_count': len(oldest_ids)
+        'preserved_count': preserved_count,
+        'batches': batches
     }
@@ -23,7 +23,6 @@ from apps.ai_insights.serializers import (
     EnableAIInsightsSerializer
 )
 from apps.ai_insights.services.insight_generator import InsightGenerator
-from apps.ai_insights.services.alerts_service import AlertsService
 from apps.ai_insights.tasks import generate_insight_for_user
 from apps.authentication.models import UserActivityLog
 from apps.banking.models import BankAccount, Transaction
@@ -134,10 +133,15 @@ class AIInsightViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         """Return insights for the authenticated user with optimized score_change calculation."""
-        queryset = AIInsight.objects.filter(user=self.request.user)
+        # analysis_data (the snapshot sent to OpenAI) is by far the largest
+        # column and no endpoint returns it
+        queryset = AIInsight.objects.filter(user=self.request.user).defer('analysis_data')
 
         # For list actions, annotate score_change to avoid N+1 queries
         if self.action in ['list', 'history']:
+            # The list serializer doesn't return predictions either
+            queryset = queryset.defer('predictions')
+
             # Subquery to get the previous insight's health_score
             previous_score_subquery = AIInsight.objects.filter(
                 user=self.request.user,
@@ -427,7 +431,7 @@ class AIInsightViewSet(viewsets.ReadOnlyModelViewSet):
                 user=request.user,
                 generated_at__lt=insight1.generated_at,
                 has_error=False
-            ).first()
+            ).defer('analysis_data').first()
 
             if not insight2:
                 return Response(
@@ -436,7 +440,7 @@ class AIInsightViewSet(viewsets.ReadOnlyModelViewSet):
                 )
         else:
             try:
-                insight2 = AIInsight.objects.get(
+                insight2 = AIInsight.objects.defer('analysis_data').get(
                     id=compare_with_id,
                     user=request.user
                 )
@@ -543,15 +547,17 @@ class AIInsightViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def score_evolution(self, request):
         """Get evolution of health scores over time."""
-        insights = self.get_queryset().filter(has_error=False).order_by('generated_at')
+        points = self.get_queryset().filter(has_error=False).order_by('generated_at').values_list(
+            'generated_at', 'health_score', 'health_status'
+        )
 
         evolution = [
             {
-                'date': insight.generated_at.date().isoformat(),
-                'score': float(insight.health_score),
-                'status': insight.health_status
+                'date': generated_at.date().isoformat(),
+                'score': float(health_score),
+                'status': health_status
             }
-            for insight in insights
+            for generated_at, health_score, health_status in points
         ]
 
         return Response({'evolution': evolution})
@@ -560,44 +566,19 @@ class AIInsightViewSet(viewsets.ReadOnlyModelViewSet):
     def alerts(self, request):
         """
         Get rule-based financial alerts for the user.
-        These are generated in real-time without AI, providing immediate actionable insights.
+        These are generated without AI and stored per user (see alerts_cache):
+        the stored feed is served while it matches the user's data version and
+        day, and refreshed in the background once it doesn't (stale=true).
         """
-        # Check if user has financial data
-        has_data, error_message, data_details = check_user_has_financial_data(request.user)
-        if not has_data:
-            return Response({
-                'alerts': [],
-                'error': error_message,
-                'details': data_details
-            }, status=status.HTTP_200_OK)
+        from apps.ai_insights import alerts_cache
 
         try:
-            alerts_service = AlertsService(request.user)
-            alerts = alerts_service.generate_alerts()
-
-            # Group alerts by severity for easier frontend handling
-            alerts_by_severity = {
-                'critical': [],
-                'high': [],
-                'medium': [],
-                'low': []
-            }
-            for alert in alerts:
-                severity = alert.get('severity', 'low')
-                if severity in alerts_by_severity:
-                    alerts_by_severity[severity].append(alert)
+            entry, stale = alerts_cache.get_alerts(request.user)
 
             return Response({
-                'alerts': alerts,
-                'alerts_by_severity': alerts_by_severity,
-                'counts': {
-                    'total': len(alerts),
-                    'critical': len(alerts_by_severity['critical']),
-                    'high': len(alerts_by_severity['high']),
-                    'medium': len(alerts_by_severity['medium']),
-                    'low': len(alerts_by_severity['low'])
-                },
-                'generated_at': timezone.now().isoformat()
+                **entry['payload'],
+                'generated_at': entry['generated_at'],
+                'stale': stale
             })
 
         except Exception as e:
@@ -220,7 +220,7 @@ class BillAdmin(admin.ModelAdmin):
     readonly_fields = [
         'id', 'created_at', 'updated_at', 'paid_at',
         'ocr_confidence', 'ocr_raw_data', 'amount_remaining_display',
-        'payment_percentage_display'
+        'payment_percentage_display', 'payments_count', 'has_transaction_payment'
     ]
     raw_id_fields = ['user', 'category', 'linked_transaction', 'parent_bill']
     date_hierarchy = 'due_date'
@@ -246,7 +246,7 @@ class BillAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Vinculação Bancária', {
-            'fields': ('linked_transaction',),
+            'fields': ('linked_transaction', 'payments_count', 'has_transaction_payment'),
             'classes': ('collapse',)
         }),
         ('Notas', {
@@ -10,6 +10,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from apps.banking.models import Transaction, Category
 from apps.banking.services import get_or_create_category
+from apps.reports import rollups
 
 
 class Command(BaseCommand):
@@ -43,6 +44,7 @@ class Command(BaseCommand):
         updated_count = 0
         skipped_count = 0
         created_categories = set()
+        updated_users = {}
 
         with transaction.atomic():
             for tx in transactions_to_update:
@@ -61,6 +63,7 @@ class Command(BaseCommand):
                     if not dry_run:
                         tx.user_category = category
                         tx.save(update_fields=['user_category'])
+                        updated_users[user.id] = user
 
                     updated_count += 1
 
@@ -74,6 +77,10 @@ class Command(BaseCommand):
                 else:
                     skipped_count += 1
 
+            # Reports and alerts read the daily rollups, not the transactions
+            for user in updated_users.values():
+                rollups.rebuild(user=user)
+
             if dry_run:
                 # Rollback the transaction in dry-run mode
                 transaction.set_rollback(True)
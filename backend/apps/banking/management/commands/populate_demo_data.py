@@ -16,6 +16,7 @@ from django.db import transaction
 from apps.banking.models import (
     BankAccount, BankConnection, Transaction, Category, Bill, CategoryRule
 )
+from apps.reports import rollups
 
 User = get_user_model()
 
@@ -115,6 +116,7 @@ class Command(BaseCommand):
             self.clean_data(user)
 
             if options['clean_only']:
+                rollups.rebuild(user=user)
                 self.stdout.write(self.style.SUCCESS('Data cleaned successfully!'))
                 return
 
@@ -124,6 +126,9 @@ class Command(BaseCommand):
             self.create_bills(user, categories)
             self.update_account_balances(user)
 
+            # Reports and alerts read the daily rollups, not the transactions
+            rollups.rebuild(user=user)
+
         self.stdout.write(self.style.SUCCESS('Demo data populated successfully!'))
 
     def clean_data(self, user):
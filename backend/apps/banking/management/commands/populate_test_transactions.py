@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from apps.banking.models import BankAccount, Transaction, Category, Bill
+from apps.reports import rollups
 from decimal import Decimal
 import uuid
 import random
@@ -442,6 +443,9 @@ class Command(BaseCommand):
         self.stdout.write(f'\nCreating {count} test transactions...\n')
         created_count = self._create_transactions(account, user, count, days_back, mode)
 
+        # Reports and alerts read the daily rollups, not the transactions
+        rollups.rebuild(user=user)
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'\nSuccessfully created {created_count} test transactions!'
@@ -8,6 +8,7 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from apps.banking.models import BankAccount, BankConnection, Connector, Transaction, Category
 from apps.banking.services import get_category_translations, get_category_icon
+from apps.reports import rollups
 from decimal import Decimal
 import uuid
 from datetime import datetime, timedelta
@@ -79,6 +80,10 @@ class Command(BaseCommand):
             total_transactions += count
             self.stdout.write(self.style.SUCCESS(f'  ✓ {count} transações criadas'))
 
+        # Relatorios e alertas leem os rollups diarios, nao as transacoes
+        self.stdout.write('\nAtualizando rollups dos relatórios...')
+        rollups.rebuild(user=user)
+
         # Show final summary
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
         self.stdout.write(self.style.SUCCESS('RESUMO FINAL'))
@@ -0,0 +1,41 @@
+# Generated manually - Denormalized payment counters on Bill
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_payment_counters(apps, schema_editor):
+    """Preenche payments_count/has_transaction_payment a partir dos BillPayments."""
+    Bill = apps.get_model('banking', 'Bill')
+
+    bills = Bill.objects.annotate(
+        _count=Count('payments'),
+        _with_tx=Count('payments', filter=Q(payments__transaction__isnull=False)),
+    ).filter(_count__gt=0)
+
+    for bill in bills.iterator(chunk_size=1000):
+        Bill.objects.filter(pk=bill.pk).update(
+            payments_count=bill._count,
+            has_transaction_payment=bill._with_tx > 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0017_categoryrule_add_subcategory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bill',
+            name='payments_count',
+            field=models.IntegerField(default=0, help_text='Number of BillPayments registered for this bill'),
+        ),
+        migrations.AddField(
+            model_name='bill',
+            name='has_transaction_payment',
+            field=models.BooleanField(default=False, help_text='Whether any BillPayment of this bill is linked to a transaction'),
+        ),
+        migrations.RunPython(backfill_payment_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated manually - Unique installment per recurring bill series
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0018_bill_payment_counters'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='bill',
+            constraint=models.UniqueConstraint(
+                fields=['parent_bill', 'installment_number'],
+                name='banking_bill_unique_installment',
+            ),
+        ),
+    ]
@@ -393,6 +393,16 @@ class Bill(models.Model):
         help_text='Whether this bill was created from OCR upload'
     )
 
+    # Denormalized payment counters (maintained by recalculate_payments)
+    payments_count = models.IntegerField(
+        default=0,
+        help_text='Number of BillPayments registered for this bill'
+    )
+    has_transaction_payment = models.BooleanField(
+        default=False,
+        help_text='Whether any BillPayment of this bill is linked to a transaction'
+    )
+
     # Link to bank transaction (when paid through bank)
     # OneToOneField garante que uma transação só pode estar vinculada a uma bill
     linked_transaction = models.OneToOneField(
@@ -414,6 +424,12 @@ class Bill(models.Model):
             models.Index(fields=['user', 'due_date']),
             models.Index(fields=['status', 'due_date']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['parent_bill', 'installment_number'],
+                name='banking_bill_unique_installment',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_type_display()} - {self.description} ({self.amount})"
@@ -453,14 +469,31 @@ class Bill(models.Model):
 
     def recalculate_payments(self):
         """
-        Recalcula amount_paid a partir de todos os BillPayments.
+        Recalcula amount_paid e os contadores de pagamentos a partir de
+        todos os BillPayments, em uma única query de agregação.
         Deve ser chamado após adicionar/remover pagamentos.
         """
-        from django.db.models import Sum
-        total = self.payments.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        self.amount_paid = total
+        from django.db.models import Sum, Count, Q
+        totals = self.payments.aggregate(
+            total=Sum('amount'),
+            count=Count('id'),
+            with_transaction=Count('id', filter=Q(transaction__isnull=False)),
+        )
+        self.amount_paid = totals['total'] or Decimal('0.00')
+        self.payments_count = totals['count']
+        self.has_transaction_payment = totals['with_transaction'] > 0
         self.update_status()
 
+    @classmethod
+    def recalculate_bills(cls, bill_ids):
+        """
+        Recalcula amount_paid/contadores das bills informadas.
+        Usado após deletar transações: o SET_NULL em BillPayment.transaction
+        é feito via UPDATE e não passa pelo save() do pagamento.
+        """
+        for bill in cls.objects.filter(id__in=list(bill_ids)):
+            bill.recalculate_payments()
+
     @property
     def can_add_payment(self):
         """Verifica se a bill pode receber mais pagamentos."""
@@ -349,7 +349,6 @@ class BillSerializer(serializers.ModelSerializer):
 
     # Payments (novo sistema de pagamentos parciais)
     payments = serializers.SerializerMethodField()
-    payments_count = serializers.SerializerMethodField()
     can_add_payment = serializers.BooleanField(read_only=True)
 
     class Meta:
@@ -392,21 +391,22 @@ class BillSerializer(serializers.ModelSerializer):
         Verifica AMBOS: campo legacy E BillPayments com transação.
         """
         # Legacy check
-        if obj.linked_transaction is not None:
+        if obj.linked_transaction_id is not None:
             return True
-        # Novo sistema: verifica se há payments com transação
-        return obj.payments.filter(transaction__isnull=False).exists()
+        # Novo sistema: contador desnormalizado mantido por recalculate_payments
+        return obj.has_transaction_payment
 
     def get_payments(self, obj):
-        """Retorna lista de pagamentos da bill."""
+        """
+        Retorna lista de pagamentos da bill.
+        Usa o Prefetch do BillViewSet quando disponível (sem query extra).
+        """
         from .serializers import BillPaymentSerializer
-        payments = obj.payments.select_related('transaction', 'transaction__account').all()
+        payments = obj.payments.all()
+        if 'payments' not in getattr(obj, '_prefetched_objects_cache', {}):
+            payments = payments.select_related('transaction', 'transaction__account')
         return BillPaymentSerializer(payments, many=True).data
 
-    def get_payments_count(self, obj):
-        """Retorna contagem de pagamentos."""
-        return obj.payments.count()
-
     def validate(self, data):
         """Validate bill data."""
         # Ensure amount_paid doesn't exceed amount
@@ -3,9 +3,11 @@ Banking services for Pluggy integration and data synchronization.
 Ref: https://docs.pluggy.ai/docs/creating-an-use-case-from-scratch
 """
 
+import hashlib
 import logging
 import json
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
@@ -511,9 +513,30 @@ class ConnectorService:
     Ref: https://docs.pluggy.ai/reference/connectors
     """
 
+    # Cached connector list responses, superseded by a version bump on sync
+    LIST_CACHE_TIMEOUT = 60 * 60  # 1 hour
+    LIST_CACHE_VERSION_KEY = 'banking:connectors:version'
+
     def __init__(self):
         self.client = PluggyClient()
 
+    @classmethod
+    def list_cache_key(cls, params: Dict[str, Any]) -> str:
+        """Cache key of a connector list response for these query params."""
+        from django.core.cache import cache
+
+        version = cache.get(cls.LIST_CACHE_VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            cache.add(cls.LIST_CACHE_VERSION_KEY, version, None)
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        return f'banking:connectors:list:{version}:{digest}'
+
+    @classmethod
+    def invalidate_list_cache(cls):
+        from django.core.cache import cache
+        cache.set(cls.LIST_CACHE_VERSION_KEY, time.time_ns(), None)
+
     def sync_connectors(self, country: str = 'BR', sandbox: Optional[bool] = None) -> int:
         """
         Sync available connectors from Pluggy.
@@ -552,6 +575,8 @@ class ConnectorService:
             sync_log.records_synced = synced_count
             sync_log.save()
 
+            self.invalidate_list_cache()
+
             logger.info(f"Synced {synced_count} connectors")
             return synced_count
 
@@ -829,6 +854,10 @@ class BankConnectionService:
                 )
                 synced_count += 1
 
+            # Balances and limits feed the alerts; mark the user's data as changed
+            from apps.reports.report_cache import bump_data_version
+            bump_data_version([connection.user_id])
+
             logger.info(f"Synced {synced_count} accounts for connection {connection.id}")
             return synced_count
 
@@ -852,9 +881,19 @@ class BankConnectionService:
             # Store connection ID for logging
             connection_id = connection.id
 
+            # Bills com pagamentos vinculados às transações desta conexão
+            from .models import Bill, BillPayment
+            affected_bill_ids = set(
+                BillPayment.objects.filter(
+                    transaction__account__connection=connection
+                ).values_list('bill_id', flat=True)
+            )
+
             # Delete from database (will cascade delete accounts and transactions)
             connection.delete()
 
+            Bill.recalculate_bills(affected_bill_ids)
+
             logger.info(f"Deleted connection {connection_id} and all associated data")
             return True
 
@@ -942,8 +981,11 @@ class TransactionService:
                 date_to=date_to
             )
 
+            from apps.reports import rollups
+
             synced_count = 0
             new_transactions = []  # Track new transactions for auto-match
+            rollup_keys = set()  # (account, day) buckets touched by this sync
             with transaction_db.atomic():
                 for pluggy_tx in pluggy_transactions:
                     tx_type = 'CREDIT' if pluggy_tx['type'] == 'CREDIT' else 'DEBIT'
@@ -1018,10 +1060,16 @@ class TransactionService:
                     )
                     synced_count += 1
 
+                    rollup_keys.add(rollups.key_for(tx_obj))
+                    if existing_tx:
+                        rollup_keys.add(rollups.key_for(existing_tx))
+
                     # Track new transactions for auto-match
                     if created:
                         new_transactions.append(tx_obj)
 
+                rollups.refresh(rollup_keys)
+
             account.last_synced_at = timezone.now()
             account.save()
 
@@ -1087,6 +1135,10 @@ class TransactionService:
                 logger.error(f"Failed to sync transactions for account {account.id}: {e}")
                 results[str(account.id)] = 0
 
+        # Recompute the stored alerts feed now rather than on the next read
+        from apps.ai_insights import alerts_cache
+        alerts_cache.refresh_if_cached([connection.user_id])
+
         return results
 
 
@@ -1972,8 +2024,11 @@ class CategoryRuleService:
             account__connection__user=user
         ).select_related('account', 'account__connection')
 
+        from apps.reports import rollups
+
         matched_count = 0
         updated_count = 0
+        rollup_keys = set()
 
         for tx in transactions:
             t_desc = CategoryRuleService.normalize_text(tx.description)
@@ -2006,6 +2061,9 @@ class CategoryRuleService:
                     tx.user_subcategory = rule.subcategory
                     tx.save(update_fields=['user_category', 'user_subcategory', 'updated_at'])
                     updated_count += 1
+                    rollup_keys.add(rollups.key_for(tx))
+
+        rollups.refresh(rollup_keys)
 
         # Atualiza contador de aplicações da regra
         if updated_count > 0:
@@ -2023,3 +2081,197 @@ class CategoryRuleService:
             'matched_count': matched_count,
             'updated_count': updated_count
         }
+
+
+class BillRecurrenceService:
+    """
+    Motor de recorrência de contas (Bill).
+
+    Uma série recorrente é formada pela bill raiz (recurrence != 'once' e
+    parent_bill nulo, parcela 1) e pelas parcelas materializadas
+    (parent_bill = raiz, installment_number = 2, 3, ...).
+
+    - expand(): projeta as próximas parcelas de um horizonte sem gravar linhas
+      (usado no cash_flow_projection).
+    - materialize_installments(): job em lote que cria com bulk_create as
+      próximas N parcelas de todas as séries, para todos os usuários.
+
+    A data da parcela k é sempre calculada a partir da raiz
+    (due_date + (k-1) * passo), evitando deriva de dia em meses curtos. Séries
+    antigas começam direto na primeira parcela da janela
+    (first_installment_on_or_after), sem percorrer as datas passadas.
+    """
+
+    RECURRENCE_STEPS = {
+        'weekly': {'weeks': 1},
+        'monthly': {'months': 1},
+        'yearly': {'years': 1},
+    }
+
+    # Limite de segurança para séries semanais em horizontes longos
+    MAX_OCCURRENCES_PER_SERIES = 520
+
+    @classmethod
+    def occurrence_date(cls, root_due_date, recurrence: str, installment_number: int):
+        """Data de vencimento da parcela `installment_number` (1 = raiz)."""
+        from dateutil.relativedelta import relativedelta
+
+        step = cls.RECURRENCE_STEPS[recurrence]
+        offset = {unit: value * (installment_number - 1) for unit, value in step.items()}
+        return root_due_date + relativedelta(**offset)
+
+    @classmethod
+    def first_installment_on_or_after(cls, root_due_date, recurrence: str, target, minimum: int = 1) -> int:
+        """
+        Menor número de parcela >= `minimum` com vencimento em `target` ou depois.
+
+        Estima o número pelos passos inteiros entre a raiz e `target` e
+        corrige o arredondamento de fim de mês com no máximo alguns passos.
+        """
+        from dateutil.relativedelta import relativedelta
+
+        if target <= root_due_date:
+            return minimum
+
+        if recurrence == 'weekly':
+            steps = (target - root_due_date).days // 7
+        else:
+            delta = relativedelta(target, root_due_date)
+            steps = delta.years * 12 + delta.months if recurrence == 'monthly' else delta.years
+
+        number = max(minimum, steps + 1)
+        while cls.occurrence_date(root_due_date, recurrence, number) < target:
+            number += 1
+        return number
+
+    @classmethod
+    def _get_series(cls, user=None, today=None):
+        """
+        Carrega as raízes das séries e o estado das parcelas materializadas.
+
+        Sempre 2 queries, independente do número de usuários ou séries.
+
+        Returns:
+            Lista de tuplas (root, last_installment, upcoming_count)
+        """
+        from django.db.models import Count, Max, Q
+        from .models import Bill
+
+        roots = Bill.objects.filter(
+            recurrence__in=list(cls.RECURRENCE_STEPS.keys()),
+            parent_bill__isnull=True,
+        ).exclude(status='cancelled')
+        if user is not None:
+            roots = roots.filter(user=user)
+        roots = list(roots)
+
+        if not roots:
+            return []
+
+        installments = Bill.objects.filter(
+            parent_bill_id__in=[root.id for root in roots]
+        ).values('parent_bill_id').annotate(
+            last=Max('installment_number'),
+            upcoming=Count('id', filter=Q(due_date__gte=today)) if today else Count('id'),
+        )
+        state = {row['parent_bill_id']: row for row in installments}
+
+        series = []
+        for root in roots:
+            row = state.get(root.id)
+            last = max(row['last'] or 1, 1) if row else 1
+            upcoming = row['upcoming'] if row else 0
+            if today and root.due_date >= today:
+                upcoming += 1
+            series.append((root, last, upcoming))
+        return series
+
+    @classmethod
+    def expand(cls, user, start_date, end_date) -> List[Dict[str, Any]]:
+        """
+        Projeta (sem gravar) as parcelas futuras das séries do usuário com
+        vencimento em [start_date, end_date).
+
+        Somente parcelas ainda não materializadas são retornadas, então o
+        resultado pode ser somado às bills existentes sem duplicidade.
+        """
+        occurrences = []
+
+        for root, last, _ in cls._get_series(user=user):
+            number = cls.first_installment_on_or_after(
+                root.due_date, root.recurrence, start_date, minimum=last + 1
+            )
+            for _ in range(cls.MAX_OCCURRENCES_PER_SERIES):
+                due_date = cls.occurrence_date(root.due_date, root.recurrence, number)
+                if due_date >= end_date:
+                    break
+                if due_date >= start_date:
+                    occurrences.append({
+                        'parent_bill_id': root.id,
+                        'installment_number': number,
+                        'type': root.type,
+                        'description': root.description,
+                        'amount': root.amount,
+                        'due_date': due_date,
+                        'category_id': root.category_id,
+                        'recurrence': root.recurrence,
+                        'is_projected': True,
+                    })
+                number += 1
+
+        return occurrences
+
+    @classmethod
+    def materialize_installments(cls, upcoming: int = 3, user=None, batch_size: int = 1000) -> int:
+        """
+        Garante que cada série tenha `upcoming` parcelas com vencimento a partir
+        de hoje, criando as que faltam em um único bulk_create.
+
+        Args:
+            upcoming: Número de parcelas futuras a manter materializadas
+            user: Restringe a um usuário (None = todos)
+            batch_size: Tamanho do lote do bulk_create
+
+        Returns:
+            Número de parcelas criadas
+        """
+        from .models import Bill
+
+        today = timezone.now().date()
+        new_bills = []
+
+        for root, last, upcoming_count in cls._get_series(user=user, today=today):
+            # Não cria parcelas retroativas (ficariam vencidas)
+            number = cls.first_installment_on_or_after(
+                root.due_date, root.recurrence, today, minimum=last + 1
+            )
+            steps = 0
+            while upcoming_count < upcoming and steps < cls.MAX_OCCURRENCES_PER_SERIES:
+                due_date = cls.occurrence_date(root.due_date, root.recurrence, number)
+                new_bills.append(Bill(
+                    user_id=root.user_id,
+                    type=root.type,
+                    description=root.description,
+                    amount=root.amount,
+                    currency_code=root.currency_code,
+                    due_date=due_date,
+                    category_id=root.category_id,
+                    recurrence=root.recurrence,
+                    parent_bill_id=root.id,
+                    installment_number=number,
+                    customer_supplier=root.customer_supplier,
+                ))
+                upcoming_count += 1
+                number += 1
+                steps += 1
+
+        if new_bills:
+            # ignore_conflicts: a constraint única (parent_bill, installment_number)
+            # torna o job idempotente se duas execuções se sobrepuserem
+            Bill.objects.bulk_create(new_bills, batch_size=batch_size, ignore_conflicts=True)
+
+            from apps.reports.report_cache import bump_data_version
+            bump_data_version(bill.user_id for bill in new_bills)
+
+        logger.info(f"Materialized {len(new_bills)} recurring bill installments")
+        return len(new_bills)
@@ -6,8 +6,8 @@ from celery import shared_task
 from django.utils import timezone
 from django.core.cache import cache
 
-from .models import BankConnection, SyncLog, Transaction
-from .services import BankConnectionService, TransactionService
+from .models import BankConnection, SyncLog, Transaction, Bill, BillPayment
+from .services import BankConnectionService, TransactionService, BillRecurrenceService
 
 logger = logging.getLogger(__name__)
 
@@ -293,11 +293,26 @@ def process_transactions_deleted(self, item_id: str, payload: dict):
             logger.warning(f"[TASK] No transaction IDs provided in delete event for item {item_id}")
             return
 
-        # Delete transactions by their Pluggy IDs
-        deleted_count = Transaction.objects.filter(
+        transactions = Transaction.objects.filter(
             pluggy_transaction_id__in=transaction_ids,
             account__connection=connection
-        ).delete()[0]
+        )
+
+        # Bills com pagamentos vinculados precisam ter os contadores recalculados
+        affected_bill_ids = set(
+            BillPayment.objects.filter(
+                transaction__in=transactions
+            ).values_list('bill_id', flat=True)
+        )
+
+        from apps.reports import rollups
+        rollup_keys = rollups.keys_for(transactions)
+
+        # Delete transactions by their Pluggy IDs
+        deleted_count = transactions.delete()[0]
+
+        Bill.recalculate_bills(affected_bill_ids)
+        rollups.refresh(rollup_keys)
 
         logger.info(
             f"[TASK] Deleted {deleted_count} transactions for connection {connection.id}. "
@@ -337,3 +352,18 @@ def process_connector_status(self, payload: dict):
     # 1. Update connection status to reflect connector issues
     # 2. Send notification to user about potential sync delays
     # 3. Disable auto-sync until connector is back online
+
+
+@shared_task
+def materialize_recurring_bills(upcoming: int = 3):
+    """
+    Materializa as próximas parcelas de todas as bills recorrentes.
+    Executado diariamente pelo Celery Beat; idempotente.
+    """
+    try:
+        created = BillRecurrenceService.materialize_installments(upcoming=upcoming)
+        logger.info(f"[TASK] Materialized {created} recurring bill installments")
+        return {'created': created}
+    except Exception as e:
+        logger.error(f"[TASK] Error materializing recurring bills: {e}", exc_info=True)
+        raise
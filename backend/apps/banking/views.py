@@ -9,7 +9,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Sum, Count, Min, Max
+from django.db.models import Sum, Count, Min, Max, Prefetch, Q
 
 from .models import (
     Connector, BankConnection, BankAccount,
@@ -32,10 +32,12 @@ from .serializers import (
 )
 from .services import (
     ConnectorService, BankConnectionService,
-    TransactionService, TransactionMatchService, CategoryRuleService
+    TransactionService, TransactionMatchService, CategoryRuleService,
+    BillRecurrenceService
 )
 from .pluggy_client import PluggyClient
 from apps.authentication.models import UserActivityLog
+from apps.reports import rollups
 from apps.authentication.signals import get_client_ip
 
 
@@ -59,6 +61,21 @@ class ConnectorViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset.order_by('name')
 
+    def list(self, request, *args, **kwargs):
+        """Connector list, cached per query string until the next connector sync."""
+        from django.core.cache import cache
+
+        # Pagination links are absolute, so the host is part of the key
+        key = ConnectorService.list_cache_key({
+            'host': request.get_host(),
+            'query': dict(request.query_params.lists()),
+        })
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, ConnectorService.LIST_CACHE_TIMEOUT)
+        return Response(data)
+
     @action(detail=False, methods=['post'])
     def sync(self, request):
         """
@@ -675,6 +692,19 @@ class TransactionViewSet(viewsets.ModelViewSet):
             logger.info(f"Sample transaction dates: {list(dates)}")
 
         # Apply filters
+        queryset = self.filter_transactions(queryset)
+
+        logger.info(f"Final queryset count: {queryset.count()}")
+        return queryset.order_by('-date', '-created_at')
+
+    def filter_transactions(self, queryset):
+        """
+        Apply the query param filters (account_id, date_from, date_to, type,
+        category). Shared by the list and the export endpoints.
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
         filter_serializer = TransactionFilterSerializer(data=self.request.query_params)
         if filter_serializer.is_valid():
             filters = filter_serializer.validated_data
@@ -682,13 +712,10 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
             if 'account_id' in filters:
                 queryset = queryset.filter(account_id=filters['account_id'])
-                logger.info(f"After account filter: {queryset.count()}")
             if 'date_from' in filters:
                 queryset = queryset.filter(date__gte=filters['date_from'])
-                logger.info(f"After date_from filter: {queryset.count()}")
             if 'date_to' in filters:
                 queryset = queryset.filter(date__lte=filters['date_to'])
-                logger.info(f"After date_to filter: {queryset.count()}")
             if 'type' in filters:
                 queryset = queryset.filter(type=filters['type'])
             if 'category' in filters:
@@ -696,8 +723,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
         else:
             logger.error(f"Filter validation errors: {filter_serializer.errors}")
 
-        logger.info(f"Final queryset count: {queryset.count()}")
-        return queryset.order_by('-date', '-created_at')
+        return queryset
 
     def update(self, request, *args, **kwargs):
         """
@@ -746,6 +772,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
         # Refresh to get updated category
         instance.refresh_from_db()
+        rollup_keys = {rollups.key_for(instance)}
 
         # Track batch operation results
         applied_count = 0
@@ -753,15 +780,19 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
         # Apply to similar transactions if requested
         if apply_to_similar and similar_ids and instance.user_category:
-            applied_count = Transaction.objects.filter(
+            similar_transactions = Transaction.objects.filter(
                 id__in=similar_ids,
                 account__connection__user=request.user
-            ).update(
+            )
+            rollup_keys |= rollups.keys_for(similar_transactions)
+            applied_count = similar_transactions.update(
                 user_category=instance.user_category,
                 user_subcategory=instance.user_subcategory
             )
             logger.info(f"Applied category to {applied_count} similar transactions")
 
+        rollups.refresh(rollup_keys)
+
         # Create rule if requested
         if create_rule and instance.user_category:
             try:
@@ -1066,6 +1097,51 @@ class TransactionViewSet(viewsets.ModelViewSet):
             'transactions_count': transactions.count()
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Export transactions as CSV, NDJSON or XLSX without loading them all in memory.
+        GET /api/banking/transactions/export/?file_format=csv
+
+        Query params: file_format (csv, ndjson or xlsx; default csv) plus the
+        same filters as the list (account_id, date_from, date_to, type, category).
+        """
+        from django.http import StreamingHttpResponse, FileResponse
+        from . import exports
+
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in exports.EXPORT_FORMATS:
+            return Response(
+                {'error': f"file_format must be one of: {', '.join(exports.EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_transactions(
+            Transaction.objects.filter(
+                account__connection__user=request.user,
+                account__connection__is_active=True
+            )
+        ).order_by('-date', '-created_at')
+
+        filename = f"transacoes_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+
+        if file_format == 'xlsx':
+            response = FileResponse(
+                exports.open_xlsx(queryset),
+                content_type=exports.CONTENT_TYPES['xlsx'],
+                as_attachment=True,
+                filename=filename
+            )
+        else:
+            stream = exports.stream_csv if file_format == 'csv' else exports.stream_ndjson
+            response = StreamingHttpResponse(
+                stream(queryset),
+                content_type=exports.CONTENT_TYPES[file_format]
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+        return response
+
 
 class SyncLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -1120,7 +1196,14 @@ class CategoryViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Transações da categoria (e subcategorias) ficarão sem categoria:
+        # os rollups desses dias são recalculados após o delete
+        rollup_keys = rollups.keys_for(Transaction.objects.filter(
+            Q(user_category=category) | Q(user_category__parent=category)
+        ))
+
         category.delete()
+        rollups.refresh(rollup_keys)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1134,8 +1217,18 @@ class BillViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Get bills for the current user with filters."""
-        # Otimização: select_related para evitar N+1 queries
-        queryset = Bill.objects.filter(user=self.request.user).select_related('category', 'user')
+        from .models import BillPayment
+
+        # Otimização: select_related + Prefetch para evitar N+1 queries
+        # (payments_count/has_transaction_payment são desnormalizados na Bill)
+        queryset = Bill.objects.filter(user=self.request.user).select_related(
+            'category', 'user', 'linked_transaction__account'
+        ).prefetch_related(
+            Prefetch(
+                'payments',
+                queryset=BillPayment.objects.select_related('transaction', 'transaction__account')
+            )
+        )
 
         # Apply filters
         filter_serializer = BillFilterSerializer(data=self.request.query_params)
@@ -1643,6 +1736,10 @@ class BillViewSet(viewsets.ModelViewSet):
         Get cash flow projection for the next 12 months.
         GET /api/banking/bills/cash_flow_projection/
         Otimizado: busca todas as bills de uma vez e processa em Python
+
+        Query params:
+        - include_recurring: inclui parcelas futuras ainda não materializadas
+          das bills recorrentes (default: true)
         """
         from dateutil.relativedelta import relativedelta
         from decimal import Decimal
@@ -1677,6 +1774,13 @@ class BillViewSet(viewsets.ModelViewSet):
                 'payable': Decimal('0'),
             }
 
+        # Parcelas recorrentes projetadas (sem gravar linhas)
+        if request.query_params.get('include_recurring', 'true').lower() != 'false':
+            bills = list(bills) + [
+                {**occurrence, 'amount_paid': Decimal('0')}
+                for occurrence in BillRecurrenceService.expand(request.user, start_date, end_date)
+            ]
+
         # Processar bills em Python (mais rápido que 48 queries SQL)
         for bill in bills:
             month_key = bill['due_date'].strftime('%Y-%m')
@@ -0,0 +1,23 @@
+"""
+Django Admin configuration for Reports app.
+"""
+
+from django.contrib import admin
+
+from .models import ReportExport
+
+
+@admin.register(ReportExport)
+class ReportExportAdmin(admin.ModelAdmin):
+    """Admin interface for background report exports."""
+    list_display = ['id', 'user', 'report_type', 'file_format', 'status', 'file_size', 'duration_ms', 'created_at']
+    list_filter = ['status', 'report_type', 'file_format']
+    search_fields = ['user__email']
+    readonly_fields = [
+        'user', 'report_type', 'file_format', 'params', 'params_hash', 'status',
+        'file_size', 'duration_ms', 'error_message', 'created_at', 'started_at', 'completed_at'
+    ]
+
+    def get_queryset(self, request):
+        # The rendered file lives in `content`; don't load it for the lists
+        return super().get_queryset(request).defer('content')
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.reports'
-    verbose_name = 'Reports'
\ No newline at end of file
+    verbose_name = 'Reports'
+
+    def ready(self):
+        import apps.reports.signals  # noqa
@@ -0,0 +1,495 @@
+"""
+Reports benchmark harness.
+
+generate_dataset() bulk-creates a synthetic user base (accounts, categories,
+rules, bills and transactions with realistic descriptions) and
+run_scenarios() times every report entry point against it, counting the
+queries each one issues. The benchmark_reports management command wires both
+together and writes the results to JSON so runs can be compared.
+"""
+import logging
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import connection, transaction as transaction_db
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DATASET_SIZES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+EMAIL_DOMAIN = 'benchmark.local'
+CONNECTOR_PLUGGY_ID = 999_000_001
+TRANSACTION_BATCH_SIZE = 5000
+
+# Pluggy category of each template, so the DRE mapping sees realistic ids
+PLUGGY_CATEGORY_IDS = {
+    'Alimentação': '11010000',
+    'Mercado': '10000000',
+    'Transporte': '19010000',
+    'Compras': '08010000',
+    'Contas e Serviços': '17020000',
+    'Lazer': '09020000',
+    'Saúde': '18020000',
+    'Assinaturas': '09000000',
+    'Salário': '01010000',
+    'Freelance': '01030000',
+    'Investimentos': '03060000',
+    'Transferências Recebidas': '05070000',
+    'Outras Despesas': '05090004',
+    'Outras Receitas': '01050000',
+}
+
+SUBCATEGORIES = {
+    'Alimentação': ['Restaurantes', 'Delivery'],
+    'Transporte': ['Aplicativos', 'Combustível'],
+    'Compras': ['Online', 'Vestuário'],
+    'Contas e Serviços': ['Energia', 'Telefonia'],
+}
+
+UNCATEGORIZED_RATIO = 0.25  # share of transactions left with only the Pluggy category
+OUTLIER_RATIO = 0.01  # share of transactions with an unusually large amount
+
+PAYABLE_BILLS = [
+    ('Aluguel', Decimal('2800.00'), 5, 'Contas e Serviços'),
+    ('CPFL Energia', Decimal('385.50'), 10, 'Contas e Serviços'),
+    ('Sabesp - Água', Decimal('145.80'), 12, 'Contas e Serviços'),
+    ('Vivo Internet', Decimal('199.90'), 15, 'Contas e Serviços'),
+    ('Plano de Saúde', Decimal('450.00'), 1, 'Saúde'),
+    ('Condomínio', Decimal('680.00'), 10, 'Contas e Serviços'),
+    ('Netflix', Decimal('55.90'), 5, 'Lazer'),
+    ('Cartão Nubank', Decimal('1250.00'), 10, 'Outras Despesas'),
+]
+
+RECEIVABLE_BILLS = [
+    ('Consultoria - Cliente ABC', Decimal('1500.00'), 20, 'Freelance'),
+    ('Freelance - Projeto Web', Decimal('2800.00'), 15, 'Freelance'),
+    ('Aluguel Recebido - Apt 201', Decimal('1800.00'), 10, 'Outras Receitas'),
+]
+
+
+def _templates() -> Dict[str, Dict[str, Any]]:
+    from apps.banking.management.commands.populate_test_transactions import Command
+
+    return Command.TRANSACTION_TEMPLATES
+
+
+def benchmark_users():
+    """Users created by generate_dataset()."""
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')
+
+
+def delete_dataset() -> int:
+    """Delete every benchmark user (and, by cascade, their data)."""
+    count = 0
+    for user in benchmark_users():
+        user.delete()
+        count += 1
+    return count
+
+
+def _create_user(index: int, label: str):
+    from django.contrib.auth import get_user_model
+    from apps.banking.models import BankAccount, BankConnection, Connector
+
+    User = get_user_model()
+    email = f'bench-{label}-{index}@{EMAIL_DOMAIN}'
+    user = User.objects.create_user(
+        username=email,
+        email=email,
+        password=None,
+        first_name='Benchmark',
+        last_name=str(index),
+    )
+
+    connector, _ = Connector.objects.get_or_create(
+        pluggy_id=CONNECTOR_PLUGGY_ID,
+        defaults={
+            'name': 'Benchmark Bank',
+            'institution_name': 'Benchmark Bank',
+            'type': 'PERSONAL_BANK',
+            'is_sandbox': True,
+        }
+    )
+    bank_connection = BankConnection.objects.create(
+        user=user,
+        connector=connector,
+        pluggy_item_id=f'bench_{uuid.uuid4().hex}',
+        status='UPDATED',
+    )
+
+    accounts = BankAccount.objects.bulk_create([
+        BankAccount(
+            connection=bank_connection,
+            pluggy_account_id=f'bench_{uuid.uuid4().hex}',
+            type='CHECKING',
+            name='Conta Corrente',
+            balance=Decimal('8500.00'),
+        ),
+        BankAccount(
+            connection=bank_connection,
+            pluggy_account_id=f'bench_{uuid.uuid4().hex}',
+            type='SAVINGS',
+            name='Poupança',
+            balance=Decimal('25000.00'),
+        ),
+        BankAccount(
+            connection=bank_connection,
+            pluggy_account_id=f'bench_{uuid.uuid4().hex}',
+            type='CREDIT_CARD',
+            name='Cartão de Crédito',
+            balance=Decimal('-7400.00'),
+            credit_limit=Decimal('10000.00'),
+            available_credit_limit=Decimal('2600.00'),
+        ),
+    ])
+    return user, accounts
+
+
+def _create_categories(user) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    from apps.banking.models import Category
+
+    categories = {
+        name: Category(
+            user=user,
+            name=name,
+            type='income' if config['type'] == 'CREDIT' else 'expense',
+            is_system=True,
+        )
+        for name, config in _templates().items()
+    }
+    Category.objects.bulk_create(categories.values())
+
+    subcategories = {
+        name: [
+            Category(user=user, name=sub_name, type=categories[name].type, parent=categories[name])
+            for sub_name in sub_names
+        ]
+        for name, sub_names in SUBCATEGORIES.items()
+    }
+    Category.objects.bulk_create([sub for subs in subcategories.values() for sub in subs])
+    return categories, subcategories
+
+
+def _create_rules(user, categories) -> int:
+    from apps.banking.models import CategoryRule
+
+    rules = [
+        CategoryRule(
+            user=user,
+            pattern=merchant.lower(),
+            match_type='prefix',
+            category=categories[name],
+        )
+        for name, config in _templates().items()
+        for merchant in config['merchants'][:2]
+    ]
+    CategoryRule.objects.bulk_create(rules, ignore_conflicts=True)
+    return len(rules)
+
+
+def _create_bills(user, categories, months: int, rng: random.Random) -> int:
+    from apps.banking.models import Bill
+
+    today = timezone.now().date()
+    first_month = (today.replace(day=1) - timedelta(days=30 * (months - 1))).replace(day=1)
+
+    bills = []
+    month = first_month
+    # Past months plus two months of upcoming bills
+    while month <= today.replace(day=1) + timedelta(days=62):
+        for bill_type, templates in (('payable', PAYABLE_BILLS), ('receivable', RECEIVABLE_BILLS)):
+            for description, amount, due_day, category_name in templates:
+                due_date = month.replace(day=min(due_day, 28))
+                is_past = due_date < today
+                # Most past bills are settled; a few stay open and become overdue
+                paid = is_past and rng.random() > 0.1
+                bills.append(Bill(
+                    user=user,
+                    type=bill_type,
+                    description=f'{description} - {due_date:%m/%Y}',
+                    amount=amount,
+                    amount_paid=amount if paid else Decimal('0.00'),
+                    due_date=due_date,
+                    status='paid' if paid else 'pending',
+                    paid_at=timezone.now() if paid else None,
+                    category=categories[category_name],
+                ))
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    Bill.objects.bulk_create(bills, batch_size=1000)
+    return len(bills)
+
+
+def _create_transactions(
+    accounts,
+    categories,
+    subcategories,
+    count: int,
+    months: int,
+    rng: random.Random,
+    log: Callable[[str], None]
+) -> int:
+    from apps.banking.models import Transaction
+
+    templates = _templates()
+    names = list(templates)
+    weights = [templates[name]['frequency'] for name in names]
+    checking, savings, credit_card = accounts
+
+    now = timezone.now()
+    span_seconds = months * 30 * 24 * 3600
+
+    created = 0
+    while created < count:
+        batch = []
+        for _ in range(min(TRANSACTION_BATCH_SIZE, count - created)):
+            name = rng.choices(names, weights)[0]
+            config = templates[name]
+            merchant = rng.choice(config['merchants'])
+
+            amount = rng.uniform(*config['amount_range'])
+            if rng.random() < OUTLIER_RATIO:
+                amount *= rng.uniform(4, 10)
+
+            if config['type'] == 'CREDIT':
+                account = savings if name == 'Investimentos' else checking
+            else:
+                account = credit_card if rng.random() < 0.4 else checking
+
+            categorized = rng.random() >= UNCATEGORIZED_RATIO
+            subs = subcategories.get(name)
+            batch.append(Transaction(
+                account=account,
+                pluggy_transaction_id=f'bench_{uuid.uuid4().hex}',
+                type=config['type'],
+                description=merchant,
+                amount=Decimal(str(round(amount, 2))),
+                date=now - timedelta(seconds=rng.randrange(span_seconds)),
+                pluggy_category=name,
+                pluggy_category_id=PLUGGY_CATEGORY_IDS.get(name, ''),
+                merchant_name=merchant,
+                merchant_category=name,
+                user_category=categories[name] if categorized else None,
+                user_subcategory=rng.choice(subs) if categorized and subs else None,
+            ))
+
+        Transaction.objects.bulk_create(batch)
+        created += len(batch)
+        log(f'  {created}/{count} transactions')
+
+    return created
+
+
+def generate_dataset(
+    transactions: int,
+    users: int = 1,
+    months: int = 24,
+    seed: int = 42,
+    label: Optional[str] = None,
+    log: Callable[[str], None] = logger.info
+) -> Dict[str, Any]:
+    """
+    Bulk-create a synthetic dataset and rebuild its report rollups.
+
+    Transactions are split evenly between users and spread uniformly over
+    the last `months` months. Descriptions, amounts and category frequencies
+    follow populate_test_transactions' personal templates; a share of the
+    rows is left without a user category and a few carry outlier amounts.
+
+    Returns:
+        Dict describing the dataset (the first user is the benchmark target)
+    """
+    from . import rollups
+
+    rng = random.Random(seed)
+    label = label or str(transactions)
+    per_user = [transactions // users + (1 if i < transactions % users else 0) for i in range(users)]
+
+    summary = {
+        'label': label,
+        'transactions': 0,
+        'users': users,
+        'accounts': 0,
+        'categories': 0,
+        'rules': 0,
+        'bills': 0,
+        'rollup_rows': 0,
+        'months': months,
+        'seed': seed,
+        'user_ids': [],
+    }
+
+    for index, count in enumerate(per_user):
+        log(f'Generating user {index + 1}/{users} ({count} transactions)')
+        with transaction_db.atomic():
+            user, accounts = _create_user(index, label)
+            categories, subcategories = _create_categories(user)
+            summary['rules'] += _create_rules(user, categories)
+            summary['bills'] += _create_bills(user, categories, months, rng)
+            summary['transactions'] += _create_transactions(
+                accounts, categories, subcategories, count, months, rng, log
+            )
+
+        summary['rollup_rows'] += rollups.rebuild(user=user, batch_size=TRANSACTION_BATCH_SIZE)
+        summary['accounts'] += len(accounts)
+        summary['categories'] += len(categories) + sum(len(subs) for subs in subcategories.values())
+        summary['user_ids'].append(str(user.id))
+
+    return summary
+
+
+def _scenarios(user) -> List[Tuple[str, Callable[[], Any]]]:
+    from apps.ai_insights.services.alerts_service import AlertsService
+    from apps.ai_insights.services.data_aggregator import DataAggregator
+    from .services import ReportsService
+
+    now = timezone.now()
+    last_30 = now - timedelta(days=30)
+    last_year = now - timedelta(days=365)
+    previous_year = last_year - timedelta(days=365)
+    last_month = now.replace(day=1) - timedelta(days=1)
+
+    return [
+        ('cash_flow_daily_30d', lambda: ReportsService.get_cash_flow_report(user, last_30, now, 'daily')),
+        ('cash_flow_weekly_1y', lambda: ReportsService.get_cash_flow_report(user, last_year, now, 'weekly')),
+        ('cash_flow_monthly_1y', lambda: ReportsService.get_cash_flow_report(user, last_year, now, 'monthly')),
+        ('cash_flow_yearly_2y', lambda: ReportsService.get_cash_flow_report(user, previous_year, now, 'yearly')),
+        ('category_breakdown_expenses_1y', lambda: ReportsService.get_category_breakdown(user, last_year, now, 'DEBIT')),
+        ('category_breakdown_income_1y', lambda: ReportsService.get_category_breakdown(user, last_year, now, 'CREDIT')),
+        ('account_balances_90d', lambda: ReportsService.get_account_balances_evolution(user, now - timedelta(days=90), now)),
+        ('account_balances_1y', lambda: ReportsService.get_account_balances_evolution(user, last_year, now)),
+        ('monthly_summary', lambda: ReportsService.get_monthly_summary(user, last_month.month, last_month.year)),
+        ('trend_analysis_12m', lambda: ReportsService.get_trend_analysis(user, 12, now)),
+        ('comparison_30d', lambda: ReportsService.get_comparison_report(
+            user, last_30 - timedelta(days=30), last_30, last_30, now
+        )),
+        ('dre_1y', lambda: ReportsService.get_dre_report(user, last_year, now)),
+        ('dre_1y_compare', lambda: ReportsService.get_dre_report(
+            user, last_year, now, previous_year, last_year - timedelta(days=1)
+        )),
+        ('dre_matrix_monthly_2y', lambda: ReportsService.get_dre_matrix(user, previous_year, now, 'monthly')),
+        ('dre_matrix_yearly_2y', lambda: ReportsService.get_dre_matrix(user, previous_year, now, 'yearly')),
+        ('export_dre_pdf_compare', lambda: ReportsService.export_dre_pdf(
+            user, last_year, now, previous_year, last_year - timedelta(days=1)
+        )),
+        ('export_dre_excel_compare', lambda: ReportsService.export_dre_excel(
+            user, last_year, now, previous_year, last_year - timedelta(days=1)
+        )),
+        ('export_dre_matrix_pdf_2y', lambda: ReportsService.export_dre_pdf(
+            user, previous_year, now, granularity='monthly'
+        )),
+        ('export_dre_matrix_excel_2y', lambda: ReportsService.export_dre_excel(
+            user, previous_year, now, granularity='monthly'
+        )),
+        ('data_aggregator', lambda: DataAggregator(user).aggregate_data()),
+        ('alerts', lambda: AlertsService(user).generate_alerts()),
+    ]
+
+
+def _run_scenario(compute: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    timings = []
+    queries = None
+    output_bytes = None
+
+    for run in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            result = compute()
+            timings.append((time.perf_counter() - started) * 1000)
+        if queries is None:
+            queries = len(captured.captured_queries)
+        if isinstance(result, bytes):
+            output_bytes = len(result)
+
+    stats = {
+        'runs': repeat,
+        'queries': queries,
+        'first_ms': round(timings[0], 2),
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+    }
+    if output_bytes is not None:
+        stats['output_bytes'] = output_bytes
+    return stats
+
+
+def run_scenarios(
+    user,
+    repeat: int = 3,
+    only: Optional[List[str]] = None,
+    log: Callable[[str], None] = logger.info
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Time each scenario `repeat` times against `user`.
+
+    Results carry the query count of the first run and first/min/median/max
+    wall time in milliseconds. A failing scenario is recorded with its error
+    instead of aborting the run.
+    """
+    results = {}
+    for name, compute in _scenarios(user):
+        if only and name not in only:
+            continue
+        try:
+            results[name] = _run_scenario(compute, repeat)
+        except Exception as e:
+            logger.exception(f'Benchmark scenario {name} failed')
+            results[name] = {'error': str(e)}
+        log(f'  {name}: {results[name]}')
+    return results
+
+
+def scenario_names() -> List[str]:
+    return [name for name, _ in _scenarios(None)]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-scenario median time and query count deltas between two result files."""
+    rows = []
+    for name, stats in current.get('scenarios', {}).items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous or 'error' in stats or 'error' in previous:
+            continue
+        rows.append({
+            'scenario': name,
+            'median_ms': stats['median_ms'],
+            'baseline_median_ms': previous['median_ms'],
+            'change_pct': round(
+                (stats['median_ms'] - previous['median_ms']) / previous['median_ms'] * 100, 1
+            ) if previous['median_ms'] else None,
+            'queries': stats['queries'],
+            'baseline_queries': previous['queries'],
+        })
+    return rows
+
+
+def environment() -> Dict[str, Any]:
+    """Metadata stored alongside results (database vendor, git revision, time)."""
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+
+    return {
+        'created_at': timezone.now().isoformat(),
+        'git_revision': revision,
+        'database': connection.vendor,
+    }
@@ -0,0 +1,282 @@
+"""
+Incremental per-category statistics.
+
+rollups.refresh() hands apply() the rollup rows it is about to delete and the
+ones it writes in their place. Each rollup row is a partial aggregate
+(count, total, sum of squares) of one account/day/category bucket; apply()
+removes the old partials from CategoryStats and merges the new ones with the
+parallel form of Welford's algorithm (Chan et al.), so count, mean and m2 stay
+exact without rereading the user's history. rebuild() recomputes them from
+the rollups.
+
+There is one row per (user, type, user_category, pluggy_category_id). Two
+refreshes of the same user may both find a key missing and insert it; the
+one that loses on the unique constraint merges its rows into the winner's.
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction as transaction_db
+from django.db.models import Max, Sum
+from django.db.models.functions import TruncMonth
+
+logger = logging.getLogger(__name__)
+
+StatsKey = Tuple[str, Optional[int], str]
+Partial = Tuple[int, float, float]  # (count, mean, m2)
+
+REBUILD_ATTEMPTS = 3
+
+
+def _value(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def key_of(row) -> StatsKey:
+    """(type, user_category_id, pluggy_category_id) of a rollup or stats row."""
+    return (_value(row, 'type'), _value(row, 'user_category_id'), _value(row, 'pluggy_category_id') or '')
+
+
+def partial_of(count: int, total, sum_squares) -> Partial:
+    """(count, mean, m2) of a group from its count, sum and sum of squares."""
+    if not count:
+        return 0, 0.0, 0.0
+    total = Decimal(total or 0)
+    m2 = Decimal(sum_squares or 0) - total * total / count
+    return count, float(total / count), max(float(m2), 0.0)
+
+
+def merge(a: Partial, b: Partial) -> Partial:
+    """Statistics of the union of two groups."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    if n <= 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+
+def remove(total: Partial, part: Partial) -> Partial:
+    """Statistics of `total` without the group `part` (inverse of merge)."""
+    n, mean, m2 = total
+    n_b, mean_b, m2_b = part
+    n_a = n - n_b
+    if n_a <= 0:
+        return 0, 0.0, 0.0
+    mean_a = (n * mean - n_b * mean_b) / n_a
+    delta = mean_b - mean_a
+    m2_a = m2 - m2_b - delta * delta * n_a * n_b / n
+    return n_a, mean_a, max(m2_a, 0.0)
+
+
+def _previous_month(month: date) -> date:
+    return (month.replace(day=1) - date.resolution).replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + 4 * date.resolution).replace(day=1)
+
+
+def _shift_window(stats, day: date, amount: Decimal):
+    """Add `amount` (negative to remove) to the month window of `stats`."""
+    month = day.replace(day=1)
+    if stats.month is None or month > stats.month:
+        if amount <= 0:
+            return
+        previous = stats.month_total if stats.month and month == _next_month(stats.month) else Decimal('0')
+        stats.previous_month_total = previous
+        stats.month_total = amount
+        stats.month = month
+    elif month == stats.month:
+        stats.month_total += amount
+    elif month == _previous_month(stats.month):
+        stats.previous_month_total += amount
+
+
+def _new_stats(user_id: int, key: StatsKey):
+    from .models import CategoryStats
+
+    transaction_type, user_category_id, pluggy_category_id = key
+    return CategoryStats(
+        user_id=user_id,
+        type=transaction_type,
+        user_category_id=user_category_id,
+        pluggy_category_id=pluggy_category_id,
+    )
+
+
+def _update(stats, old_rows, new_rows):
+    """Remove the `old_rows` rollup rows from `stats` and merge the `new_rows`."""
+    current = (stats.count, stats.mean, stats.m2)
+    for row in old_rows:
+        current = remove(current, partial_of(row.count, row.total, row.sum_squares))
+        stats.total -= row.total
+        _shift_window(stats, row.day, -row.total)
+    for row in new_rows:
+        current = merge(current, partial_of(row.count, row.total, row.sum_squares))
+        stats.total += row.total
+        _shift_window(stats, row.day, row.total)
+        stats.pluggy_category = row.pluggy_category or stats.pluggy_category
+    stats.count, stats.mean, stats.m2 = current
+
+
+def _create(user_id: int, rows, changes):
+    """
+    Insert new CategoryStats rows. A row inserted meanwhile by a concurrent
+    refresh of the same user is locked and merged with the added rollup rows
+    instead.
+    """
+    from .models import CategoryStats
+
+    try:
+        with transaction_db.atomic():
+            CategoryStats.objects.bulk_create(rows)
+        return
+    except IntegrityError:
+        pass
+
+    for stats in rows:
+        key = key_of(stats)
+        try:
+            with transaction_db.atomic():
+                stats.save(force_insert=True)
+        except IntegrityError:
+            transaction_type, user_category_id, pluggy_category_id = key
+            current = CategoryStats.objects.select_for_update().get(
+                user_id=user_id,
+                type=transaction_type,
+                user_category_id=user_category_id,
+                pluggy_category_id=pluggy_category_id,
+            )
+            _update(current, [], changes[key][1])
+            current.save()
+
+
+def apply(user_id: int, removed: Iterable, added: Iterable) -> int:
+    """
+    Replace the `removed` rollup rows of a user with the `added` ones in the
+    user's CategoryStats. Call inside the transaction that rewrites the rollups.
+
+    Returns:
+        Number of CategoryStats rows touched
+    """
+    from .models import CategoryStats
+
+    changes = defaultdict(lambda: ([], []))
+    for row in removed:
+        changes[key_of(row)][0].append(row)
+    for row in added:
+        changes[key_of(row)][1].append(row)
+    if not changes:
+        return 0
+
+    existing = {}
+    for stats in CategoryStats.objects.select_for_update().filter(user_id=user_id):
+        existing.setdefault(key_of(stats), stats)
+
+    to_create, to_update, to_delete = [], [], []
+    for key, (old_rows, new_rows) in changes.items():
+        stats = existing.get(key)
+        if stats is None:
+            if not new_rows:
+                continue
+            stats = _new_stats(user_id, key)
+            old_rows = []  # nothing to remove from a row that did not exist
+
+        _update(stats, old_rows, new_rows)
+
+        if stats.count <= 0:
+            if stats.pk:
+                to_delete.append(stats.pk)
+        elif stats.pk:
+            to_update.append(stats)
+        else:
+            to_create.append(stats)
+
+    if to_delete:
+        CategoryStats.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        CategoryStats.objects.bulk_update(to_update, [
+            'count', 'total', 'mean', 'm2', 'month', 'month_total', 'previous_month_total', 'pluggy_category'
+        ])
+    if to_create:
+        _create(user_id, to_create, changes)
+
+    return len(to_delete) + len(to_update) + len(to_create)
+
+
+def rebuild(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute CategoryStats from the rollups.
+
+    Args:
+        user_ids: Restrict to these users (None = all users)
+
+    Returns:
+        Number of CategoryStats rows written
+    """
+    from .models import CategoryStats, DailyAccountCategoryRollup
+
+    rollups = DailyAccountCategoryRollup.objects.all()
+    stats = CategoryStats.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+
+    for attempt in range(REBUILD_ATTEMPTS):
+        built = _build(rollups)
+        try:
+            with transaction_db.atomic():
+                stats.delete()
+                CategoryStats.objects.bulk_create(built.values(), batch_size=1000)
+            break
+        except IntegrityError:
+            # A concurrent refresh inserted one of the rows meanwhile
+            if attempt == REBUILD_ATTEMPTS - 1:
+                raise
+            logger.warning("Category stats rebuild conflicted with a refresh, retrying")
+
+    logger.info(f"Rebuilt {len(built)} category stats rows")
+    return len(built)
+
+
+def _build(rollups) -> dict:
+    """CategoryStats rows (unsaved) of the given rollups, by (user_id,) + key."""
+    from .models import CategoryStats
+
+    monthly = rollups.order_by().annotate(
+        month=TruncMonth('day')
+    ).values(
+        'user_id', 'type', 'user_category_id', 'pluggy_category_id', 'month'
+    ).annotate(
+        month_total=Sum('total'),
+        month_count=Sum('count'),
+        month_squares=Sum('sum_squares'),
+        pluggy_category_name=Max('pluggy_category'),
+    ).filter(month_count__gt=0)
+
+    built = {}
+    for item in monthly.iterator():
+        key = (item['user_id'],) + key_of(item)
+        row = built.get(key)
+        if row is None:
+            row = built[key] = CategoryStats(
+                user_id=item['user_id'],
+                type=item['type'],
+                user_category_id=item['user_category_id'],
+                pluggy_category_id=item['pluggy_category_id'] or '',
+            )
+        partial = partial_of(item['month_count'], item['month_total'], item['month_squares'])
+        row.count, row.mean, row.m2 = merge((row.count, row.mean, row.m2), partial)
+        row.total += item['month_total']
+        row.pluggy_category = item['pluggy_category_name'] or row.pluggy_category
+        _shift_window(row, item['month'], item['month_total'])
+
+    return built
@@ -5,10 +5,15 @@ Maps Pluggy category IDs to DRE groups for financial reporting.
 Based on Brazilian accounting standards for SMEs (NBC TG 1000).
 """
 
+import json
+import os
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from django.db.models import Case, Q, Value, When
+
 
 class DREGroup(Enum):
     """DRE group identifiers."""
@@ -120,12 +125,13 @@ DRE_GROUPS: Dict[str, DREGroupConfig] = {
 }
 
 
-def get_dre_group_for_category(
+def _resolve_dre_group(
     pluggy_category_id: Optional[str],
     transaction_type: str
 ) -> Optional[str]:
     """
-    Determine which DRE group a transaction belongs to based on its category.
+    Rule-based DRE group resolution (scans the DRE_GROUPS prefix/id lists).
+    Used to compile DRE_CATEGORY_GROUPS and for category IDs not in it.
 
     Args:
         pluggy_category_id: The Pluggy category ID (e.g., "01010000")
@@ -174,6 +180,38 @@ def get_dre_group_for_category(
     return None
 
 
+_MISSING = object()
+
+
+def get_dre_group_for_category(
+    pluggy_category_id: Optional[str],
+    transaction_type: str
+) -> Optional[str]:
+    """
+    Determine which DRE group a transaction belongs to based on its category.
+
+    Known category IDs are a direct lookup in DRE_CATEGORY_GROUPS; unknown
+    ones go through the rules once and are cached.
+
+    Args:
+        pluggy_category_id: The Pluggy category ID (e.g., "01010000")
+        transaction_type: "CREDIT" or "DEBIT"
+
+    Returns:
+        DRE group ID or None if transaction should be excluded
+    """
+    if pluggy_category_id:
+        group = DRE_CATEGORY_GROUPS.get(pluggy_category_id, _MISSING)
+        if group is not _MISSING:
+            return group
+    return _resolve_unknown_dre_group(pluggy_category_id or '', transaction_type)
+
+
+@lru_cache(maxsize=1024)
+def _resolve_unknown_dre_group(pluggy_category_id: str, transaction_type: str) -> Optional[str]:
+    return _resolve_dre_group(pluggy_category_id, transaction_type)
+
+
 def get_dre_structure() -> List[Dict]:
     """
     Get the DRE structure for display.
@@ -291,6 +329,20 @@ def get_category_display_name(
 
 
 def get_parent_category_id(pluggy_category_id: Optional[str]) -> Optional[str]:
+    """
+    Get the parent category ID for hierarchical grouping (direct lookup in
+    PARENT_CATEGORY_IDS for known categories).
+    """
+    if not pluggy_category_id:
+        return None
+    parent_id = PARENT_CATEGORY_IDS.get(pluggy_category_id, _MISSING)
+    if parent_id is not _MISSING:
+        return parent_id
+    return _compute_parent_category_id(pluggy_category_id)
+
+
+@lru_cache(maxsize=1024)
+def _compute_parent_category_id(pluggy_category_id: Optional[str]) -> Optional[str]:
     """
     Get the parent category ID for hierarchical grouping.
 
@@ -320,3 +372,89 @@ def get_parent_category_id(pluggy_category_id: Optional[str]) -> Optional[str]:
 
     # Second level, get first level parent
     return pluggy_category_id[:2] + "000000"
+
+
+# =============================================================================
+# Precompiled lookup tables
+# =============================================================================
+
+PLUGGY_CATEGORIES_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'banking', 'pluggy_categories.json'
+)
+
+
+def _load_known_category_ids() -> List[str]:
+    """Every category ID we know of: pluggy_categories.json plus the translations."""
+    try:
+        with open(PLUGGY_CATEGORIES_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        ids = [category['id'] for category in data.get('results', []) if category.get('id')]
+    except (OSError, ValueError):
+        ids = []
+    return sorted(set(ids) | set(PLUGGY_CATEGORY_TRANSLATIONS))
+
+
+def _compile_category_groups(category_ids: List[str]) -> Dict[str, Optional[str]]:
+    """
+    category_id -> DRE group (None = excluded). IDs whose group would depend on
+    the transaction type (only the type fallback does) are left out and
+    resolved at lookup time.
+    """
+    table = {}
+    for category_id in category_ids:
+        credit_group = _resolve_dre_group(category_id, 'CREDIT')
+        if credit_group == _resolve_dre_group(category_id, 'DEBIT'):
+            table[category_id] = credit_group
+    return table
+
+
+KNOWN_CATEGORY_IDS: List[str] = _load_known_category_ids()
+DRE_CATEGORY_GROUPS: Dict[str, Optional[str]] = _compile_category_groups(KNOWN_CATEGORY_IDS)
+PARENT_CATEGORY_IDS: Dict[str, Optional[str]] = {
+    category_id: _compute_parent_category_id(category_id) for category_id in KNOWN_CATEGORY_IDS
+}
+
+
+def dre_group_case(category_field: str = 'pluggy_category_id', type_field: str = 'type') -> Case:
+    """
+    SQL version of get_dre_group_for_category, for annotating querysets.
+
+    Known IDs map through DRE_CATEGORY_GROUPS (IN lists); unknown IDs follow
+    the same prefix rules, then the transaction type fallback. Excluded
+    movements map to DREGroup.EXCLUIDAS instead of NULL so they can be
+    filtered out in the query.
+    """
+    excluded = DREGroup.EXCLUIDAS.value
+    whens = []
+
+    # Known categories
+    ids_by_group: Dict[str, List[str]] = {}
+    for category_id, group in DRE_CATEGORY_GROUPS.items():
+        ids_by_group.setdefault(group or excluded, []).append(category_id)
+    for group, category_ids in ids_by_group.items():
+        whens.append(When(Q(**{f'{category_field}__in': category_ids}), then=Value(group)))
+
+    # Unknown categories: same rule order as _resolve_dre_group
+    for group_id, config in DRE_GROUPS.items():
+        if group_id == excluded:
+            continue
+        if config.pluggy_ids:
+            whens.append(When(Q(**{f'{category_field}__in': config.pluggy_ids}), then=Value(group_id)))
+        for prefix in config.pluggy_prefixes:
+            condition = Q(**{f'{category_field}__startswith': prefix})
+            if config.except_ids:
+                condition &= ~Q(**{f'{category_field}__in': config.except_ids})
+            whens.append(When(condition, then=Value(group_id)))
+
+    excluded_config = DRE_GROUPS[excluded]
+    for prefix in excluded_config.pluggy_prefixes:
+        condition = Q(**{f'{category_field}__startswith': prefix})
+        if excluded_config.except_ids:
+            condition &= ~Q(**{f'{category_field}__in': excluded_config.except_ids})
+        whens.append(When(condition, then=Value(excluded)))
+
+    # Uncategorized / unmatched: fallback by transaction type
+    whens.append(When(Q(**{type_field: 'CREDIT'}), then=Value(DREGroup.RECEITAS_OPERACIONAIS.value)))
+    whens.append(When(Q(**{type_field: 'DEBIT'}), then=Value(DREGroup.DESPESAS_OPERACIONAIS.value)))
+
+    return Case(*whens, default=Value(None))
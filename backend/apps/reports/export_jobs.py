@@ -0,0 +1,170 @@
+"""
+Background report exports.
+
+request_export() creates (or reuses) a ReportExport and queues the Celery
+task; render() builds the file with ReportsService and stores its bytes on
+the ReportExport row (the worker and web services don't share a filesystem);
+cleanup() removes old exports.
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Tuple
+
+from django.db import IntegrityError, transaction as transaction_db
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EXPORT_RETENTION_DAYS = 7
+STALE_AFTER = timedelta(minutes=30)  # active jobs older than this are considered lost
+
+
+def params_hash(report_type: str, file_format: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {'report_type': report_type, 'file_format': file_format, 'params': params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def request_export(user, file_format: str, params: Dict[str, Any], report_type: str = 'dre') -> Tuple[Any, bool]:
+    """
+    Create an export job, or return the pending/processing one with the same
+    parameters.
+
+    Returns:
+        (ReportExport, created)
+    """
+    from .models import ReportExport
+    from .tasks import render_report_export
+
+    digest = params_hash(report_type, file_format, params)
+    active = ReportExport.objects.filter(
+        user=user,
+        params_hash=digest,
+        status__in=[ReportExport.STATUS_PENDING, ReportExport.STATUS_PROCESSING]
+    )
+
+    # A worker that died mid-job must not block new requests forever
+    active.filter(created_at__lt=timezone.now() - STALE_AFTER).update(
+        status=ReportExport.STATUS_FAILED,
+        error_message='Export timed out'
+    )
+
+    existing = active.first()
+    if existing:
+        return existing, False
+
+    try:
+        with transaction_db.atomic():
+            export = ReportExport.objects.create(
+                user=user,
+                report_type=report_type,
+                file_format=file_format,
+                params=params,
+                params_hash=digest,
+            )
+    except IntegrityError:
+        # A concurrent request created the same job first; it may already
+        # have finished, so don't filter on status here
+        return ReportExport.objects.filter(
+            user=user, params_hash=digest
+        ).defer('content').first(), False
+
+    export_id = str(export.id)
+    transaction_db.on_commit(lambda: render_report_export.delay(export_id))
+    return export, True
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=dt_timezone.utc)
+
+
+def _render_dre(export) -> bytes:
+    from .services import ReportsService
+
+    params = export.params
+    start_date = _parse_date(params['start_date'])
+    end_date = _parse_date(params['end_date'])
+    granularity = params.get('granularity')
+
+    compare_start = None
+    compare_end = None
+    if params.get('compare_with_previous') and not granularity:
+        period_days = (end_date - start_date).days
+        compare_end = start_date - timedelta(days=1)
+        compare_start = compare_end - timedelta(days=period_days)
+
+    exporter = ReportsService.export_dre_pdf if export.file_format == 'pdf' else ReportsService.export_dre_excel
+    return exporter(
+        user=export.user,
+        start_date=start_date,
+        end_date=end_date,
+        compare_start=compare_start,
+        compare_end=compare_end,
+        granularity=granularity
+    )
+
+
+RENDERERS = {
+    'dre': _render_dre,
+}
+
+
+def render(export_id) -> bool:
+    """
+    Render an export and store the file. Returns False if the job was
+    already taken by another worker (or no longer exists).
+    """
+    from .models import ReportExport
+
+    claimed = ReportExport.objects.filter(
+        id=export_id, status=ReportExport.STATUS_PENDING
+    ).update(status=ReportExport.STATUS_PROCESSING, started_at=timezone.now())
+    if not claimed:
+        return False
+
+    export = ReportExport.objects.select_related('user').get(id=export_id)
+    started = time.monotonic()
+
+    try:
+        content = RENDERERS[export.report_type](export)
+    except Exception as e:
+        logger.error(f"Report export {export_id} failed: {str(e)}")
+        export.status = ReportExport.STATUS_FAILED
+        export.error_message = str(e)
+        export.completed_at = timezone.now()
+        export.duration_ms = int((time.monotonic() - started) * 1000)
+        export.save(update_fields=['status', 'error_message', 'completed_at', 'duration_ms'])
+        return True
+
+    export.content = content
+    export.file_size = len(content)
+    export.duration_ms = int((time.monotonic() - started) * 1000)
+    export.status = ReportExport.STATUS_COMPLETED
+    export.completed_at = timezone.now()
+    export.save(update_fields=['content', 'file_size', 'duration_ms', 'status', 'completed_at'])
+
+    logger.info(
+        f"Report export {export_id} rendered: {export.file_size} bytes in {export.duration_ms}ms"
+    )
+    return True
+
+
+def cleanup(retention_days: int = EXPORT_RETENTION_DAYS) -> int:
+    """
+    Delete exports older than retention_days (the file goes with the row).
+
+    Returns:
+        Number of exports deleted
+    """
+    from .models import ReportExport
+
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = ReportExport.objects.filter(created_at__lt=cutoff).delete()
+    logger.info(f"Deleted {deleted} old report exports")
+    return deleted
@@ -0,0 +1,158 @@
+"""
+Management command to benchmark reports against a synthetic dataset.
+"""
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.reports import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset and time every report (results written to JSON)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=str,
+            choices=list(benchmark.DATASET_SIZES),
+            default='10k',
+            help='Dataset size (default: 10k)'
+        )
+        parser.add_argument(
+            '--transactions',
+            type=int,
+            help='Exact number of transactions (overrides --size)'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1,
+            help='Users to split the transactions between; the first one is benchmarked (default: 1)'
+        )
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=24,
+            help='History length in months (default: 24)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the generator (default: 42)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per scenario (default: 3)'
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=benchmark.scenario_names(),
+            help='Only run this scenario (can be repeated)'
+        )
+        parser.add_argument(
+            '--reuse',
+            action='store_true',
+            help='Benchmark the existing dataset of this size instead of generating a new one'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the generated dataset after the run'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Results file (default: benchmark_results/reports_<size>_<timestamp>.json)'
+        )
+        parser.add_argument(
+            '--compare',
+            type=str,
+            help='Previous results file to compare against'
+        )
+
+    def handle(self, *args, **options):
+        size = options['size']
+        transactions = options['transactions'] or benchmark.DATASET_SIZES[size]
+        label = size if not options['transactions'] else str(transactions)
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+
+        if options['reuse']:
+            user = benchmark.benchmark_users().filter(email__startswith=f'bench-{label}-0@').first()
+            if not user:
+                raise CommandError(f'No benchmark dataset "{label}" found, run without --reuse first')
+            dataset = {'label': label, 'reused': True, 'user_ids': [str(user.id)]}
+            generation_seconds = 0
+        else:
+            if benchmark.benchmark_users().filter(email__startswith=f'bench-{label}-').exists():
+                raise CommandError(f'Benchmark dataset "{label}" already exists, use --reuse or delete it first')
+
+            self.stdout.write(self.style.WARNING(f'Generating {transactions} transactions ({label})...'))
+            started = timezone.now()
+            dataset = benchmark.generate_dataset(
+                transactions=transactions,
+                users=options['users'],
+                months=options['months'],
+                seed=options['seed'],
+                label=label,
+                log=self.stdout.write,
+            )
+            generation_seconds = round((timezone.now() - started).total_seconds(), 2)
+            user = benchmark.benchmark_users().get(id=dataset['user_ids'][0])
+            self.stdout.write(self.style.SUCCESS(f'Dataset generated in {generation_seconds}s'))
+
+        try:
+            self.stdout.write(self.style.WARNING(f"Running scenarios ({options['repeat']} runs each)..."))
+            scenarios = benchmark.run_scenarios(
+                user,
+                repeat=options['repeat'],
+                only=options['scenario'],
+                log=self.stdout.write,
+            )
+        finally:
+            if not options['keep'] and not options['reuse']:
+                deleted = benchmark.delete_dataset()
+                self.stdout.write(f'Deleted {deleted} benchmark users')
+
+        results = {
+            **benchmark.environment(),
+            'dataset': dataset,
+            'generation_seconds': generation_seconds,
+            'repeat': options['repeat'],
+            'scenarios': scenarios,
+        }
+
+        output = options['output'] or os.path.join(
+            'benchmark_results',
+            f"reports_{label}_{timezone.now():%Y%m%d_%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if baseline:
+            self.stdout.write('\n' + '=' * 70)
+            self.stdout.write(f"{'Scenario':<32}{'Median (ms)':>14}{'Baseline':>12}{'Change':>9}{'Queries':>10}")
+            self.stdout.write('=' * 70)
+            for row in benchmark.compare(baseline, results):
+                change = f"{row['change_pct']:+.1f}%" if row['change_pct'] is not None else '-'
+                queries = f"{row['baseline_queries']}→{row['queries']}"
+                self.stdout.write(
+                    f"{row['scenario']:<32}{row['median_ms']:>14.2f}{row['baseline_median_ms']:>12.2f}"
+                    f"{change:>9}{queries:>10}"
+                )
@@ -0,0 +1,43 @@
+"""
+Management command to rebuild the daily report rollups from transactions.
+"""
+
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from apps.reports import rollups
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyAccountCategoryRollup from raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user-email',
+            type=str,
+            help='Only rebuild rollups for this user (default: all users)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='bulk_create batch size'
+        )
+
+    def handle(self, *args, **options):
+        email = options.get('user_email')
+        user = None
+
+        if email:
+            try:
+                user = User.objects.get(email=email)
+            except User.DoesNotExist:
+                self.stdout.write(self.style.ERROR(f'User with email {email} not found'))
+                return
+
+        written = rollups.rebuild(user=user, batch_size=options['batch_size'])
+
+        scope = email or 'all users'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} rollup rows for {scope}'))
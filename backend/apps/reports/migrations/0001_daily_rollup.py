@@ -0,0 +1,39 @@
+# Generated by Django 4.2.11 on 2026-10-18 21:24
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('banking', '0019_bill_unique_installment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAccountCategoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.CharField(max_length=10)),
+                ('pluggy_category_id', models.CharField(blank=True, max_length=50)),
+                ('pluggy_category', models.CharField(blank=True, max_length=100)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='banking.bankaccount')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+                ('user_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='banking.category')),
+            ],
+            options={
+                'verbose_name': 'Daily Rollup',
+                'verbose_name_plural': 'Daily Rollups',
+                'indexes': [models.Index(fields=['user', 'day'], name='reports_dai_user_id_b65127_idx'), models.Index(fields=['account', 'day'], name='reports_dai_account_391f6c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated manually - Initial build of the daily rollup table
+
+from datetime import timezone as dt_timezone
+
+from django.db import migrations
+from django.db.models import Sum, Count, Max
+from django.db.models.functions import Abs, TruncDate
+
+
+def build_rollups(apps, schema_editor):
+    """Agrega todas as transações existentes na tabela de rollup, conta a conta."""
+    BankAccount = apps.get_model('banking', 'BankAccount')
+    Transaction = apps.get_model('banking', 'Transaction')
+    Rollup = apps.get_model('reports', 'DailyAccountCategoryRollup')
+
+    accounts = BankAccount.objects.values_list('id', 'connection__user_id')
+    for account_id, user_id in accounts.iterator():
+        aggregated = Transaction.objects.filter(
+            account_id=account_id
+        ).order_by().annotate(
+            day=TruncDate('date', tzinfo=dt_timezone.utc)
+        ).values(
+            'day', 'type', 'user_category_id', 'pluggy_category_id'
+        ).annotate(
+            total=Sum(Abs('amount')),
+            count=Count('id'),
+            pluggy_category_name=Max('pluggy_category'),
+        )
+
+        Rollup.objects.bulk_create([
+            Rollup(
+                user_id=user_id,
+                account_id=account_id,
+                day=item['day'],
+                type=item['type'],
+                user_category_id=item['user_category_id'],
+                pluggy_category_id=item['pluggy_category_id'] or '',
+                pluggy_category=item['pluggy_category_name'] or '',
+                total=item['total'] or 0,
+                count=item['count'],
+            )
+            for item in aggregated
+        ], batch_size=1000)
+
+
+def clear_rollups(apps, schema_editor):
+    apps.get_model('reports', 'DailyAccountCategoryRollup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_rollups, clear_rollups),
+    ]
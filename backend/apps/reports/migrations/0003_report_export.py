@@ -0,0 +1,46 @@
+# Generated by Django 4.2.11 on 2026-10-18 21:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0002_backfill_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportExport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('report_type', models.CharField(choices=[('dre', 'DRE')], default='dre', max_length=20)),
+                ('file_format', models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel')], max_length=10)),
+                ('params', models.JSONField(default=dict, help_text='Report parameters (dates as YYYY-MM-DD)')),
+                ('params_hash', models.CharField(help_text='Hash of report_type, file_format and params, used for deduplication', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('processing', 'Processando'), ('completed', 'Concluído'), ('failed', 'Falhou')], default='pending', max_length=20)),
+                ('file', models.FileField(blank=True, null=True, upload_to='reports/exports/%Y/%m/')),
+                ('file_size', models.BigIntegerField(blank=True, help_text='File size in bytes', null=True)),
+                ('duration_ms', models.IntegerField(blank=True, help_text='Rendering time in milliseconds', null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_exports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Report Export',
+                'verbose_name_plural': 'Report Exports',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='reports_rep_user_id_843a92_idx'), models.Index(fields=['status', 'created_at'], name='reports_rep_status_f4ce64_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reportexport',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'processing'])), fields=('user', 'params_hash'), name='reports_export_unique_active'),
+        ),
+    ]
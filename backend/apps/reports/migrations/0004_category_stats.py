@@ -0,0 +1,47 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:01
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0019_bill_unique_installment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0003_report_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyaccountcategoryrollup',
+            name='sum_squares',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=32),
+        ),
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=10)),
+                ('pluggy_category_id', models.CharField(blank=True, max_length=50)),
+                ('pluggy_category', models.CharField(blank=True, max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('mean', models.FloatField(default=0)),
+                ('m2', models.FloatField(default=0)),
+                ('month', models.DateField(blank=True, null=True)),
+                ('month_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('previous_month_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_stats', to=settings.AUTH_USER_MODEL)),
+                ('user_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='category_stats', to='banking.category')),
+            ],
+            options={
+                'verbose_name': 'Category Stats',
+                'verbose_name_plural': 'Category Stats',
+                'indexes': [models.Index(fields=['user', 'type'], name='reports_cat_user_id_51488e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated manually - Fill rollup sums of squares and build CategoryStats
+
+from datetime import timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import DecimalField, F, Max, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+
+
+def fill_sum_squares(apps, schema_editor):
+    """Recalcula a soma dos quadrados de cada rollup, conta a conta."""
+    Transaction = apps.get_model('banking', 'Transaction')
+    Rollup = apps.get_model('reports', 'DailyAccountCategoryRollup')
+
+    account_ids = Rollup.objects.values_list('account_id', flat=True).distinct()
+    for account_id in list(account_ids):
+        squares = Transaction.objects.filter(
+            account_id=account_id
+        ).order_by().annotate(
+            day=TruncDate('date', tzinfo=dt_timezone.utc)
+        ).values(
+            'day', 'type', 'user_category_id', 'pluggy_category_id'
+        ).annotate(
+            sum_squares=Sum(F('amount') * F('amount'), output_field=DecimalField(max_digits=32, decimal_places=4)),
+        )
+        by_key = {
+            (item['day'], item['type'], item['user_category_id'], item['pluggy_category_id'] or ''): item['sum_squares']
+            for item in squares
+        }
+
+        rows = list(Rollup.objects.filter(account_id=account_id))
+        for row in rows:
+            row.sum_squares = by_key.get(
+                (row.day, row.type, row.user_category_id, row.pluggy_category_id), 0
+            ) or 0
+        Rollup.objects.bulk_update(rows, ['sum_squares'], batch_size=1000)
+
+
+def build_category_stats(apps, schema_editor):
+    """Agrega os rollups de cada usuário por tipo e categoria."""
+    Rollup = apps.get_model('reports', 'DailyAccountCategoryRollup')
+    CategoryStats = apps.get_model('reports', 'CategoryStats')
+
+    monthly = Rollup.objects.order_by().annotate(
+        month=TruncMonth('day')
+    ).values(
+        'user_id', 'type', 'user_category_id', 'pluggy_category_id', 'month'
+    ).annotate(
+        month_total=Sum('total'),
+        month_count=Sum('count'),
+        month_squares=Sum('sum_squares'),
+        pluggy_category_name=Max('pluggy_category'),
+    ).filter(month_count__gt=0)
+
+    groups = {}
+    for item in monthly.iterator():
+        key = (item['user_id'], item['type'], item['user_category_id'], item['pluggy_category_id'] or '')
+        groups.setdefault(key, []).append(item)
+
+    stats = []
+    for (user_id, transaction_type, user_category_id, pluggy_category_id), months in groups.items():
+        count = sum(item['month_count'] for item in months)
+        total = sum((item['month_total'] for item in months), Decimal('0'))
+        sum_squares = sum((item['month_squares'] or Decimal('0') for item in months), Decimal('0'))
+        totals_by_month = {item['month']: item['month_total'] for item in months}
+        latest = max(totals_by_month)
+        previous = (latest - timedelta(days=1)).replace(day=1)
+        stats.append(CategoryStats(
+            user_id=user_id,
+            type=transaction_type,
+            user_category_id=user_category_id,
+            pluggy_category_id=pluggy_category_id,
+            pluggy_category=max(item['pluggy_category_name'] or '' for item in months),
+            count=count,
+            total=total,
+            mean=float(total / count),
+            m2=max(float(sum_squares - total * total / count), 0.0),
+            month=latest,
+            month_total=totals_by_month[latest],
+            previous_month_total=totals_by_month.get(previous, 0),
+        ))
+
+    CategoryStats.objects.bulk_create(stats, batch_size=1000)
+
+
+def clear_category_stats(apps, schema_editor):
+    apps.get_model('reports', 'CategoryStats').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_category_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_sum_squares, migrations.RunPython.noop),
+        migrations.RunPython(build_category_stats, clear_category_stats),
+    ]
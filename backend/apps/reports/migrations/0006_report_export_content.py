@@ -0,0 +1,22 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_backfill_category_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='reportexport',
+            name='file',
+        ),
+        migrations.AddField(
+            model_name='reportexport',
+            name='content',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
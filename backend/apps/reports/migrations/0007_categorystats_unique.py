@@ -0,0 +1,59 @@
+# Generated manually - One CategoryStats row per (user, type, category)
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor):
+    """
+    Fold duplicate CategoryStats rows (left by concurrent inserts) into one.
+
+    Each duplicate holds the statistics of a disjoint part of the rollups, so
+    they are combined as category_stats.merge does (Chan's parallel update).
+    """
+    CategoryStats = apps.get_model('reports', 'CategoryStats')
+
+    duplicates = CategoryStats.objects.values(
+        'user_id', 'type', 'user_category_id', 'pluggy_category_id'
+    ).annotate(rows=models.Count('id')).filter(rows__gt=1)
+
+    for key in duplicates.iterator():
+        key.pop('rows')
+        rows = list(CategoryStats.objects.filter(**key).order_by('month', 'id'))
+        kept = rows.pop()  # latest month window
+        for row in rows:
+            n = kept.count + row.count
+            if n > 0:
+                delta = row.mean - kept.mean
+                kept.m2 = kept.m2 + row.m2 + delta * delta * kept.count * row.count / n
+                kept.mean = kept.mean + delta * row.count / n
+            kept.count = n
+            kept.total += row.total
+            if row.month == kept.month:
+                kept.month_total += row.month_total
+                kept.previous_month_total += row.previous_month_total
+            elif row.month and kept.month and row.month == (kept.month - date.resolution).replace(day=1):
+                kept.previous_month_total += row.month_total
+            kept.pluggy_category = kept.pluggy_category or row.pluggy_category
+        kept.save()
+        CategoryStats.objects.filter(pk__in=[row.pk for row in rows]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0006_report_export_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='categorystats',
+            constraint=models.UniqueConstraint(condition=models.Q(('user_category__isnull', False)), fields=('user', 'type', 'user_category', 'pluggy_category_id'), name='reports_categorystats_unique_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='categorystats',
+            constraint=models.UniqueConstraint(condition=models.Q(('user_category__isnull', True)), fields=('user', 'type', 'pluggy_category_id'), name='reports_categorystats_unique_uncategorised'),
+        ),
+    ]
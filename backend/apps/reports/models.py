@@ -0,0 +1,216 @@
+"""
+Reports models.
+"""
+from django.db import models
+from django.db.models import Q
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+import uuid
+
+from apps.banking.models import BankAccount, Category
+
+User = get_user_model()
+
+
+class DailyAccountCategoryRollup(models.Model):
+    """
+    Daily transaction totals per account, type and category.
+
+    Maintained incrementally by the banking write paths (sync upsert,
+    recategorisation and deletion) through apps.reports.rollups, and rebuilt
+    from scratch with `manage.py rebuild_report_rollups`. Reports read from
+    this table so their cost depends on days x categories, not on the number
+    of transactions.
+
+    `day` is the UTC calendar day of Transaction.date, matching the UTC
+    boundaries used by ReportsViewSet._parse_date. `total` is the sum of the
+    absolute amounts (the direction is carried by `type`) and `sum_squares`
+    the sum of their squares, from which CategoryStats derives variances.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_rollups')
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='daily_rollups')
+    day = models.DateField()
+    type = models.CharField(max_length=10)  # CREDIT / DEBIT
+
+    # Categorization (same keys the DRE uses)
+    user_category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_rollups'
+    )
+    pluggy_category_id = models.CharField(max_length=50, blank=True)
+    pluggy_category = models.CharField(max_length=100, blank=True)
+
+    # Aggregates
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    count = models.IntegerField(default=0)
+    sum_squares = models.DecimalField(max_digits=32, decimal_places=4, default=Decimal('0.0000'))
+
+    class Meta:
+        verbose_name = 'Daily Rollup'
+        verbose_name_plural = 'Daily Rollups'
+        indexes = [
+            models.Index(fields=['user', 'day']),
+            models.Index(fields=['account', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.type} {self.total} ({self.count})"
+
+
+class CategoryStats(models.Model):
+    """
+    Running statistics of transaction amounts per user, type and category,
+    over the user's whole history.
+
+    Kept in step with DailyAccountCategoryRollup by apps.reports.category_stats:
+    every rollup refresh removes the old bucket rows from these statistics and
+    merges the new ones (Welford / Chan update of count, mean and m2), so
+    reading them is a single lookup however long the history is.
+
+    `month_total` and `previous_month_total` are the totals of `month` (the
+    latest UTC month the category has had transactions in) and the month
+    before; both drop to zero if those transactions are later removed.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_stats')
+    type = models.CharField(max_length=10)  # CREDIT / DEBIT
+
+    # Same category keys as DailyAccountCategoryRollup
+    user_category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='category_stats'
+    )
+    pluggy_category_id = models.CharField(max_length=50, blank=True)
+    pluggy_category = models.CharField(max_length=100, blank=True)
+
+    # Amount statistics (absolute amounts)
+    count = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)  # sum of squared deviations from the mean
+
+    # Recent window
+    month = models.DateField(null=True, blank=True)
+    month_total = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    previous_month_total = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Category Stats'
+        verbose_name_plural = 'Category Stats'
+        indexes = [
+            models.Index(fields=['user', 'type']),
+        ]
+        # One row per key. NULLs are distinct in a plain unique constraint
+        # (and Django 4.2 has no nulls_distinct), so uncategorised rows get
+        # their own constraint.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'type', 'user_category', 'pluggy_category_id'],
+                condition=Q(user_category__isnull=False),
+                name='reports_categorystats_unique_category'
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'type', 'pluggy_category_id'],
+                condition=Q(user_category__isnull=True),
+                name='reports_categorystats_unique_uncategorised'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type} {self.user_category_id or self.pluggy_category_id}: {self.count} @ {self.mean:.2f}"
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the amounts."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        return self.variance ** 0.5
+
+
+class ReportExport(models.Model):
+    """
+    A report file rendered in the background (Celery) and stored in its database row.
+
+    Clients create the export, poll its status and download the file once it
+    is completed. Only one pending/processing export may exist for the same
+    user and parameters (params_hash), so repeated clicks share one job.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendente'),
+        (STATUS_PROCESSING, 'Processando'),
+        (STATUS_COMPLETED, 'Concluído'),
+        (STATUS_FAILED, 'Falhou'),
+    ]
+
+    REPORT_TYPE_CHOICES = [
+        ('dre', 'DRE'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('xlsx', 'Excel'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_exports')
+
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES, default='dre')
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    params = models.JSONField(default=dict, help_text='Report parameters (dates as YYYY-MM-DD)')
+    params_hash = models.CharField(
+        max_length=64,
+        help_text='Hash of report_type, file_format and params, used for deduplication'
+    )
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Stored in the database: the worker renders and the web service serves
+    # the file, and they don't share a filesystem
+    content = models.BinaryField(null=True, blank=True, editable=False)
+    file_size = models.BigIntegerField(null=True, blank=True, help_text='File size in bytes')
+    duration_ms = models.IntegerField(null=True, blank=True, help_text='Rendering time in milliseconds')
+    error_message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Report Export'
+        verbose_name_plural = 'Report Exports'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'params_hash'],
+                condition=Q(status__in=['pending', 'processing']),
+                name='reports_export_unique_active'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} {self.file_format} ({self.status}) - {self.user}"
+
+    @property
+    def filename(self):
+        """Download file name, e.g. DRE_2024-01-01_2024-12-31.pdf"""
+        return (
+            f"{self.report_type.upper()}_{self.params.get('start_date')}_"
+            f"{self.params.get('end_date')}.{self.file_format}"
+        )
@@ -0,0 +1,155 @@
+"""
+Versioned cache for report results.
+
+Entries are keyed by (user, report type, params, data version). The data
+version is a per-user counter bumped whenever something that feeds the
+reports changes, so invalidating a user's reports is a single increment and
+an entry computed from old data can never be read again.
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable
+
+from django.core.cache import cache
+from django.db import transaction as transaction_db
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TIMEOUT = 60 * 60 * 6  # 6 hours; entries are also superseded by version bumps
+
+REPORT_TYPES = (
+    'dre',
+    'cash_flow',
+    'category_breakdown',
+    'monthly_summary',
+    'trend_analysis',
+    'comparison',
+)
+
+_MISSING = object()
+
+
+def _version_key(user_id) -> str:
+    return f'reports:data_version:{user_id}'
+
+
+def _stats_key(report_type: str, outcome: str) -> str:
+    return f'reports:cache_stats:{report_type}:{outcome}'
+
+
+def _incr(key: str):
+    """Increment a counter, creating it if it does not exist (or was evicted)."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+
+
+def get_data_version(user_id) -> int:
+    """Current data version of a user's reports."""
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # Seed with a clock value: if the counter was evicted, the new
+        # version can't collide with the one entries were written under.
+        cache.add(_version_key(user_id), time.time_ns(), None)
+        version = cache.get(_version_key(user_id), time.time_ns())
+    return version
+
+
+def _bump(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), None)
+
+
+def bump_data_version(user_ids: Iterable):
+    """
+    Invalidate the cached reports of the given users.
+
+    The bump runs after the current transaction commits, so a report
+    computed concurrently from pre-commit data is stored under the old
+    version and never served afterwards.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+
+    def _bump_all():
+        for user_id in user_ids:
+            _bump(user_id)
+
+    transaction_db.on_commit(_bump_all)
+
+
+def _entry_key(user_id, report_type: str, params: Dict[str, Any], version) -> str:
+    # Reports default their period to "now"; the day makes sure such entries
+    # roll over at midnight.
+    payload = json.dumps(
+        {'params': params, 'today': timezone.now().date()},
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha1(payload.encode()).hexdigest()
+    return f'reports:{report_type}:{user_id}:{version}:{digest}'
+
+
+def get_or_compute(user, report_type: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+    """
+    Return the cached report for these params, computing and storing it on a miss.
+
+    Args:
+        user: User instance
+        report_type: One of REPORT_TYPES
+        params: Parameters that identify the report (JSON-serialisable, dates allowed)
+        compute: Callable that builds the report
+    """
+    key = _entry_key(user.id, report_type, params, get_data_version(user.id))
+
+    result = cache.get(key, _MISSING)
+    if result is not _MISSING:
+        _incr(_stats_key(report_type, 'hits'))
+        return result
+
+    _incr(_stats_key(report_type, 'misses'))
+    result = compute()
+    cache.set(key, result, ENTRY_TIMEOUT)
+    return result
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters per report type since the counters were last reset."""
+    keys = [
+        _stats_key(report_type, outcome)
+        for report_type in REPORT_TYPES
+        for outcome in ('hits', 'misses')
+    ]
+    values = cache.get_many(keys)
+
+    stats = {}
+    for report_type in REPORT_TYPES:
+        hits = values.get(_stats_key(report_type, 'hits'), 0)
+        misses = values.get(_stats_key(report_type, 'misses'), 0)
+        total = hits + misses
+        stats[report_type] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total * 100, 1) if total else 0.0,
+        }
+    return stats
+
+
+def reset_stats():
+    """Reset hit/miss counters."""
+    cache.delete_many([
+        _stats_key(report_type, outcome)
+        for report_type in REPORT_TYPES
+        for outcome in ('hits', 'misses')
+    ])
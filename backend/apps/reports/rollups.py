@@ -0,0 +1,193 @@
+"""
+Daily rollup maintenance for reports.
+
+The banking write paths call refresh() with the (account, day) buckets they
+touched; each bucket is recomputed from Transaction, so the rollup stays exact
+no matter whether a row was created, moved to another day, recategorised or
+deleted. The replaced rows are passed on to category_stats, which keeps the
+per-category statistics in step.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, date, time, timedelta, timezone as dt_timezone
+from typing import Iterable, Optional, Set, Tuple
+
+from django.db import transaction as transaction_db
+from django.db.models import DecimalField, F, Sum, Count, Max
+from django.db.models.functions import Abs, TruncDate
+
+from . import category_stats
+from .report_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+RollupKey = Tuple[object, date]
+
+
+def rollup_day(value) -> date:
+    """UTC calendar day used as rollup bucket for a datetime (or date)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(dt_timezone.utc)
+        return value.date()
+    return value
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def _aggregate(transactions):
+    """Group a Transaction queryset into rollup rows."""
+    return transactions.order_by().annotate(
+        day=TruncDate('date', tzinfo=dt_timezone.utc)
+    ).values(
+        'account_id', 'day', 'type', 'user_category_id', 'pluggy_category_id'
+    ).annotate(
+        total=Sum(Abs('amount')),
+        count=Count('id'),
+        sum_squares=Sum(
+            F('amount') * F('amount'),
+            output_field=DecimalField(max_digits=32, decimal_places=4)
+        ),
+        pluggy_category_name=Max('pluggy_category'),
+    )
+
+
+def _build_rows(aggregated, user_id, days: Optional[Set[date]] = None):
+    from .models import DailyAccountCategoryRollup
+
+    rows = []
+    for item in aggregated:
+        if days is not None and item['day'] not in days:
+            continue
+        rows.append(DailyAccountCategoryRollup(
+            user_id=user_id,
+            account_id=item['account_id'],
+            day=item['day'],
+            type=item['type'],
+            user_category_id=item['user_category_id'],
+            pluggy_category_id=item['pluggy_category_id'] or '',
+            pluggy_category=item['pluggy_category_name'] or '',
+            total=item['total'] or 0,
+            count=item['count'],
+            sum_squares=item['sum_squares'] or 0,
+        ))
+    return rows
+
+
+def keys_for(transactions) -> Set[RollupKey]:
+    """(account, day) buckets covered by a Transaction queryset."""
+    return set(
+        transactions.order_by().annotate(
+            day=TruncDate('date', tzinfo=dt_timezone.utc)
+        ).values_list('account_id', 'day').distinct()
+    )
+
+
+def key_for(transaction) -> RollupKey:
+    """(account, day) bucket of a single Transaction instance."""
+    return (transaction.account_id, rollup_day(transaction.date))
+
+
+def refresh(keys: Iterable[RollupKey]) -> int:
+    """
+    Recompute the rollup rows of the given (account_id, day) buckets.
+
+    Returns:
+        Number of rollup rows written
+    """
+    from apps.banking.models import BankAccount, Transaction
+    from .models import DailyAccountCategoryRollup
+
+    days_by_account = defaultdict(set)
+    for account_id, day in keys:
+        days_by_account[account_id].add(day)
+
+    if not days_by_account:
+        return 0
+
+    account_users = dict(
+        BankAccount.objects.filter(
+            id__in=list(days_by_account.keys())
+        ).values_list('id', 'connection__user_id')
+    )
+
+    bump_data_version(account_users.values())
+
+    written = 0
+    replaced = defaultdict(lambda: ([], []))
+    with transaction_db.atomic():
+        for account_id, days in days_by_account.items():
+            stale = DailyAccountCategoryRollup.objects.filter(account_id=account_id, day__in=days)
+            old_rows = list(stale)
+            stale.delete()
+
+            user_id = account_users.get(account_id)
+            if user_id is None:
+                continue  # Account deleted: rows cascade with it
+
+            aggregated = _aggregate(Transaction.objects.filter(
+                account_id=account_id,
+                date__gte=_day_start(min(days)),
+                date__lt=_day_start(max(days) + timedelta(days=1)),
+            ))
+            rows = _build_rows(aggregated, user_id, days)
+            DailyAccountCategoryRollup.objects.bulk_create(rows)
+            written += len(rows)
+
+            replaced[user_id][0].extend(old_rows)
+            replaced[user_id][1].extend(rows)
+
+        for user_id, (old_rows, rows) in replaced.items():
+            category_stats.apply(user_id, removed=old_rows, added=rows)
+
+    return written
+
+
+def rebuild(user=None, batch_size: int = 1000) -> int:
+    """
+    Rebuild rollups from scratch, account by account.
+
+    Args:
+        user: Restrict to one user (None = all users)
+        batch_size: bulk_create batch size
+
+    Returns:
+        Number of rollup rows written
+    """
+    from apps.banking.models import BankAccount, Transaction
+    from .models import DailyAccountCategoryRollup
+
+    accounts = BankAccount.objects.all()
+    if user is not None:
+        accounts = accounts.filter(connection__user=user)
+
+    written = 0
+    user_ids = set()
+    for account_id, user_id in accounts.values_list('id', 'connection__user_id').iterator():
+        user_ids.add(user_id)
+        with transaction_db.atomic():
+            DailyAccountCategoryRollup.objects.filter(account_id=account_id).delete()
+            rows = _build_rows(
+                _aggregate(Transaction.objects.filter(account_id=account_id)),
+                user_id
+            )
+            DailyAccountCategoryRollup.objects.bulk_create(rows, batch_size=batch_size)
+            written += len(rows)
+
+    category_stats.rebuild(user_ids if user is not None else None)
+    bump_data_version(user_ids)
+    logger.info(f"Rebuilt {written} daily rollup rows")
+    return written
+
+
+def for_period(user, start_date, end_date):
+    """Rollup rows of a user for the days covered by [start_date, end_date]."""
+    from .models import DailyAccountCategoryRollup
+
+    return DailyAccountCategoryRollup.objects.filter(
+        user=user,
+        day__gte=rollup_day(start_date),
+        day__lte=rollup_day(end_date),
+    )
@@ -0,0 +1,73 @@
+"""
+Serializers for Reports API
+"""
+from rest_framework import serializers
+
+from .models import ReportExport
+from .services import ReportsService
+
+
+class ReportExportCreateSerializer(serializers.Serializer):
+    """Validates a background export request."""
+    report_type = serializers.ChoiceField(choices=['dre'], default='dre')
+    file_format = serializers.ChoiceField(choices=['pdf', 'xlsx'])
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    compare_with_previous = serializers.BooleanField(default=False)
+    granularity = serializers.ChoiceField(
+        choices=list(ReportsService.DRE_MATRIX_GRANULARITIES),
+        required=False,
+        allow_null=True
+    )
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError('start_date must be before end_date')
+
+        if data.get('granularity'):
+            columns = ReportsService._dre_matrix_columns(data['start_date'], data['end_date'], data['granularity'])
+            if len(columns) > ReportsService.MAX_DRE_MATRIX_COLUMNS:
+                raise serializers.ValidationError(
+                    f'Matrix cannot exceed {ReportsService.MAX_DRE_MATRIX_COLUMNS} columns'
+                )
+        return data
+
+    def to_params(self):
+        """Job parameters as stored on ReportExport.params."""
+        data = self.validated_data
+        params = {
+            'start_date': data['start_date'].strftime('%Y-%m-%d'),
+            'end_date': data['end_date'].strftime('%Y-%m-%d'),
+            'compare_with_previous': data['compare_with_previous'],
+        }
+        if data.get('granularity'):
+            params['granularity'] = data['granularity']
+        return params
+
+
+class ReportExportSerializer(serializers.ModelSerializer):
+    """Serializer for background export jobs."""
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportExport
+        fields = [
+            'id',
+            'report_type',
+            'file_format',
+            'params',
+            'status',
+            'file_size',
+            'duration_ms',
+            'error_message',
+            'created_at',
+            'started_at',
+            'completed_at',
+            'download_url',
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != ReportExport.STATUS_COMPLETED:
+            return None
+        return f'/api/reports/exports/{obj.id}/download/'
@@ -2,8 +2,8 @@
 Reports service for data aggregation and analysis.
 """
 
-from django.db.models import Sum, Count, Avg, Q, F
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth, TruncYear
+from django.db.models import Sum, Q, F, Window, Case, When, Value, CharField
+from django.db.models.functions import TruncWeek, TruncMonth, TruncYear, RowNumber
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -11,11 +11,69 @@ from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 
 from apps.banking.models import Transaction, BankAccount, BankConnection
+from . import rollups
 
 
 class ReportsService:
     """Service for generating financial reports and analytics."""
 
+    # Bucket expressions for _totals_query (rollup days are already dates)
+    TOTALS_BUCKETS = {
+        'daily': lambda: F('day'),
+        'weekly': lambda: TruncWeek('day'),
+        'monthly': lambda: TruncMonth('day'),
+        'yearly': lambda: TruncYear('day'),
+    }
+
+    @staticmethod
+    def _totals_query(
+        user,
+        periods: Dict[str, Tuple[datetime, datetime]],
+        bucket: Optional[str] = None,
+        group_by: Tuple[str, ...] = ()
+    ):
+        """
+        Income/expense totals and counts for one or more periods in a single
+        grouped query over the daily rollups, using conditional aggregation.
+
+        Args:
+            user: User instance
+            periods: {name: (start_date, end_date)}; whole days, end inclusive
+            bucket: Optional time bucket ('daily', 'weekly', 'monthly', 'yearly'),
+                returned as 'bucket'
+            group_by: Extra rollup fields to group by (e.g. category name)
+
+        Returns:
+            Values queryset; for each period name the rows carry
+            '<name>_income', '<name>_expenses', '<name>_income_count' and
+            '<name>_expenses_count'
+        """
+        from .models import DailyAccountCategoryRollup
+
+        in_any_period = Q()
+        sums = {}
+        for name, (start, end) in periods.items():
+            in_period = Q(day__gte=rollups.rollup_day(start), day__lte=rollups.rollup_day(end))
+            in_any_period |= in_period
+
+            credit = in_period & Q(type='CREDIT')
+            debit = in_period & Q(type='DEBIT')
+            sums[f'{name}_income'] = Sum('total', filter=credit, default=Decimal('0'))
+            sums[f'{name}_expenses'] = Sum('total', filter=debit, default=Decimal('0'))
+            sums[f'{name}_income_count'] = Sum('count', filter=credit, default=0)
+            sums[f'{name}_expenses_count'] = Sum('count', filter=debit, default=0)
+
+        queryset = DailyAccountCategoryRollup.objects.filter(in_any_period, user=user).order_by()
+
+        fields = list(group_by)
+        if bucket:
+            queryset = queryset.annotate(bucket=ReportsService.TOTALS_BUCKETS[bucket]())
+            fields.insert(0, 'bucket')
+
+        if fields:
+            return queryset.values(*fields).annotate(**sums)
+        return queryset.aggregate(**sums)
+
     @staticmethod
     def get_cash_flow_report(
         user,
@@ -40,49 +98,23 @@ class ReportsService:
         if not start_date:
             start_date = end_date - timedelta(days=30)
 
-        # Get user transactions
-        transactions = Transaction.objects.filter(
-            account__connection__user=user,
-            date__gte=start_date,
-            date__lte=end_date
-        )
-
-        # Determine truncation function based on granularity
-        trunc_func = {
-            'daily': TruncDate,
-            'weekly': TruncWeek,
-            'monthly': TruncMonth,
-            'yearly': TruncYear
-        }.get(granularity, TruncDate)
-
-        # Aggregate by period
-        income_data = transactions.filter(type='CREDIT').annotate(
-            period=trunc_func('date')
-        ).values('period').annotate(
-            total=Sum('amount')
-        ).order_by('period')
-
-        expense_data = transactions.filter(type='DEBIT').annotate(
-            period=trunc_func('date')
-        ).values('period').annotate(
-            total=Sum('amount')
-        ).order_by('period')
+        # One row per period with income and expenses side by side
+        period_data = ReportsService._totals_query(
+            user,
+            {'period': (start_date, end_date)},
+            bucket=granularity if granularity in ReportsService.TOTALS_BUCKETS else 'daily'
+        ).order_by('bucket')
 
         # Format for charts
-        periods = set()
         income_dict = {}
         expense_dict = {}
 
-        for item in income_data:
-            periods.add(item['period'])
-            income_dict[item['period']] = float(item['total'] or 0)
-
-        for item in expense_data:
-            periods.add(item['period'])
-            expense_dict[item['period']] = float(item['total'] or 0)
+        for item in period_data:
+            income_dict[item['bucket']] = float(item['period_income'])
+            expense_dict[item['bucket']] = float(item['period_expenses'])
 
         # Create ordered lists
-        sorted_periods = sorted(periods) if periods else []
+        sorted_periods = sorted(income_dict)
 
         cash_flow_data = {
             'labels': [period.strftime('%Y-%m-%d') for period in sorted_periods],
@@ -135,28 +167,32 @@ class ReportsService:
         if not start_date:
             start_date = end_date - timedelta(days=30)
 
-        # Get categorized transactions
-        transactions = Transaction.objects.filter(
-            account__connection__user=user,
-            type=transaction_type,
-            date__gte=start_date,
-            date__lte=end_date
-        ).values('category').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('-total')
+        # Totals per category from the daily rollups
+        rows = rollups.for_period(user, start_date, end_date).filter(
+            type=transaction_type
+        ).values('user_category__name', 'pluggy_category').annotate(
+            total=Sum('total'),
+            count=Sum('count')
+        )
+
+        # Effective category: user category if set, otherwise Pluggy category
+        totals = defaultdict(Decimal)
+        for item in rows:
+            category = item['user_category__name'] or item['pluggy_category'] or 'Uncategorized'
+            totals[category] += item['total'] or 0
+
+        transactions = sorted(totals.items(), key=lambda x: x[1], reverse=True)
 
         # Format for charts
         categories = []
         amounts = []
         percentages = []
-        total_amount = sum(item['total'] for item in transactions if item['total'])
+        total_amount = sum(total for _, total in transactions if total)
 
-        for item in transactions:
-            if item['total']:
-                category = item['category'] or 'Uncategorized'
-                amount = float(item['total'])
-                percentage = (amount / total_amount * 100) if total_amount > 0 else 0
+        for category, total in transactions:
+            if total:
+                amount = float(total)
+                percentage = (amount / float(total_amount) * 100) if total_amount > 0 else 0
 
                 categories.append(category)
                 amounts.append(amount)
@@ -194,7 +230,7 @@ class ReportsService:
             }],
             'percentages': percentages,
             'summary': {
-                'total_amount': total_amount,
+                'total_amount': float(total_amount),
                 'categories_count': len(categories),
                 'transaction_type': 'Expenses' if transaction_type == 'DEBIT' else 'Income',
                 'period': f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
@@ -260,6 +296,10 @@ class ReportsService:
 
         balance_data['labels'] = [d.strftime('%Y-%m-%d') for d in dates]
 
+        # Empty range (start_date after end_date)
+        if not dates:
+            return balance_data
+
         # Colors for different accounts
         colors = [
             'rgb(255, 99, 132)',
@@ -270,24 +310,43 @@ class ReportsService:
             'rgb(255, 159, 64)',
         ]
 
+        # Daily net flow per account from the first charted day onwards, in a
+        # single grouped query. The current balance is the anchor: walking
+        # back from it, each day's closing balance is the current balance
+        # minus everything that moved after that day.
+        from .models import DailyAccountCategoryRollup
+
+        first_day = rollups.rollup_day(dates[0])
+        net_flows = defaultdict(dict)
+        daily = DailyAccountCategoryRollup.objects.filter(
+            account__in=accounts,
+            day__gt=first_day
+        ).order_by().values('account_id', 'day').annotate(
+            credits=Sum('total', filter=Q(type='CREDIT')),
+            debits=Sum('total', filter=Q(type='DEBIT'))
+        )
+        for row in daily:
+            net_flows[row['account_id']][row['day']] = (
+                (row['credits'] or Decimal('0')) - (row['debits'] or Decimal('0'))
+            )
+
+        days = [rollups.rollup_day(d) for d in dates]
+
         # Calculate balance evolution for each account
         for idx, account in enumerate(accounts):
-            account_balances = []
-
-            for date in dates:
-                # Get transactions up to this date
-                transactions_sum = Transaction.objects.filter(
-                    account=account,
-                    date__lte=date
-                ).aggregate(
-                    credits=Sum('amount', filter=Q(type='CREDIT')),
-                    debits=Sum('amount', filter=Q(type='DEBIT'))
-                )
-
-                credits = float(transactions_sum['credits'] or 0)
-                debits = float(transactions_sum['debits'] or 0)
-                balance = float(account.balance) + credits - debits
-                account_balances.append(balance)
+            flows = net_flows.get(account.id, {})
+
+            # Flows after the last charted day (up to today)
+            last_day = days[-1]
+            balance = account.balance - sum(
+                (amount for day, amount in flows.items() if day > last_day),
+                Decimal('0')
+            )
+
+            account_balances = [0.0] * len(days)
+            for pos in range(len(days) - 1, -1, -1):
+                account_balances[pos] = float(balance)
+                balance -= flows.get(days[pos], Decimal('0'))
 
             color = colors[idx % len(colors)]
             balance_data['datasets'].append({
@@ -320,51 +379,48 @@ class ReportsService:
         else:
             end_date = datetime(year, month + 1, 1, tzinfo=timezone.utc) - timedelta(days=1)
 
-        # Get transactions for the month
-        transactions = Transaction.objects.filter(
+        # Top 10 expenses and top 10 income in one query (row number per type)
+        top_transactions = Transaction.objects.filter(
             account__connection__user=user,
             date__gte=start_date,
-            date__lte=end_date
-        )
-
-        # Calculate summaries
-        income = transactions.filter(type='CREDIT').aggregate(
-            total=Sum('amount'),
-            count=Count('id')
-        )
-
-        expenses = transactions.filter(type='DEBIT').aggregate(
-            total=Sum('amount'),
-            count=Count('id')
+            date__lt=end_date + timedelta(days=1)
+        ).annotate(
+            category=F('user_category__name'),
+            type_rank=Window(
+                expression=RowNumber(),
+                partition_by=[F('type')],
+                order_by=[F('amount').desc(), F('date').desc()]
+            )
+        ).filter(type_rank__lte=10).order_by('type', 'type_rank').values(
+            'type', 'description', 'amount', 'category', 'date', 'merchant_name'
         )
 
-        # Get top expenses
-        top_expenses = transactions.filter(type='DEBIT').order_by('-amount')[:10].values(
-            'description', 'amount', 'category', 'date', 'merchant_name'
-        )
+        top_expenses = []
+        top_income = []
+        for t in top_transactions:
+            (top_income if t['type'] == 'CREDIT' else top_expenses).append(t)
 
-        # Get top income
-        top_income = transactions.filter(type='CREDIT').order_by('-amount')[:10].values(
-            'description', 'amount', 'category', 'date', 'merchant_name'
+        # Daily breakdown (totals and counts derive from it)
+        daily_breakdown = ReportsService._totals_query(
+            user, {'month': (start_date, end_date)}, bucket='daily'
         )
 
-        # Daily breakdown
-        daily_breakdown = transactions.annotate(
-            day=TruncDate('date')
-        ).values('day', 'type').annotate(
-            total=Sum('amount')
-        ).order_by('day')
-
         # Format daily data
         daily_income = {}
         daily_expenses = {}
+        income = {'total': Decimal('0'), 'count': 0}
+        expenses = {'total': Decimal('0'), 'count': 0}
 
         for item in daily_breakdown:
-            day_str = item['day'].strftime('%d')
-            if item['type'] == 'CREDIT':
-                daily_income[day_str] = float(item['total'])
-            else:
-                daily_expenses[day_str] = float(item['total'])
+            day_str = item['bucket'].strftime('%d')
+            if item['month_income_count']:
+                daily_income[day_str] = float(item['month_income'])
+                income['total'] += item['month_income']
+                income['count'] += item['month_income_count']
+            if item['month_expenses_count']:
+                daily_expenses[day_str] = float(item['month_expenses'])
+                expenses['total'] += item['month_expenses']
+                expenses['count'] += item['month_expenses_count']
 
         # Create day labels for the month
         days_in_month = (end_date - start_date).days + 1
@@ -444,31 +500,20 @@ class ReportsService:
 
         start_date = end_date - timedelta(days=30 * months)
 
-        # Get monthly aggregates
-        transactions = Transaction.objects.filter(
-            account__connection__user=user,
-            date__gte=start_date,
-            date__lte=end_date
+        # Get monthly aggregates from the daily rollups
+        monthly_data = ReportsService._totals_query(
+            user, {'period': (start_date, end_date)}, bucket='monthly'
         )
 
-        monthly_data = transactions.annotate(
-            month=TruncMonth('date')
-        ).values('month', 'type').annotate(
-            total=Sum('amount'),
-            count=Count('id'),
-            avg=Avg('amount')
-        ).order_by('month')
-
         # Organize by month
-        months_dict = defaultdict(lambda: {'income': 0, 'expenses': 0, 'transactions': 0})
+        months_dict = {}
 
         for item in monthly_data:
-            month_key = item['month'].strftime('%Y-%m')
-            if item['type'] == 'CREDIT':
-                months_dict[month_key]['income'] = float(item['total'])
-            else:
-                months_dict[month_key]['expenses'] = float(item['total'])
-            months_dict[month_key]['transactions'] += item['count']
+            months_dict[item['bucket'].strftime('%Y-%m')] = {
+                'income': float(item['period_income']),
+                'expenses': float(item['period_expenses']),
+                'transactions': item['period_income_count'] + item['period_expenses_count'],
+            }
 
         # Sort months and prepare data
         sorted_months = sorted(months_dict.keys())
@@ -539,42 +584,40 @@ class ReportsService:
         Returns:
             Dictionary with comparison data
         """
-        # Get transactions for both periods
-        period1_transactions = Transaction.objects.filter(
-            account__connection__user=user,
-            date__gte=period1_start,
-            date__lte=period1_end
-        )
-
-        period2_transactions = Transaction.objects.filter(
-            account__connection__user=user,
-            date__gte=period2_start,
-            date__lte=period2_end
-        )
+        # Both periods, per category, in one grouped query; totals and the
+        # top expense categories are derived from the same rows
+        periods = {
+            'period1': (period1_start, period1_end),
+            'period2': (period2_start, period2_end),
+        }
+        rows = list(ReportsService._totals_query(user, periods, group_by=('user_category__name',)))
 
-        # Calculate summaries for each period
-        def get_period_summary(transactions, start, end):
-            income = transactions.filter(type='CREDIT').aggregate(Sum('amount'))['amount__sum'] or 0
-            expenses = transactions.filter(type='DEBIT').aggregate(Sum('amount'))['amount__sum'] or 0
+        def get_period_summary(name):
+            start, end = periods[name]
+            income = sum((row[f'{name}_income'] for row in rows), Decimal('0'))
+            expenses = sum((row[f'{name}_expenses'] for row in rows), Decimal('0'))
+            count = sum(row[f'{name}_income_count'] + row[f'{name}_expenses_count'] for row in rows)
 
-            categories = transactions.filter(type='DEBIT').values('category').annotate(
-                total=Sum('amount')
-            ).order_by('-total')[:5]
+            categories = sorted(
+                (row for row in rows if row[f'{name}_expenses']),
+                key=lambda row: row[f'{name}_expenses'],
+                reverse=True
+            )[:5]
 
             return {
                 'income': float(income),
                 'expenses': float(expenses),
                 'net': float(income - expenses),
-                'transactions_count': transactions.count(),
+                'transactions_count': count,
                 'top_categories': [
-                    {'name': c['category'] or 'Uncategorized', 'amount': float(c['total'])}
+                    {'name': c['user_category__name'] or 'Uncategorized', 'amount': float(c[f'{name}_expenses'])}
                     for c in categories
                 ],
                 'period': f"{start.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}"
             }
 
-        period1_summary = get_period_summary(period1_transactions, period1_start, period1_end)
-        period2_summary = get_period_summary(period2_transactions, period2_start, period2_end)
+        period1_summary = get_period_summary('period1')
+        period2_summary = get_period_summary('period2')
 
         # Calculate changes
         income_change = ((period2_summary['income'] - period1_summary['income']) / period1_summary['income'] * 100) if period1_summary['income'] > 0 else 0
@@ -616,217 +659,292 @@ class ReportsService:
 
         return comparison_data
 
+    # Colunas de agrupamento da query do DRE. O resultado agrupado é pequeno
+    # (categorias x tipo) e é mapeado para os grupos do DRE em Python.
+    DRE_GROUP_FIELDS = (
+        'type',
+        'pluggy_category_id',
+        'pluggy_category',
+        'user_category_id',
+        'user_category__name',
+        'user_category__type',
+        'user_category__parent__name',
+    )
+
     @staticmethod
-    def get_dre_report(
+    def _get_dre_rows(user, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """
+        Fetch DRE totals for a period with a single grouped query over the
+        daily rollups (whole days, end date inclusive).
+
+        Returns one row per (user_category, parent, pluggy_category_id, type)
+        with the summed absolute amount in 'total'.
+        """
+        return ReportsService._get_dre_rows_for_periods(user, [(start_date, end_date)])[0]
+
+    @staticmethod
+    def _get_dre_rows_for_periods(
         user,
-        start_date: datetime,
-        end_date: datetime,
-        compare_start: Optional[datetime] = None,
-        compare_end: Optional[datetime] = None
-    ) -> Dict[str, Any]:
+        periods: List[Tuple[datetime, datetime]]
+    ) -> List[List[Dict[str, Any]]]:
         """
-        Generate DRE (Demonstrativo de Resultado do Exercício) report.
+        Fetch DRE rows for several periods with one grouped query over the
+        union of their days, using one conditional Sum per period.
 
-        Args:
-            user: User instance
-            start_date: Start date for the report
-            end_date: End date for the report
-            compare_start: Start date for comparison period (optional)
-            compare_end: End date for comparison period (optional)
+        Returns a list of row lists, in the same order as periods (rows
+        with nothing in a period are left out of that period's list).
+        """
+        from .models import DailyAccountCategoryRollup
 
-        Returns:
-            Dictionary with DRE data including groups, categories, and totals
+        days = [
+            (rollups.rollup_day(start), rollups.rollup_day(end))
+            for start, end in periods
+        ]
+
+        in_any_period = Q()
+        sums = {}
+        for idx, (first_day, last_day) in enumerate(days):
+            in_period = Q(day__gte=first_day, day__lte=last_day)
+            in_any_period |= in_period
+            sums[f'total_{idx}'] = Sum('total', filter=in_period)
+
+        grouped = ReportsService._with_dre_group(
+            DailyAccountCategoryRollup.objects.filter(in_any_period, user=user)
+        ).order_by().values(
+            *ReportsService.DRE_GROUP_FIELDS, 'dre_group'
+        ).annotate(**sums)
+
+        period_rows = [[] for _ in periods]
+        for row in grouped:
+            base = {field: row[field] for field in ReportsService.DRE_GROUP_FIELDS + ('dre_group',)}
+            for idx in range(len(periods)):
+                total = row[f'total_{idx}']
+                if total:
+                    period_rows[idx].append({**base, 'total': total})
+
+        return period_rows
+
+    @staticmethod
+    def _with_dre_group(rollup_queryset):
+        """
+        Annotate rollup rows with their DRE group ('dre_group') in SQL and drop
+        excluded movements (transfers, investments) in the query.
+        """
+        from .dre_mapping import dre_group_case, DREGroup
+
+        return rollup_queryset.annotate(
+            dre_group=Case(
+                When(
+                    user_category_id__isnull=False,
+                    user_category__type='income',
+                    then=Value(DREGroup.RECEITAS_OPERACIONAIS.value)
+                ),
+                When(
+                    user_category_id__isnull=False,
+                    then=Value(DREGroup.DESPESAS_OPERACIONAIS.value)
+                ),
+                default=dre_group_case(),
+                output_field=CharField()
+            )
+        ).exclude(dre_group=DREGroup.EXCLUIDAS.value)
+
+    @staticmethod
+    def _resolve_dre_row(row: Dict[str, Any]) -> Tuple[Optional[str], str, Optional[str]]:
+        """
+        Map a grouped DRE row to (dre_group, category_name, parent_name).
+
+        Custom user categories are never excluded from the DRE: their group is
+        decided by the category type. Otherwise the Pluggy category decides.
+        Rows annotated by _with_dre_group already carry the group.
         """
         from .dre_mapping import (
             get_dre_group_for_category,
             get_category_display_name,
             get_parent_category_id,
-            get_dre_structure,
             DREGroup
         )
 
-        def calculate_period_dre(user, start_date, end_date) -> Dict[str, Any]:
-            """Calculate DRE for a specific period."""
-            transactions = Transaction.objects.filter(
-                account__connection__user=user,
-                date__gte=start_date,
-                date__lte=end_date
-            ).select_related('user_category', 'account__connection')
-
-            # Initialize groups
-            groups = {
-                DREGroup.RECEITAS_OPERACIONAIS.value: {
-                    'id': DREGroup.RECEITAS_OPERACIONAIS.value,
-                    'name': 'Receitas Operacionais',
-                    'sign': '+',
-                    'total': Decimal('0'),
-                    'categories': defaultdict(lambda: {
-                        'name': '',
-                        'total': Decimal('0'),
-                        'subcategories': defaultdict(lambda: {'name': '', 'total': Decimal('0')})
-                    })
-                },
-                DREGroup.DESPESAS_OPERACIONAIS.value: {
-                    'id': DREGroup.DESPESAS_OPERACIONAIS.value,
-                    'name': 'Despesas Operacionais',
-                    'sign': '-',
-                    'total': Decimal('0'),
-                    'categories': defaultdict(lambda: {
-                        'name': '',
-                        'total': Decimal('0'),
-                        'subcategories': defaultdict(lambda: {'name': '', 'total': Decimal('0')})
-                    })
-                },
-                DREGroup.DESPESAS_FINANCEIRAS.value: {
-                    'id': DREGroup.DESPESAS_FINANCEIRAS.value,
-                    'name': 'Despesas Financeiras',
-                    'sign': '-',
-                    'total': Decimal('0'),
-                    'categories': defaultdict(lambda: {
-                        'name': '',
-                        'total': Decimal('0'),
-                        'subcategories': defaultdict(lambda: {'name': '', 'total': Decimal('0')})
-                    })
-                },
-                DREGroup.RECEITAS_FINANCEIRAS.value: {
-                    'id': DREGroup.RECEITAS_FINANCEIRAS.value,
-                    'name': 'Receitas Financeiras',
-                    'sign': '+',
+        if row['user_category_id']:
+            category_name = row['user_category__name']
+            parent_name = row['user_category__parent__name']
+            if row['user_category__type'] == 'income':
+                dre_group = DREGroup.RECEITAS_OPERACIONAIS.value
+            else:
+                dre_group = DREGroup.DESPESAS_OPERACIONAIS.value
+        else:
+            pluggy_category_id = row['pluggy_category_id'] or ''
+            category_name = get_category_display_name(pluggy_category_id, row['pluggy_category'] or '')
+            parent_id = get_parent_category_id(pluggy_category_id)
+            parent_name = get_category_display_name(parent_id) if parent_id else None
+            dre_group = row['dre_group'] if 'dre_group' in row else get_dre_group_for_category(
+                pluggy_category_id, row['type']
+            )
+
+        return dre_group, category_name, parent_name
+
+    @staticmethod
+    def _build_period_dre(rows) -> Dict[str, Any]:
+        """
+        Build the DRE structure (groups, categories, subcategories and summary)
+        from grouped rows returned by _get_dre_rows.
+        """
+        from .dre_mapping import DREGroup
+
+        def new_group(group_id, name, sign):
+            return {
+                'id': group_id,
+                'name': name,
+                'sign': sign,
+                'total': Decimal('0'),
+                'categories': defaultdict(lambda: {
+                    'name': '',
                     'total': Decimal('0'),
-                    'categories': defaultdict(lambda: {
-                        'name': '',
-                        'total': Decimal('0'),
-                        'subcategories': defaultdict(lambda: {'name': '', 'total': Decimal('0')})
-                    })
-                },
+                    'subcategories': defaultdict(lambda: {'name': '', 'total': Decimal('0')})
+                })
             }
 
-            # Process transactions
-            for tx in transactions:
-                # Determine category info
-                pluggy_category_id = tx.pluggy_category_id or ''
-                pluggy_category_name = tx.pluggy_category or ''
-
-                # If user has custom category, use it for naming AND DRE group determination
-                if tx.user_category:
-                    category_name = tx.user_category.name
-                    parent_name = tx.user_category.parent.name if tx.user_category.parent else None
-
-                    # Determine DRE group based on user_category type
-                    # This ensures custom categories are NEVER excluded from DRE
-                    user_cat_type = tx.user_category.type  # 'income' or 'expense'
-                    if user_cat_type == 'income':
-                        dre_group = DREGroup.RECEITAS_OPERACIONAIS.value
-                    else:
-                        dre_group = DREGroup.DESPESAS_OPERACIONAIS.value
-                else:
-                    category_name = get_category_display_name(pluggy_category_id, pluggy_category_name)
-                    parent_id = get_parent_category_id(pluggy_category_id)
-                    parent_name = get_category_display_name(parent_id) if parent_id else None
+        groups = {
+            DREGroup.RECEITAS_OPERACIONAIS.value: new_group(
+                DREGroup.RECEITAS_OPERACIONAIS.value, 'Receitas Operacionais', '+'
+            ),
+            DREGroup.DESPESAS_OPERACIONAIS.value: new_group(
+                DREGroup.DESPESAS_OPERACIONAIS.value, 'Despesas Operacionais', '-'
+            ),
+            DREGroup.DESPESAS_FINANCEIRAS.value: new_group(
+                DREGroup.DESPESAS_FINANCEIRAS.value, 'Despesas Financeiras', '-'
+            ),
+            DREGroup.RECEITAS_FINANCEIRAS.value: new_group(
+                DREGroup.RECEITAS_FINANCEIRAS.value, 'Receitas Financeiras', '+'
+            ),
+        }
 
-                    # Determine DRE group based on Pluggy category
-                    dre_group = get_dre_group_for_category(pluggy_category_id, tx.type)
+        for row in rows:
+            dre_group, category_name, parent_name = ReportsService._resolve_dre_row(row)
 
-                if dre_group is None:
-                    continue  # Excluded transaction (only for Pluggy categories like transfers)
+            if dre_group is None:
+                continue  # Excluded (only for Pluggy categories like transfers)
 
-                if dre_group not in groups:
-                    continue
+            if dre_group not in groups:
+                continue
 
-                amount = abs(tx.amount)
+            amount = row['total'] or Decimal('0')
 
-                # Add to group total
-                groups[dre_group]['total'] += amount
+            # Add to group total
+            groups[dre_group]['total'] += amount
 
-                # Determine parent and subcategory
-                if parent_name:
-                    parent_key = parent_name
-                    sub_key = category_name
-                else:
-                    parent_key = category_name
-                    sub_key = None
-
-                # Add to category
-                groups[dre_group]['categories'][parent_key]['name'] = parent_key
-                groups[dre_group]['categories'][parent_key]['total'] += amount
-
-                # Add to subcategory if exists
-                if sub_key:
-                    groups[dre_group]['categories'][parent_key]['subcategories'][sub_key]['name'] = sub_key
-                    groups[dre_group]['categories'][parent_key]['subcategories'][sub_key]['total'] += amount
-
-            # Calculate summary
-            receitas_op = groups[DREGroup.RECEITAS_OPERACIONAIS.value]['total']
-            despesas_op = groups[DREGroup.DESPESAS_OPERACIONAIS.value]['total']
-            receitas_fin = groups[DREGroup.RECEITAS_FINANCEIRAS.value]['total']
-            despesas_fin = groups[DREGroup.DESPESAS_FINANCEIRAS.value]['total']
-
-            resultado_operacional = receitas_op - despesas_op
-            resultado_financeiro = receitas_fin - despesas_fin
-            resultado_liquido = resultado_operacional + resultado_financeiro
-
-            # Convert to serializable format
-            result_groups = []
-            for group_id in [
-                DREGroup.RECEITAS_OPERACIONAIS.value,
-                DREGroup.DESPESAS_OPERACIONAIS.value,
-                DREGroup.RECEITAS_FINANCEIRAS.value,
-                DREGroup.DESPESAS_FINANCEIRAS.value,
-            ]:
-                group = groups[group_id]
-                categories = []
-                for cat_key, cat_data in sorted(
-                    group['categories'].items(),
-                    key=lambda x: x[1]['total'],
-                    reverse=True
+            # Determine parent and subcategory
+            if parent_name:
+                parent_key = parent_name
+                sub_key = category_name
+            else:
+                parent_key = category_name
+                sub_key = None
+
+            # Add to category
+            category = groups[dre_group]['categories'][parent_key]
+            category['name'] = parent_key
+            category['total'] += amount
+
+            # Add to subcategory if exists
+            if sub_key:
+                category['subcategories'][sub_key]['name'] = sub_key
+                category['subcategories'][sub_key]['total'] += amount
+
+        # Calculate summary
+        receitas_op = groups[DREGroup.RECEITAS_OPERACIONAIS.value]['total']
+        despesas_op = groups[DREGroup.DESPESAS_OPERACIONAIS.value]['total']
+        receitas_fin = groups[DREGroup.RECEITAS_FINANCEIRAS.value]['total']
+        despesas_fin = groups[DREGroup.DESPESAS_FINANCEIRAS.value]['total']
+
+        resultado_operacional = receitas_op - despesas_op
+        resultado_financeiro = receitas_fin - despesas_fin
+        resultado_liquido = resultado_operacional + resultado_financeiro
+
+        # Convert to serializable format (ties broken by name for stable output)
+        result_groups = []
+        for group_id in [
+            DREGroup.RECEITAS_OPERACIONAIS.value,
+            DREGroup.DESPESAS_OPERACIONAIS.value,
+            DREGroup.RECEITAS_FINANCEIRAS.value,
+            DREGroup.DESPESAS_FINANCEIRAS.value,
+        ]:
+            group = groups[group_id]
+            categories = []
+            for cat_key, cat_data in sorted(
+                group['categories'].items(),
+                key=lambda x: (-x[1]['total'], x[0])
+            ):
+                subcategories = []
+                for sub_key, sub_data in sorted(
+                    cat_data['subcategories'].items(),
+                    key=lambda x: (-x[1]['total'], x[0])
                 ):
-                    subcategories = []
-                    for sub_key, sub_data in sorted(
-                        cat_data['subcategories'].items(),
-                        key=lambda x: x[1]['total'],
-                        reverse=True
-                    ):
-                        if sub_data['total'] > 0:
-                            subcategories.append({
-                                'name': sub_data['name'],
-                                'total': float(sub_data['total'])
-                            })
-
-                    if cat_data['total'] > 0:
-                        categories.append({
-                            'name': cat_data['name'],
-                            'total': float(cat_data['total']),
-                            'subcategories': subcategories
+                    if sub_data['total'] > 0:
+                        subcategories.append({
+                            'name': sub_data['name'],
+                            'total': float(sub_data['total'])
                         })
 
-                result_groups.append({
-                    'id': group['id'],
-                    'name': group['name'],
-                    'sign': group['sign'],
-                    'total': float(group['total']),
-                    'categories': categories
-                })
+                if cat_data['total'] > 0:
+                    categories.append({
+                        'name': cat_data['name'],
+                        'total': float(cat_data['total']),
+                        'subcategories': subcategories
+                    })
 
-            return {
-                'groups': result_groups,
-                'summary': {
-                    'receitas_operacionais': float(receitas_op),
-                    'despesas_operacionais': float(despesas_op),
-                    'resultado_operacional': float(resultado_operacional),
-                    'receitas_financeiras': float(receitas_fin),
-                    'despesas_financeiras': float(despesas_fin),
-                    'resultado_financeiro': float(resultado_financeiro),
-                    'resultado_liquido': float(resultado_liquido)
-                }
+            result_groups.append({
+                'id': group['id'],
+                'name': group['name'],
+                'sign': group['sign'],
+                'total': float(group['total']),
+                'categories': categories
+            })
+
+        return {
+            'groups': result_groups,
+            'summary': {
+                'receitas_operacionais': float(receitas_op),
+                'despesas_operacionais': float(despesas_op),
+                'resultado_operacional': float(resultado_operacional),
+                'receitas_financeiras': float(receitas_fin),
+                'despesas_financeiras': float(despesas_fin),
+                'resultado_financeiro': float(resultado_financeiro),
+                'resultado_liquido': float(resultado_liquido)
             }
+        }
+
+    @staticmethod
+    def get_dre_report(
+        user,
+        start_date: datetime,
+        end_date: datetime,
+        compare_start: Optional[datetime] = None,
+        compare_end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate DRE (Demonstrativo de Resultado do Exercício) report.
 
-        # Calculate current period
-        current_dre = calculate_period_dre(user, start_date, end_date)
+        Args:
+            user: User instance
+            start_date: Start date for the report
+            end_date: End date for the report
+            compare_start: Start date for comparison period (optional)
+            compare_end: End date for comparison period (optional)
 
-        # Calculate comparison period if requested
-        comparison_dre = None
+        Returns:
+            Dictionary with DRE data including groups, categories, and totals
+        """
+        # Both periods come from the same grouped query
+        periods = [(start_date, end_date)]
         if compare_start and compare_end:
-            comparison_dre = calculate_period_dre(user, compare_start, compare_end)
+            periods.append((compare_start, compare_end))
+
+        period_rows = ReportsService._get_dre_rows_for_periods(user, periods)
+
+        current_dre = ReportsService._build_period_dre(period_rows[0])
+        comparison_dre = None
+        if len(period_rows) > 1:
+            comparison_dre = ReportsService._build_period_dre(period_rows[1])
 
         # Build response
         response = {
@@ -867,9 +985,12 @@ class ReportsService:
                     return round(((current - previous) / abs(previous)) * 100, 2)
                 return 100.0 if current > 0 else 0.0
 
-            # Build comparison lookup by group_id -> category_name -> data
+            # Build comparison lookups: group_id -> total and
+            # group_id -> category_name -> data
+            comp_group_totals = {}
             comp_lookup = {}
             for comp_group in comparison_dre['groups']:
+                comp_group_totals[comp_group['id']] = comp_group['total']
                 comp_lookup[comp_group['id']] = {}
                 for comp_cat in comp_group['categories']:
                     comp_lookup[comp_group['id']][comp_cat['name']] = {
@@ -883,8 +1004,7 @@ class ReportsService:
                 comp_group_data = comp_lookup.get(group_id, {})
 
                 # Calculate group variation
-                comp_group = next((g for g in comparison_dre['groups'] if g['id'] == group_id), None)
-                comp_total = comp_group['total'] if comp_group else 0
+                comp_total = comp_group_totals.get(group_id, 0)
                 group['previous_total'] = comp_total
                 group['variation'] = calc_variation(group['total'], comp_total)
 
@@ -906,13 +1026,166 @@ class ReportsService:
 
         return response
 
+    DRE_MATRIX_GRANULARITIES = ('monthly', 'yearly')
+    MAX_DRE_MATRIX_COLUMNS = 120
+
+    @staticmethod
+    def _dre_matrix_columns(start_day, end_day, granularity: str) -> List[Dict[str, Any]]:
+        """Period columns (month or year buckets) covering [start_day, end_day]."""
+        from dateutil.relativedelta import relativedelta
+
+        if granularity == 'yearly':
+            cursor = start_day.replace(month=1, day=1)
+            step = relativedelta(years=1)
+        else:
+            cursor = start_day.replace(day=1)
+            step = relativedelta(months=1)
+
+        columns = []
+        while cursor <= end_day:
+            next_cursor = cursor + step
+            columns.append({
+                'bucket': cursor,
+                'label': cursor.strftime('%Y') if granularity == 'yearly' else cursor.strftime('%b/%y'),
+                'start': max(cursor, start_day).strftime('%Y-%m-%d'),
+                'end': min(next_cursor - timedelta(days=1), end_day).strftime('%Y-%m-%d'),
+            })
+            cursor = next_cursor
+        return columns
+
+    @staticmethod
+    def _index_dre(dre: Dict[str, Any]) -> Dict[str, Any]:
+        """group_id -> {'total', 'categories': name -> {'total', 'subcategories': name -> total}}"""
+        return {
+            group['id']: {
+                'total': group['total'],
+                'categories': {
+                    category['name']: {
+                        'total': category['total'],
+                        'subcategories': {sub['name']: sub['total'] for sub in category['subcategories']}
+                    }
+                    for category in group['categories']
+                }
+            }
+            for group in dre['groups']
+        }
+
+    @staticmethod
+    def get_dre_matrix(
+        user,
+        start_date: datetime,
+        end_date: datetime,
+        granularity: str = 'monthly'
+    ) -> Dict[str, Any]:
+        """
+        Generate a DRE with one column per month (or year) of the period.
+
+        All buckets come from a single grouped query over the daily rollups.
+        Each column is built like a regular DRE, and the rows follow the
+        ordering of the whole-period DRE.
+
+        Args:
+            user: User instance
+            start_date: Start date for the report
+            end_date: End date for the report
+            granularity: 'monthly' or 'yearly'
+
+        Returns:
+            Dictionary with columns, groups/categories/subcategories with one
+            value per column plus the period total, and the summary lines
+        """
+        trunc_func = TruncYear if granularity == 'yearly' else TruncMonth
+        columns = ReportsService._dre_matrix_columns(
+            rollups.rollup_day(start_date), rollups.rollup_day(end_date), granularity
+        )
+
+        rows = list(
+            ReportsService._with_dre_group(
+                rollups.for_period(user, start_date, end_date)
+            ).order_by().annotate(
+                bucket=trunc_func('day')
+            ).values(
+                'bucket', *ReportsService.DRE_GROUP_FIELDS, 'dre_group'
+            ).annotate(
+                total=Sum('total')
+            )
+        )
+
+        rows_by_bucket = defaultdict(list)
+        for row in rows:
+            rows_by_bucket[row['bucket']].append(row)
+
+        total_dre = ReportsService._build_period_dre(rows)
+        column_dres = [
+            ReportsService._build_period_dre(rows_by_bucket.get(column['bucket'], []))
+            for column in columns
+        ]
+        column_lookups = [ReportsService._index_dre(dre) for dre in column_dres]
+
+        empty = {'total': 0, 'categories': {}}
+        groups = []
+        for group in total_dre['groups']:
+            group_columns = [lookup.get(group['id'], empty) for lookup in column_lookups]
+
+            categories = []
+            for category in group['categories']:
+                category_columns = [
+                    column['categories'].get(category['name'], {'total': 0, 'subcategories': {}})
+                    for column in group_columns
+                ]
+                categories.append({
+                    'name': category['name'],
+                    'values': [column['total'] for column in category_columns],
+                    'total': category['total'],
+                    'subcategories': [
+                        {
+                            'name': sub['name'],
+                            'values': [column['subcategories'].get(sub['name'], 0) for column in category_columns],
+                            'total': sub['total'],
+                        }
+                        for sub in category['subcategories']
+                    ]
+                })
+
+            groups.append({
+                'id': group['id'],
+                'name': group['name'],
+                'sign': group['sign'],
+                'values': [column['total'] for column in group_columns],
+                'total': group['total'],
+                'categories': categories,
+            })
+
+        summary = {
+            key: {
+                'values': [dre['summary'][key] for dre in column_dres],
+                'total': total,
+            }
+            for key, total in total_dre['summary'].items()
+        }
+
+        return {
+            'period': {
+                'start': start_date.strftime('%Y-%m-%d'),
+                'end': end_date.strftime('%Y-%m-%d')
+            },
+            'granularity': granularity,
+            'columns': [
+                {key: value for key, value in column.items() if key != 'bucket'}
+                for column in columns
+            ],
+            'groups': groups,
+            'summary': summary,
+        }
+
     @staticmethod
     def export_dre_pdf(
         user,
         start_date: datetime,
         end_date: datetime,
         compare_start: Optional[datetime] = None,
-        compare_end: Optional[datetime] = None
+        compare_end: Optional[datetime] = None,
+        granularity: Optional[str] = None
     ) -> bytes:
         """
         Export DRE report as PDF using reportlab.
@@ -923,10 +1196,14 @@ class ReportsService:
             end_date: End date for the report
             compare_start: Start date for comparison period (optional)
             compare_end: End date for comparison period (optional)
+            granularity: 'monthly' or 'yearly' to export the DRE matrix instead
 
         Returns:
             PDF file content as bytes
         """
+        if granularity:
+            return ReportsService._export_dre_matrix_pdf(user, start_date, end_date, granularity)
+
         from io import BytesIO
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
@@ -1113,7 +1390,8 @@ class ReportsService:
         start_date: datetime,
         end_date: datetime,
         compare_start: Optional[datetime] = None,
-        compare_end: Optional[datetime] = None
+        compare_end: Optional[datetime] = None,
+        granularity: Optional[str] = None
     ) -> bytes:
         """
         Export DRE report as Excel.
@@ -1124,10 +1402,14 @@ class ReportsService:
             end_date: End date for the report
             compare_start: Start date for comparison period (optional)
             compare_end: End date for comparison period (optional)
+            granularity: 'monthly' or 'yearly' to export the DRE matrix instead
 
         Returns:
             Excel file content as bytes
         """
+        if granularity:
+            return ReportsService._export_dre_matrix_excel(user, start_date, end_date, granularity)
+
         from io import BytesIO
         from openpyxl import Workbook
         from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
@@ -1258,4 +1540,205 @@ class ReportsService:
         wb.save(buffer)
         buffer.seek(0)
 
-        return buffer.read()
\ No newline at end of file
+        return buffer.read()
+
+    @staticmethod
+    def _dre_matrix_lines(matrix: Dict[str, Any]) -> List[Tuple[str, str, List[float], float]]:
+        """
+        Flatten a DRE matrix into (style, label, values, total) lines, in the
+        same layout as the single-period exports.
+        """
+        lines = []
+        for group in matrix['groups']:
+            lines.append(('group', f"({group['sign']}) {group['name']}", group['values'], group['total']))
+            for category in group['categories']:
+                lines.append(('category', category['name'], category['values'], category['total']))
+                for sub in category['subcategories']:
+                    lines.append(('subcategory', f"└ {sub['name']}", sub['values'], sub['total']))
+
+        summary = matrix['summary']
+        lines.append(('blank', '', [], None))
+        for style, label, key in (
+            ('summary', "(=) RESULTADO OPERACIONAL", 'resultado_operacional'),
+            ('summary', "(+) Receitas Financeiras", 'receitas_financeiras'),
+            ('summary', "(-) Despesas Financeiras", 'despesas_financeiras'),
+            ('blank', '', None),
+            ('resultado', "(=) RESULTADO LÍQUIDO", 'resultado_liquido'),
+        ):
+            if key is None:
+                lines.append((style, label, [], None))
+            else:
+                lines.append((style, label, summary[key]['values'], summary[key]['total']))
+        return lines
+
+    @staticmethod
+    def _export_dre_matrix_pdf(user, start_date: datetime, end_date: datetime, granularity: str) -> bytes:
+        """Export the DRE matrix as a landscape PDF (one column per period)."""
+        from io import BytesIO
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A3, landscape
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import mm
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+        matrix = ReportsService.get_dre_matrix(user, start_date, end_date, granularity)
+
+        def fmt_number(value):
+            return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+        buffer = BytesIO()
+        pagesize = landscape(A3)
+        doc = SimpleDocTemplate(
+            buffer, pagesize=pagesize,
+            leftMargin=10*mm, rightMargin=10*mm, topMargin=15*mm, bottomMargin=15*mm
+        )
+        elements = []
+
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=16, alignment=1, spaceAfter=5)
+        subtitle_style = ParagraphStyle(
+            'Subtitle', parent=styles['Normal'], fontSize=10, alignment=1,
+            textColor=colors.grey, spaceAfter=20
+        )
+        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, alignment=1, textColor=colors.grey)
+
+        elements.append(Paragraph("DEMONSTRATIVO DE RESULTADO DO EXERCÍCIO", title_style))
+        elements.append(Paragraph(
+            f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')} (R$)",
+            subtitle_style
+        ))
+
+        columns = matrix['columns']
+        table_data = [['Descrição'] + [column['label'] for column in columns] + ['Total']]
+        row_styles = []
+        for style, label, values, total in ReportsService._dre_matrix_lines(matrix):
+            row_styles.append((len(table_data), style))
+            if style == 'blank':
+                table_data.append([''] * (len(columns) + 2))
+            else:
+                table_data.append([label] + [fmt_number(v) for v in values] + [fmt_number(total)])
+
+        # Description column fixed, period columns share the remaining width
+        available = pagesize[0] - 20*mm
+        description_width = 150
+        value_width = (available - description_width) / (len(columns) + 1)
+        font_size = 8 if len(columns) <= 13 else 6
+
+        table = Table(table_data, colWidths=[description_width] + [value_width] * (len(columns) + 1), repeatRows=1)
+        style_commands = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.1, 0.1, 0.18)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), font_size),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.Color(0.8, 0.8, 0.8)),
+            ('FONTNAME', (-1, 1), (-1, -1), 'Helvetica-Bold'),
+        ]
+        for row_idx, style_type in row_styles:
+            if style_type == 'group':
+                style_commands.append(('BACKGROUND', (0, row_idx), (-1, row_idx), colors.Color(0.95, 0.95, 0.95)))
+                style_commands.append(('FONTNAME', (0, row_idx), (-1, row_idx), 'Helvetica-Bold'))
+            elif style_type == 'subcategory':
+                style_commands.append(('TEXTCOLOR', (0, row_idx), (-1, row_idx), colors.Color(0.4, 0.4, 0.4)))
+            elif style_type == 'summary':
+                style_commands.append(('FONTNAME', (0, row_idx), (-1, row_idx), 'Helvetica-Bold'))
+            elif style_type == 'resultado':
+                style_commands.append(('BACKGROUND', (0, row_idx), (-1, row_idx), colors.Color(0.1, 0.1, 0.18)))
+                style_commands.append(('TEXTCOLOR', (0, row_idx), (-1, row_idx), colors.white))
+                style_commands.append(('FONTNAME', (0, row_idx), (-1, row_idx), 'Helvetica-Bold'))
+
+        table.setStyle(TableStyle(style_commands))
+        elements.append(table)
+
+        elements.append(Spacer(1, 30))
+        elements.append(Paragraph(
+            f"Relatório gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')} | CaixaHub",
+            footer_style
+        ))
+
+        doc.build(elements)
+        buffer.seek(0)
+
+        return buffer.read()
+
+    @staticmethod
+    def _export_dre_matrix_excel(user, start_date: datetime, end_date: datetime, granularity: str) -> bytes:
+        """Export the DRE matrix as Excel (one column per period plus a total)."""
+        from io import BytesIO
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+        from openpyxl.utils import get_column_letter
+
+        matrix = ReportsService.get_dre_matrix(user, start_date, end_date, granularity)
+        columns = matrix['columns']
+        last_col = len(columns) + 2
+
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "DRE"
+
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="1A1A2E", end_color="1A1A2E", fill_type="solid")
+        group_fill = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+        result_fill = PatternFill(start_color="1A1A2E", end_color="1A1A2E", fill_type="solid")
+        thin_border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+
+        last_letter = get_column_letter(last_col)
+        ws.merge_cells(f'A1:{last_letter}1')
+        ws['A1'] = "DEMONSTRATIVO DE RESULTADO DO EXERCÍCIO"
+        ws['A1'].font = Font(bold=True, size=14)
+        ws['A1'].alignment = Alignment(horizontal='center')
+
+        ws.merge_cells(f'A2:{last_letter}2')
+        ws['A2'] = f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}"
+        ws['A2'].alignment = Alignment(horizontal='center')
+
+        row = 4
+        headers = ['Descrição'] + [column['label'] for column in columns] + ['Total']
+        for col, header in enumerate(headers, 1):
+            cell = ws.cell(row=row, column=col, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = Alignment(horizontal='center' if col > 1 else 'left')
+            cell.border = thin_border
+        row += 1
+
+        indents = {'group': 0, 'category': 1, 'subcategory': 2}
+        for style, label, values, total in ReportsService._dre_matrix_lines(matrix):
+            if style == 'blank':
+                row += 1
+                continue
+
+            ws.cell(row=row, column=1, value=("  " * indents.get(style, 0)) + label)
+            for col, value in enumerate(values + [total], 2):
+                ws.cell(row=row, column=col, value=value).number_format = 'R$ #,##0.00'
+
+            for col in range(1, last_col + 1):
+                cell = ws.cell(row=row, column=col)
+                cell.border = thin_border
+                if style == 'group':
+                    cell.fill = group_fill
+                    cell.font = Font(bold=True)
+                elif style == 'resultado':
+                    cell.fill = result_fill
+                    cell.font = Font(bold=True, color="FFFFFF")
+            row += 1
+
+        ws.column_dimensions['A'].width = 40
+        for col in range(2, last_col + 1):
+            ws.column_dimensions[get_column_letter(col)].width = 16
+        ws.freeze_panes = 'B5'
+
+        buffer = BytesIO()
+        wb.save(buffer)
+        buffer.seek(0)
+
+        return buffer.read()
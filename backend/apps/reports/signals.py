@@ -0,0 +1,33 @@
+"""
+Signal handlers that invalidate cached reports.
+
+Transaction writes go through rollups.refresh(), which bumps the data version
+itself; these handlers cover the models saved one instance at a time.
+"""
+from django.db import transaction as transaction_db
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.banking.models import BankConnection, Bill, Category
+from . import category_stats
+from .report_cache import bump_data_version
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Bill)
+@receiver(post_delete, sender=Bill)
+@receiver(post_delete, sender=BankConnection)
+def invalidate_user_reports(sender, instance, **kwargs):
+    """Bump the owner's report data version."""
+    bump_data_version([instance.user_id])
+
+
+@receiver(post_delete, sender=BankConnection)
+def rebuild_user_category_stats(sender, instance, **kwargs):
+    """
+    The connection's rollups go with it by cascade, without a refresh; rebuild
+    the owner's category statistics from what is left.
+    """
+    user_id = instance.user_id
+    transaction_db.on_commit(lambda: category_stats.rebuild([user_id]))
@@ -0,0 +1,33 @@
+"""
+Celery tasks for Reports
+"""
+from celery import shared_task
+import logging
+
+from . import export_jobs
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def render_report_export(export_id: str):
+    """
+    Render a ReportExport file in the background.
+
+    Args:
+        export_id: ReportExport ID
+    """
+    rendered = export_jobs.render(export_id)
+    if not rendered:
+        logger.info(f'Report export {export_id} already taken or missing, skipping')
+    return {'export_id': export_id, 'rendered': rendered}
+
+
+@shared_task
+def cleanup_report_exports():
+    """
+    Delete report exports older than the retention window.
+    This task should be scheduled to run daily via Celery Beat.
+    """
+    deleted = export_jobs.cleanup()
+    return {'deleted': deleted}
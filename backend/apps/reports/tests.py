@@ -0,0 +1,84 @@
+"""
+Query budget of the rollup-backed reports.
+
+The reports read the daily rollups with one or two grouped queries whatever
+the size of the period; these tests pin that budget so a change that
+reintroduces per-period or per-category queries is caught.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.banking.models import BankAccount, BankConnection, Category, Connector, Transaction
+from apps.reports import rollups
+from apps.reports.services import ReportsService
+
+User = get_user_model()
+
+
+class ReportQueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='reports@example.com', username='reports@example.com')
+        connector = Connector.objects.create(
+            pluggy_id=1, name='Bank', institution_name='Bank', type='PERSONAL_BANK'
+        )
+        connection = BankConnection.objects.create(
+            user=cls.user, connector=connector, pluggy_item_id='item-1'
+        )
+        account = BankAccount.objects.create(
+            connection=connection, pluggy_account_id='account-1', type='CHECKING',
+            name='Checking', balance=Decimal('1000')
+        )
+        salary = Category.objects.create(user=cls.user, name='Salary', type='income')
+        food = Category.objects.create(user=cls.user, name='Food', type='expense')
+        rent = Category.objects.create(user=cls.user, name='Rent', type='expense')
+
+        now = timezone.now()
+        transactions = []
+        for day in range(0, 200, 3):
+            for index, (type_, category) in enumerate(
+                (('CREDIT', salary), ('DEBIT', food), ('DEBIT', rent), ('DEBIT', None))
+            ):
+                transactions.append(Transaction(
+                    account=account,
+                    pluggy_transaction_id=f'tx-{day}-{index}',
+                    type=type_,
+                    description=f'Transaction {day}-{index}',
+                    amount=Decimal('10.00') + day,
+                    date=now - timedelta(days=day),
+                    user_category=category,
+                ))
+        Transaction.objects.bulk_create(transactions)
+        rollups.rebuild(user=cls.user)
+
+        cls.now = now
+
+    def test_monthly_summary(self):
+        with self.assertNumQueries(2):
+            result = ReportsService.get_monthly_summary(self.user, self.now.month, self.now.year)
+        self.assertGreater(result['income']['total'], 0)
+
+    def test_trend_analysis(self):
+        with self.assertNumQueries(1):
+            result = ReportsService.get_trend_analysis(self.user, months=6, end_date=self.now)
+        self.assertGreater(result['analysis']['months_analyzed'], 0)
+
+    def test_cash_flow_report(self):
+        for granularity in ('daily', 'weekly', 'monthly'):
+            with self.subTest(granularity=granularity), self.assertNumQueries(1):
+                ReportsService.get_cash_flow_report(
+                    self.user, self.now - timedelta(days=90), self.now, granularity
+                )
+
+    def test_comparison_report(self):
+        with self.assertNumQueries(1):
+            ReportsService.get_comparison_report(
+                self.user,
+                self.now - timedelta(days=60), self.now - timedelta(days=31),
+                self.now - timedelta(days=30), self.now
+            )
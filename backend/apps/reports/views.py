@@ -4,12 +4,16 @@ Reports ViewSet for financial reports API.
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.http import HttpResponse
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.http import HttpResponse, FileResponse
+import io
 from datetime import datetime, timedelta
 from django.utils import timezone
 
 from .services import ReportsService
+from .models import ReportExport
+from .serializers import ReportExportCreateSerializer, ReportExportSerializer
+from . import report_cache, export_jobs
 from apps.authentication.models import UserActivityLog
 
 
@@ -31,6 +35,32 @@ class ReportsViewSet(viewsets.ViewSet):
         naive_dt = datetime.strptime(date_str, '%Y-%m-%d')
         return timezone.make_aware(naive_dt, timezone.utc)
 
+    def _parse_dre_granularity(self, request, start_date: datetime, end_date: datetime):
+        """
+        Read the optional DRE matrix granularity ('monthly' or 'yearly').
+
+        Returns:
+            (granularity or None, error Response or None)
+        """
+        granularity = request.query_params.get('granularity')
+        if not granularity:
+            return None, None
+
+        if granularity not in ReportsService.DRE_MATRIX_GRANULARITIES:
+            return None, Response(
+                {'error': 'granularity must be monthly or yearly'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        columns = ReportsService._dre_matrix_columns(start_date.date(), end_date.date(), granularity)
+        if len(columns) > ReportsService.MAX_DRE_MATRIX_COLUMNS:
+            return None, Response(
+                {'error': f'Matrix cannot exceed {ReportsService.MAX_DRE_MATRIX_COLUMNS} columns'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return granularity, None
+
     @action(detail=False, methods=['get'])
     def dre(self, request):
         """
@@ -40,6 +70,8 @@ class ReportsViewSet(viewsets.ViewSet):
             - start_date: Start date (YYYY-MM-DD) - required
             - end_date: End date (YYYY-MM-DD) - required
             - compare_with_previous: Compare with previous period (true/false)
+            - granularity: 'monthly' or 'yearly' to get a DRE matrix with one
+              column per period (compare_with_previous is ignored)
         """
         start_date_str = request.query_params.get('start_date')
         end_date_str = request.query_params.get('end_date')
@@ -67,12 +99,40 @@ class ReportsViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Limit period to 1 year for performance
-        if (end_date - start_date).days > 366:
-            return Response(
-                {'error': 'Period cannot exceed 1 year'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        granularity, error = self._parse_dre_granularity(request, start_date, end_date)
+        if error:
+            return error
+
+        if granularity:
+            try:
+                report = report_cache.get_or_compute(
+                    request.user, 'dre',
+                    {'start_date': start_date, 'end_date': end_date, 'granularity': granularity},
+                    lambda: ReportsService.get_dre_matrix(
+                        user=request.user,
+                        start_date=start_date,
+                        end_date=end_date,
+                        granularity=granularity
+                    )
+                )
+
+                UserActivityLog.log_event(
+                    user=request.user,
+                    event_type='report_generated',
+                    ip_address=get_client_ip(request),
+                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                    report_type='dre',
+                    start_date=start_date_str,
+                    end_date=end_date_str,
+                    granularity=granularity
+                )
+
+                return Response(report)
+            except Exception as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
 
         # Calculate comparison period if requested
         compare_start = None
@@ -83,12 +143,19 @@ class ReportsViewSet(viewsets.ViewSet):
             compare_start = compare_end - timedelta(days=period_days)
 
         try:
-            report = ReportsService.get_dre_report(
-                user=request.user,
-                start_date=start_date,
-                end_date=end_date,
-                compare_start=compare_start,
-                compare_end=compare_end
+            report = report_cache.get_or_compute(
+                request.user, 'dre',
+                {
+                    'start_date': start_date, 'end_date': end_date,
+                    'compare_start': compare_start, 'compare_end': compare_end,
+                },
+                lambda: ReportsService.get_dre_report(
+                    user=request.user,
+                    start_date=start_date,
+                    end_date=end_date,
+                    compare_start=compare_start,
+                    compare_end=compare_end
+                )
             )
 
             # Log report generation
@@ -119,6 +186,7 @@ class ReportsViewSet(viewsets.ViewSet):
             - start_date: Start date (YYYY-MM-DD) - required
             - end_date: End date (YYYY-MM-DD) - required
             - compare_with_previous: Compare with previous period (true/false)
+            - granularity: 'monthly' or 'yearly' to export the DRE matrix
         """
         start_date_str = request.query_params.get('start_date')
         end_date_str = request.query_params.get('end_date')
@@ -139,9 +207,13 @@ class ReportsViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        granularity, error = self._parse_dre_granularity(request, start_date, end_date)
+        if error:
+            return error
+
         compare_start = None
         compare_end = None
-        if compare_with_previous:
+        if compare_with_previous and not granularity:
             period_days = (end_date - start_date).days
             compare_end = start_date - timedelta(days=1)
             compare_start = compare_end - timedelta(days=period_days)
@@ -152,7 +224,8 @@ class ReportsViewSet(viewsets.ViewSet):
                 start_date=start_date,
                 end_date=end_date,
                 compare_start=compare_start,
-                compare_end=compare_end
+                compare_end=compare_end,
+                granularity=granularity
             )
 
             # Log PDF export
@@ -185,6 +258,7 @@ class ReportsViewSet(viewsets.ViewSet):
             - start_date: Start date (YYYY-MM-DD) - required
             - end_date: End date (YYYY-MM-DD) - required
             - compare_with_previous: Compare with previous period (true/false)
+            - granularity: 'monthly' or 'yearly' to export the DRE matrix
         """
         start_date_str = request.query_params.get('start_date')
         end_date_str = request.query_params.get('end_date')
@@ -205,9 +279,13 @@ class ReportsViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        granularity, error = self._parse_dre_granularity(request, start_date, end_date)
+        if error:
+            return error
+
         compare_start = None
         compare_end = None
-        if compare_with_previous:
+        if compare_with_previous and not granularity:
             period_days = (end_date - start_date).days
             compare_end = start_date - timedelta(days=1)
             compare_start = compare_end - timedelta(days=period_days)
@@ -218,7 +296,8 @@ class ReportsViewSet(viewsets.ViewSet):
                 start_date=start_date,
                 end_date=end_date,
                 compare_start=compare_start,
-                compare_end=compare_end
+                compare_end=compare_end,
+                granularity=granularity
             )
 
             # Log Excel export
@@ -255,11 +334,15 @@ class ReportsViewSet(viewsets.ViewSet):
         start_date = self._parse_date(start_date_str) if start_date_str else None
         end_date = self._parse_date(end_date_str) if end_date_str else None
 
-        report = ReportsService.get_cash_flow_report(
-            user=request.user,
-            start_date=start_date,
-            end_date=end_date,
-            granularity=granularity
+        report = report_cache.get_or_compute(
+            request.user, 'cash_flow',
+            {'start_date': start_date, 'end_date': end_date, 'granularity': granularity},
+            lambda: ReportsService.get_cash_flow_report(
+                user=request.user,
+                start_date=start_date,
+                end_date=end_date,
+                granularity=granularity
+            )
         )
 
         # Log report generation
@@ -286,11 +369,15 @@ class ReportsViewSet(viewsets.ViewSet):
         start_date = self._parse_date(start_date_str) if start_date_str else None
         end_date = self._parse_date(end_date_str) if end_date_str else None
 
-        report = ReportsService.get_category_breakdown(
-            user=request.user,
-            start_date=start_date,
-            end_date=end_date,
-            transaction_type=transaction_type
+        report = report_cache.get_or_compute(
+            request.user, 'category_breakdown',
+            {'start_date': start_date, 'end_date': end_date, 'transaction_type': transaction_type},
+            lambda: ReportsService.get_category_breakdown(
+                user=request.user,
+                start_date=start_date,
+                end_date=end_date,
+                transaction_type=transaction_type
+            )
         )
 
         # Log report generation
@@ -321,10 +408,14 @@ class ReportsViewSet(viewsets.ViewSet):
             month = int(month)
             year = int(year)
 
-        report = ReportsService.get_monthly_summary(
-            user=request.user,
-            month=month,
-            year=year
+        report = report_cache.get_or_compute(
+            request.user, 'monthly_summary',
+            {'month': month, 'year': year},
+            lambda: ReportsService.get_monthly_summary(
+                user=request.user,
+                month=month,
+                year=year
+            )
         )
 
         # Log report generation
@@ -348,10 +439,14 @@ class ReportsViewSet(viewsets.ViewSet):
 
         end_date = self._parse_date(end_date_str) if end_date_str else None
 
-        report = ReportsService.get_trend_analysis(
-            user=request.user,
-            months=months,
-            end_date=end_date
+        report = report_cache.get_or_compute(
+            request.user, 'trend_analysis',
+            {'months': months, 'end_date': end_date},
+            lambda: ReportsService.get_trend_analysis(
+                user=request.user,
+                months=months,
+                end_date=end_date
+            )
         )
 
         # Log report generation
@@ -383,12 +478,19 @@ class ReportsViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        report = ReportsService.get_comparison_report(
-            user=request.user,
-            period1_start=period1_start,
-            period1_end=period1_end,
-            period2_start=period2_start,
-            period2_end=period2_end
+        report = report_cache.get_or_compute(
+            request.user, 'comparison',
+            {
+                'period1_start': period1_start, 'period1_end': period1_end,
+                'period2_start': period2_start, 'period2_end': period2_end,
+            },
+            lambda: ReportsService.get_comparison_report(
+                user=request.user,
+                period1_start=period1_start,
+                period1_end=period1_end,
+                period2_start=period2_start,
+                period2_end=period2_end
+            )
         )
 
         # Log report generation
@@ -405,3 +507,73 @@ class ReportsViewSet(viewsets.ViewSet):
         )
 
         return Response(report)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """Report cache hit/miss counters (staff only)."""
+        return Response(report_cache.get_stats())
+
+    @action(detail=False, methods=['get', 'post'], url_path='exports')
+    def exports(self, request):
+        """
+        Background report exports.
+
+        GET: list the user's recent exports.
+        POST: queue an export (returns the existing job if an identical one
+        is still pending). Body: file_format (pdf/xlsx), start_date, end_date,
+        compare_with_previous, granularity (optional, monthly/yearly).
+        """
+        if request.method == 'GET':
+            exports = ReportExport.objects.filter(user=request.user).defer('content')[:20]
+            return Response(ReportExportSerializer(exports, many=True).data)
+
+        serializer = ReportExportCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        export, created = export_jobs.request_export(
+            request.user,
+            file_format=serializer.validated_data['file_format'],
+            params=serializer.to_params(),
+            report_type=serializer.validated_data['report_type']
+        )
+
+        return Response(
+            ReportExportSerializer(export).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['get'], url_path=r'exports/(?P<export_id>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})')
+    def export_status(self, request, export_id=None):
+        """Get the status of a background export."""
+        export = ReportExport.objects.filter(user=request.user, id=export_id).defer('content').first()
+        if not export:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        response = Response(ReportExportSerializer(export).data)
+        response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+        return response
+
+    @action(detail=False, methods=['get'], url_path=r'exports/(?P<export_id>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})/download')
+    def export_download(self, request, export_id=None):
+        """Download the file of a completed background export."""
+        export = ReportExport.objects.filter(user=request.user, id=export_id).first()
+        if not export:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if export.status != ReportExport.STATUS_COMPLETED or export.content is None:
+            return Response(
+                {'error': 'Export is not ready', 'status': export.status},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        UserActivityLog.log_event(
+            user=request.user,
+            event_type='report_exported_pdf' if export.file_format == 'pdf' else 'report_exported_excel',
+            ip_address=get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            report_type=export.report_type,
+            start_date=export.params.get('start_date'),
+            end_date=export.params.get('end_date')
+        )
+
+        return FileResponse(io.BytesIO(export.content), as_attachment=True, filename=export.filename)
@@ -0,0 +1,72 @@
+"""
+Cached subscription entitlement.
+
+SubscriptionRequiredMiddleware needs, on every request, whether the user has
+any subscription, whether one of them grants access and, for users without
+one, whether the trial was already used. That is computed on the first
+request and kept in the cache per user. The receivers in signals.py drop the
+entry whenever a Subscription, Customer or TrialUsageTracking row of the user
+is written (webhooks, checkout sync, admin), and ENTRY_TIMEOUT bounds how
+long a change that bypassed them can be served.
+"""
+import logging
+from typing import Any, Dict, Iterable
+
+from django.core.cache import cache
+from django.db import transaction as transaction_db
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TIMEOUT = 60 * 5  # 5 minutes
+
+# past_due keeps access during Stripe's payment retries (grace period),
+# as in User.has_active_subscription
+ACTIVE_STATUSES = ('trialing', 'active', 'past_due')
+
+NONE = 'none'          # never subscribed (checkout not completed)
+INACTIVE = 'inactive'  # only expired/canceled subscriptions
+ACTIVE = 'active'
+
+
+def _key(user_id) -> str:
+    return f'subscriptions:entitlement:{user_id}'
+
+
+def _compute(user) -> Dict[str, Any]:
+    from djstripe.models import Subscription
+    from .models import TrialUsageTracking
+
+    statuses = set(
+        Subscription.objects.filter(customer__subscriber=user).values_list('status', flat=True)
+    )
+
+    if not statuses:
+        trial_tracking, _ = TrialUsageTracking.objects.get_or_create(user=user)
+        return {'state': NONE, 'has_used_trial': trial_tracking.has_used_trial}
+
+    state = ACTIVE if statuses.intersection(ACTIVE_STATUSES) else INACTIVE
+    return {'state': state, 'has_used_trial': True}
+
+
+def get_entitlement(user) -> Dict[str, Any]:
+    """
+    Subscription state of a user: {'state': NONE|INACTIVE|ACTIVE, 'has_used_trial': bool}.
+    """
+    entitlement = cache.get(_key(user.id))
+    if entitlement is None:
+        entitlement = _compute(user)
+        cache.set(_key(user.id), entitlement, ENTRY_TIMEOUT)
+    return entitlement
+
+
+def invalidate(user_ids: Iterable):
+    """
+    Drop the cached entitlement of the given users.
+
+    Runs after the current transaction commits, so the entry isn't dropped
+    (and recomputed by a concurrent request) before the new state is visible.
+    """
+    keys = [_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if not keys:
+        return
+    transaction_db.on_commit(lambda: cache.delete_many(keys))
@@ -53,37 +53,34 @@ class SubscriptionRequiredMiddleware:
         if request.user.is_superuser:
             return self.get_response(request)
 
-        # Check if user has ANY subscription (even if expired)
-        from djstripe.models import Subscription
-        from .models import TrialUsageTracking
+        # Cached per user, dropped by the subscription signals
+        from .entitlement import ACTIVE, NONE, get_entitlement
 
-        has_any_subscription = Subscription.objects.filter(
-            customer__subscriber=request.user
-        ).exists()
+        entitlement = get_entitlement(request.user)
+        has_used_trial = entitlement['has_used_trial']
 
         # User has NO subscription at all (new user who didn't complete checkout)
-        if not has_any_subscription:
+        if entitlement['state'] == NONE:
             # Allow checkout flow
             if self.is_allowed_without_subscription(request.path):
                 return self.get_response(request)
 
             # Check if user already used trial
-            trial_tracking, _ = TrialUsageTracking.objects.get_or_create(user=request.user)
-            redirect_path = '/subscription/trial-used' if trial_tracking.has_used_trial else '/checkout'
+            redirect_path = '/subscription/trial-used' if has_used_trial else '/checkout'
 
             # Block access and redirect
             if request.path.startswith('/api/'):
                 return JsonResponse({
-                    'error': 'Subscription required. Please complete checkout.' if not trial_tracking.has_used_trial else 'Trial already used. Please subscribe.',
-                    'code': 'TRIAL_USED' if trial_tracking.has_used_trial else 'CHECKOUT_REQUIRED',
+                    'error': 'Subscription required. Please complete checkout.' if not has_used_trial else 'Trial already used. Please subscribe.',
+                    'code': 'TRIAL_USED' if has_used_trial else 'CHECKOUT_REQUIRED',
                     'redirect': redirect_path
                 }, status=402)
             else:
                 return redirect(redirect_path)
 
         # User has subscription but it's not active (expired/canceled)
-        # Note: past_due is considered active (grace period) in has_active_subscription
-        if not request.user.has_active_subscription:
+        # Note: past_due is considered active (grace period), as in has_active_subscription
+        if entitlement['state'] != ACTIVE:
             # Allow certain paths even when subscription is expired
             if self.is_allowed_without_subscription(request.path):
                 return self.get_response(request)
@@ -3,10 +3,12 @@ Subscription signals for tracking trial usage and handling subscription events
 """
 from django.dispatch import receiver
 from django.db import transaction, OperationalError
+from django.db.models.signals import post_delete, post_save
 from djstripe import signals
 from djstripe.models import Customer, Subscription
 from djstripe.signals import webhook_processing_error
 from .models import TrialUsageTracking, AcquisitionTracking
+from . import entitlement
 from django.utils import timezone
 from datetime import datetime
 import logging
@@ -39,6 +41,34 @@ def retry_on_deadlock(func, max_retries=3, delay=0.1):
     return wrapper
 
 
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_entitlement_on_subscription_change(sender, instance, **kwargs):
+    """
+    Drop the cached entitlement of the subscriber. dj-stripe saves the
+    Subscription on every subscription webhook and on sync_from_stripe_data.
+    """
+    try:
+        customer = instance.customer if instance.customer_id else None
+    except Customer.DoesNotExist:
+        customer = None
+    if customer is not None:
+        entitlement.invalidate([customer.subscriber_id])
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_entitlement_on_customer_change(sender, instance, **kwargs):
+    """Linking a customer to a user changes which subscriptions the user has."""
+    entitlement.invalidate([instance.subscriber_id])
+
+
+@receiver(post_save, sender=TrialUsageTracking)
+@receiver(post_delete, sender=TrialUsageTracking)
+def invalidate_entitlement_on_trial_change(sender, instance, **kwargs):
+    entitlement.invalidate([instance.user_id])
+
+
 @receiver(signals.WEBHOOK_SIGNALS["customer.subscription.created"])
 def track_trial_on_subscription_created(sender, event, **kwargs):
     """
@@ -0,0 +1,183 @@
+"""
+Tiered Redis cache backend.
+
+TieredRedisCache is Django's RedisCache with two additions:
+
+- Keys starting with one of LOCAL_KEY_PREFIXES are also kept in a
+  per-process memory tier (L1) for up to LOCAL_TIMEOUT seconds, so hot keys
+  read on almost every request (the Pluggy API key, the connector list)
+  don't cost a Redis round trip each time. Writes go to both tiers; other
+  processes may see an old L1 value until it expires.
+- When Redis is unreachable, reads miss, writes are dropped and incr()
+  raises ValueError (as for a missing key), for RETRY_AFTER seconds before
+  Redis is tried again, instead of failing the request. L1 keys keep being
+  served from memory meanwhile.
+
+Connection pools are shared by every thread of the process (Django creates
+one cache instance per thread). Options other than the ones above are
+passed to redis-py's ConnectionPool; connection_class may be an import
+path, e.g. 'fakeredis.FakeConnection' for tests without a Redis server.
+"""
+import logging
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Shared per process, keyed by LOCATION
+_clients = {}
+_down_until = {}
+_lock = threading.Lock()
+
+
+class TieredRedisCache(RedisCache):
+
+    def __init__(self, server, params):
+        params = dict(params)
+        options = dict(params.get('OPTIONS') or {})
+        self._local_prefixes = tuple(options.pop('LOCAL_KEY_PREFIXES', ()))
+        self._local_timeout = options.pop('LOCAL_TIMEOUT', 30)
+        self._local_max_entries = options.pop('LOCAL_MAX_ENTRIES', 1000)
+        self._retry_after = options.pop('RETRY_AFTER', 10)
+        if isinstance(options.get('connection_class'), str):
+            options['connection_class'] = import_string(options['connection_class'])
+        params['OPTIONS'] = options
+
+        super().__init__(server, params)
+        self._location = server if isinstance(server, str) else ','.join(server)
+        self._local = LocMemCache(f'tiered:{self._location}', {
+            'TIMEOUT': self._local_timeout,
+            'OPTIONS': {'MAX_ENTRIES': self._local_max_entries},
+        })
+
+    @cached_property
+    def _cache(self):
+        with _lock:
+            client = _clients.get(self._location)
+            if client is None:
+                client = _clients[self._location] = self._class(self._servers, **self._options)
+            return client
+
+    # Redis availability
+
+    def _is_down(self) -> bool:
+        return _down_until.get(self._location, 0) > time.monotonic()
+
+    def _mark_down(self, error):
+        with _lock:
+            if not self._is_down():
+                logger.warning(f'Redis cache unavailable, retrying in {self._retry_after}s: {error!r}')
+            _down_until[self._location] = time.monotonic() + self._retry_after
+
+    def _call(self, default, method, *args, **kwargs):
+        """Run a RedisCache method, returning `default` while Redis is unreachable."""
+        if self._is_down():
+            return default
+        import redis
+        try:
+            return method(*args, **kwargs)
+        except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+            self._mark_down(e)
+            return default
+
+    # Local tier
+
+    def _is_local(self, key) -> bool:
+        return bool(self._local_prefixes) and str(key).startswith(self._local_prefixes)
+
+    def _local_ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self._local_timeout
+        return min(timeout, self._local_timeout)
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        local = self._is_local(key)
+        if local:
+            value = self._local.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+
+        value = self._call(_MISSING, super().get, key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        if local:
+            self._local.set(key, value, self._local_timeout, version=version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._call(None, super().set, key, value, timeout, version=version)
+        if self._is_local(key):
+            self._local.set(key, value, self._local_ttl(timeout), version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._call(False, super().add, key, value, timeout, version=version)
+        if added and self._is_local(key):
+            self._local.set(key, value, self._local_ttl(timeout), version=version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._call(False, super().touch, key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        if self._is_local(key):
+            self._local.delete(key, version=version)
+        return self._call(False, super().delete, key, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote = []
+        for key in keys:
+            value = self._local.get(key, _MISSING, version=version) if self._is_local(key) else _MISSING
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                found[key] = value
+
+        if remote:
+            values = self._call({}, super().get_many, remote, version=version)
+            for key, value in values.items():
+                if self._is_local(key):
+                    self._local.set(key, value, self._local_timeout, version=version)
+            found.update(values)
+        return found
+
+    def has_key(self, key, version=None):
+        if self._is_local(key) and self._local.has_key(key, version=version):
+            return True
+        return self._call(False, super().has_key, key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self._call(_MISSING, super().incr, key, delta, version=version)
+        if value is _MISSING:
+            raise ValueError(f"Key '{key}' not found (cache unavailable)")
+        return value
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self._call(list(data), super().set_many, data, timeout, version=version)
+        for key, value in data.items():
+            if self._is_local(key):
+                self._local.set(key, value, self._local_ttl(timeout), version=version)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            if self._is_local(key):
+                self._local.delete(key, version=version)
+        self._call(None, super().delete_many, keys, version=version)
+
+    def clear(self):
+        self._local.clear()
+        return self._call(False, super().clear)
@@ -37,6 +37,16 @@ app.conf.beat_schedule = {
         'task': 'apps.ai_insights.tasks.cleanup_old_insights',
         'schedule': crontab(day_of_week=0, hour=3, minute=0),  # Sunday at 3:00 AM
     },
+    # Materialize upcoming installments of recurring bills (daily at 2 AM)
+    'materialize-recurring-bills': {
+        'task': 'apps.banking.tasks.materialize_recurring_bills',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    # Delete old background report exports (daily at 4 AM)
+    'cleanup-report-exports': {
+        'task': 'apps.reports.tasks.cleanup_report_exports',
+        'schedule': crontab(hour=4, minute=0),
+    },
 }
 
 # Timezone configuration
@@ -70,3 +80,8 @@ def setup_task_imports(**_kwargs):
         import apps.ai_insights.tasks  # noqa: F401
     except ImportError:
         pass
+
+    try:
+        import apps.reports.tasks  # noqa: F401
+    except ImportError:
+        pass
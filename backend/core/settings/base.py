@@ -156,6 +156,22 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+# AI Insights weekly generation
+AI_INSIGHTS_BATCH_SIZE = int(os.environ.get('AI_INSIGHTS_BATCH_SIZE', 50))  # users per Celery group
+AI_INSIGHTS_SCHEDULE_WINDOW = int(os.environ.get('AI_INSIGHTS_SCHEDULE_WINDOW', 2 * 60 * 60))  # seconds
+AI_INSIGHTS_CONCURRENCY = int(os.environ.get('AI_INSIGHTS_CONCURRENCY', 5))  # OpenAI calls in flight per worker task
+OPENAI_REQUESTS_PER_MINUTE = int(os.environ.get('OPENAI_REQUESTS_PER_MINUTE', 60))  # shared by all workers
+
+# The Redis broker redelivers any unacknowledged task after visibility_timeout,
+# including countdown/ETA tasks a worker is still holding. It must stay well
+# above the longest countdown we schedule (AI_INSIGHTS_SCHEDULE_WINDOW), or
+# those tasks run twice; generate_weekly_insights caps its window below it.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'visibility_timeout': int(os.environ.get(
+        'CELERY_VISIBILITY_TIMEOUT', AI_INSIGHTS_SCHEDULE_WINDOW + 2 * 60 * 60
+    )),  # seconds
+}
+
 # Channels Configuration
 ASGI_APPLICATION = 'core.asgi.application'
 
@@ -125,11 +125,29 @@ SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 # Exempt /health/ from SSL redirect for Railway healthcheck
 SECURE_REDIRECT_EXEMPT = [r'^health/$']
 
-# Cache Configuration - PRODUCTION FIX (No Redis in Railway)
-# Override base.py Redis cache with dummy cache to eliminate connection errors
+# Cache Configuration
+# Redis (same instance as the Celery broker) with a per-process memory tier for
+# hot keys; degrades to cache misses while Redis is unreachable (core/cache.py).
+# Shared counters (report data versions, OpenAI rate limit) need a cache that
+# every process sees, which the previous DummyCache could not provide.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        'BACKEND': 'core.cache.TieredRedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'caixahub',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            # redis-py connection pool (shared by the threads of a process)
+            'max_connections': int(os.environ.get('REDIS_CACHE_MAX_CONNECTIONS', '20')),
+            'socket_connect_timeout': 0.5,
+            'socket_timeout': 0.5,
+            'health_check_interval': 30,
+            # Local tier: read on almost every request, rarely written
+            'LOCAL_KEY_PREFIXES': ['pluggy_api_key', 'banking:connectors:'],
+            'LOCAL_TIMEOUT': 30,
+            # Seconds to skip Redis after a connection error
+            'RETRY_AFTER': 10,
+        },
     }
 }
 